@@ -24,16 +24,15 @@ from airflow.models import DagBag
 def get_dag_run_state(dag_id, execution_date):
     """Return the task object identified by the given dag_id and task_id."""
 
-    dagbag = DagBag()
+    # Only parse the file of the DAG
+    dagbag = DagBag(lazy_load=True)
 
     # Check DAG exists.
-    if dag_id not in dagbag.dags:
+    dag = dagbag.get_dag(dag_id)
+    if dag is None:
         error_message = "Dag id {} not found".format(dag_id)
         raise DagNotFound(error_message)
 
-    # Get DAG object and check Task Exists
-    dag = dagbag.get_dag(dag_id)
-
     # Get DagRun object and check that it exists
     dagrun = dag.get_dagrun(execution_date=execution_date)
     if not dagrun:
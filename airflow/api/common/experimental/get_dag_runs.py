@@ -30,10 +30,11 @@ def get_dag_runs(dag_id, state=None):
     :return: List of DAG runs of a DAG with requested state,
     or all runs if the state is not specified
     """
-    dagbag = DagBag()
+    # Only parse the file of the DAG
+    dagbag = DagBag(lazy_load=True)
 
     # Check DAG exists.
-    if dag_id not in dagbag.dags:
+    if dagbag.get_dag(dag_id) is None:
         error_message = "Dag id {} not found".format(dag_id)
         raise AirflowException(error_message)
 
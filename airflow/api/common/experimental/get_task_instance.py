@@ -25,15 +25,16 @@ from airflow.models import DagBag
 def get_task_instance(dag_id, task_id, execution_date):
     """Return the task object identified by the given dag_id and task_id."""
 
-    dagbag = DagBag()
+    # Only parse the file of the DAG
+    dagbag = DagBag(lazy_load=True)
 
     # Check DAG exists.
-    if dag_id not in dagbag.dags:
+    dag = dagbag.get_dag(dag_id)
+    if dag is None:
         error_message = "Dag id {} not found".format(dag_id)
         raise DagNotFound(error_message)
 
-    # Get DAG object and check Task Exists
-    dag = dagbag.get_dag(dag_id)
+    # Check Task Exists
     if not dag.has_task(task_id):
         error_message = 'Task {} not found in dag {}'.format(task_id, dag_id)
         raise TaskNotFound(error_message)
@@ -135,12 +135,14 @@ def process_subdir(subdir):
 
 
 def get_dag(args):
-    dagbag = DagBag(process_subdir(args.subdir))
-    if args.dag_id not in dagbag.dags:
+    # Only parse the file of the DAG when the DB knows where it is
+    dagbag = DagBag(process_subdir(args.subdir), lazy_load=True)
+    dag = dagbag.get_dag(args.dag_id)
+    if dag is None:
         raise AirflowException(
             'dag_id could not be found: {}. Either the dag did not exist or it failed to '
             'parse.'.format(args.dag_id))
-    return dagbag.dags[args.dag_id]
+    return dag
 
 
 def get_dags(args):
@@ -1005,11 +1007,15 @@ def webserver(args):
 @cli_utils.action_logging
 def scheduler(args):
     print(settings.HEADER)
+    if args.profile_loops and not args.profile_output:
+        args.profile_output = 'scheduler_loop_profile.json'
     job = jobs.SchedulerJob(
         dag_id=args.dag_id,
         subdir=process_subdir(args.subdir),
         num_runs=args.num_runs,
-        do_pickle=args.do_pickle)
+        do_pickle=args.do_pickle,
+        profile_loops=args.profile_loops,
+        profile_trace_file=args.profile_output)
 
     if args.daemon:
         pid, stdout, stderr, log_file = setup_locations("scheduler",
@@ -1994,6 +2000,18 @@ class CLIFactory(object):
             ("-n", "--num_runs"),
             default=conf.getint('scheduler', 'num_runs'), type=int,
             help="Set the number of runs to execute before exiting"),
+        'profile_loops': Arg(
+            ("--profile_loops",),
+            default=None, type=int,
+            help="Profile this number of scheduler loops then exit. The timings "
+                 "of the loop phases are written to the file set by "
+                 "--profile_output"),
+        'profile_output': Arg(
+            ("--profile_output",),
+            default=None,
+            help="Write the timings of the phases of every scheduler loop to this "
+                 "file as lines of JSON. Defaults to scheduler_loop_profile.json "
+                 "when --profile_loops is set"),
         # worker
         'do_pickle': Arg(
             ("-p", "--do_pickle"),
@@ -2326,7 +2344,7 @@ class CLIFactory(object):
             'help': "Start a scheduler instance",
             'args': ('dag_id_opt', 'subdir', 'num_runs',
                      'do_pickle', 'pid', 'daemon', 'stdout', 'stderr',
-                     'log_file'),
+                     'log_file', 'profile_loops', 'profile_output'),
         }, {
             'func': worker,
             'help': "Start a Celery worker node",
@@ -50,6 +50,7 @@ DEFAULT_CELERY_CONFIG = {
     'broker_transport_options': broker_transport_options,
     'result_backend': configuration.conf.get('celery', 'RESULT_BACKEND'),
     'worker_concurrency': configuration.conf.getint('celery', 'WORKER_CONCURRENCY'),
+    'worker_send_task_events': configuration.conf.getboolean('celery', 'TASK_EVENTS'),
 }
 
 celery_ssl_active = False
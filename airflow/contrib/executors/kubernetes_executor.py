@@ -17,6 +17,8 @@
 
 import base64
 import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from queue import Empty
 
 import re
@@ -148,6 +150,8 @@ class KubeConfig:
             self.kubernetes_section, 'delete_worker_pods')
         self.worker_pods_creation_batch_size = conf.getint(
             self.kubernetes_section, 'worker_pods_creation_batch_size')
+        self.worker_pods_creation_parallelism = conf.getint(
+            self.kubernetes_section, 'worker_pods_creation_parallelism')
         self.worker_service_account_name = conf.get(
             self.kubernetes_section, 'worker_service_account_name')
         self.image_pull_secrets = conf.get(self.kubernetes_section, 'image_pull_secrets')
@@ -287,12 +291,83 @@ class KubeConfig:
                 'through ssh key, but not both')
 
 
+class KubernetesPodStateCache(LoggingMixin):
+    """
+    Phases and labels of the worker pods, kept up to date from the events of the
+    KubernetesJobWatcher so that the executor knows which pods exist without
+    asking the Kubernetes API.
+    """
+
+    def __init__(self):
+        # Map from pod id to (phase, labels)
+        self._pods = {}
+        # Map from (dag_id, task_id, execution_date) labels to pod ids
+        self._pod_ids_by_task = defaultdict(set)
+
+    @staticmethod
+    def _task_labels(labels):
+        return labels.get('dag_id'), labels.get('task_id'), labels.get('execution_date')
+
+    def update(self, pod_id, event_type, phase, labels):
+        """
+        Updates the cache from a watch event of a pod.
+
+        :param pod_id: the name of the pod
+        :param event_type: the type of the event, e.g. ``ADDED`` or ``DELETED``
+        :param phase: the phase of the pod, e.g. ``Running``
+        :param labels: the labels of the pod
+        """
+        if event_type == 'DELETED':
+            self.remove(pod_id)
+            return
+        labels = labels or {}
+        self.remove(pod_id)
+        self._pods[pod_id] = (phase, labels)
+        self._pod_ids_by_task[self._task_labels(labels)].add(pod_id)
+
+    def load(self, pod_list):
+        """
+        Adds the pods of a pod list, as returned by ``list_namespaced_pod``.
+        """
+        for pod in pod_list.items:
+            self.update(pod.metadata.name, 'ADDED', pod.status.phase, pod.metadata.labels)
+
+    def remove(self, pod_id):
+        phase_and_labels = self._pods.pop(pod_id, None)
+        if phase_and_labels is not None:
+            task_labels = self._task_labels(phase_and_labels[1])
+            self._pod_ids_by_task[task_labels].discard(pod_id)
+            if not self._pod_ids_by_task[task_labels]:
+                del self._pod_ids_by_task[task_labels]
+
+    def get_phase(self, pod_id):
+        """
+        :return: the phase of a pod, or None if the pod is unknown
+        """
+        phase_and_labels = self._pods.get(pod_id)
+        return phase_and_labels[0] if phase_and_labels else None
+
+    def has_pod(self, dag_id, task_id, execution_date):
+        """
+        :return: whether a pod exists for a task instance, given its dag_id,
+            task_id and execution_date label values
+        :rtype: bool
+        """
+        return (dag_id, task_id, execution_date) in self._pod_ids_by_task
+
+    def __len__(self):
+        return len(self._pods)
+
+
 class KubernetesJobWatcher(multiprocessing.Process, LoggingMixin, object):
-    def __init__(self, namespace, watcher_queue, resource_version, worker_uuid, kube_config):
+    def __init__(self, namespace, watcher_queue, resource_version, worker_uuid, kube_config,
+                 pod_event_queue=None):
         multiprocessing.Process.__init__(self)
         self.namespace = namespace
         self.worker_uuid = worker_uuid
         self.watcher_queue = watcher_queue
+        # Receives (pod_id, event_type, phase, labels) for every pod event
+        self.pod_event_queue = pod_event_queue
         self.resource_version = resource_version
         self.kube_config = kube_config
 
@@ -333,6 +408,9 @@ class KubernetesJobWatcher(multiprocessing.Process, LoggingMixin, object):
             )
             if event['type'] == 'ERROR':
                 return self.process_error(event)
+            if self.pod_event_queue is not None:
+                self.pod_event_queue.put((task.metadata.name, event['type'],
+                                          task.status.phase, task.metadata.labels))
             self.process_status(
                 task.metadata.name, task.status.phase, task.metadata.labels,
                 task.metadata.resource_version
@@ -390,13 +468,17 @@ class AirflowKubernetesScheduler(LoggingMixin):
         self.worker_configuration = WorkerConfiguration(kube_config=self.kube_config)
         self._manager = multiprocessing.Manager()
         self.watcher_queue = self._manager.Queue()
+        self.pod_event_queue = self._manager.Queue()
+        self.pod_states = KubernetesPodStateCache()
         self.worker_uuid = worker_uuid
+        self._pod_creation_pool = None
         self.kube_watcher = self._make_kube_watcher()
 
     def _make_kube_watcher(self):
         resource_version = KubeResourceVersion.get_current_resource_version()
         watcher = KubernetesJobWatcher(self.namespace, self.watcher_queue,
-                                       resource_version, self.worker_uuid, self.kube_config)
+                                       resource_version, self.worker_uuid, self.kube_config,
+                                       pod_event_queue=self.pod_event_queue)
         watcher.start()
         return watcher
 
@@ -435,6 +517,31 @@ class AirflowKubernetesScheduler(LoggingMixin):
         self.launcher.run_pod_async(pod, **self.kube_config.kube_client_request_args)
         self.log.debug("Kubernetes Job created!")
 
+    def run_next_batch(self, next_jobs):
+        """
+        Launches several jobs, creating up to ``worker_pods_creation_parallelism``
+        pods at the same time.
+
+        :param next_jobs: the jobs to launch, as taken from the task_queue
+        :type next_jobs: list[tuple]
+        :return: the jobs and the exception raised while launching them, or None
+            if they were launched
+        :rtype: list[tuple[tuple, Exception]]
+        """
+        def run_next(next_job):
+            try:
+                self.run_next(next_job)
+            except Exception as e:
+                return next_job, e
+            return next_job, None
+
+        parallelism = self.kube_config.worker_pods_creation_parallelism
+        if len(next_jobs) <= 1 or parallelism <= 1:
+            return [run_next(next_job) for next_job in next_jobs]
+        if self._pod_creation_pool is None:
+            self._pod_creation_pool = ThreadPoolExecutor(max_workers=parallelism)
+        return list(self._pod_creation_pool.map(run_next, next_jobs))
+
     def delete_pod(self, pod_id):
         if self.kube_config.delete_worker_pods:
             try:
@@ -445,6 +552,17 @@ class AirflowKubernetesScheduler(LoggingMixin):
                 # If the pod is already deleted
                 if e.status != 404:
                     raise
+            self.pod_states.remove(pod_id)
+
+    def load_pod_states(self):
+        """
+        Fills the pod state cache with the pods of this worker that already
+        exist, with a single call to the Kubernetes API, as the watcher only
+        reports them once it has caught up.
+        """
+        kwargs = dict(label_selector='airflow-worker={}'.format(self.worker_uuid))
+        kwargs.update(self.kube_config.kube_client_request_args)
+        self.pod_states.load(self.kube_client.list_namespaced_pod(self.namespace, **kwargs))
 
     def sync(self):
         """
@@ -456,6 +574,12 @@ class AirflowKubernetesScheduler(LoggingMixin):
 
         """
         self._health_check_kube_watcher()
+        while True:
+            try:
+                self.pod_states.update(*self.pod_event_queue.get_nowait())
+                self.pod_event_queue.task_done()
+            except Empty:
+                break
         while True:
             try:
                 task = self.watcher_queue.get_nowait()
@@ -615,6 +739,8 @@ class AirflowKubernetesScheduler(LoggingMixin):
         return None
 
     def terminate(self):
+        if self._pod_creation_pool is not None:
+            self._pod_creation_pool.shutdown()
         self.watcher_queue.join()
         self._manager.shutdown()
 
@@ -654,25 +780,20 @@ class KubernetesExecutor(BaseExecutor, LoggingMixin):
             'When executor started up, found %s queued task instances',
             len(queued_tasks)
         )
+        if not queued_tasks:
+            return
+
+        # The pods of all the queued tasks are listed at once
+        pod_states = self.kube_scheduler.pod_states
+        if not len(pod_states):
+            self.kube_scheduler.load_pod_states()
 
         for task in queued_tasks:
-            dict_string = (
-                "dag_id={},task_id={},execution_date={},airflow-worker={}".format(
+            if not pod_states.has_pod(
                     AirflowKubernetesScheduler._make_safe_label_value(task.dag_id),
                     AirflowKubernetesScheduler._make_safe_label_value(task.task_id),
                     AirflowKubernetesScheduler._datetime_to_label_safe_datestring(
-                        task.execution_date
-                    ),
-                    self.worker_uuid
-                )
-            )
-            kwargs = dict(label_selector=dict_string)
-            if self.kube_config.kube_client_request_args:
-                for key, value in self.kube_config.kube_client_request_args.iteritems():
-                    kwargs[key] = value
-            pod_list = self.kube_client.list_namespaced_pod(
-                self.kube_config.kube_namespace, **kwargs)
-            if len(pod_list.items) == 0:
+                        task.execution_date)):
                 self.log.info(
                     'TaskInstance: %s found in queued state but was not launched, '
                     'rescheduling', task
@@ -774,19 +895,27 @@ class KubernetesExecutor(BaseExecutor, LoggingMixin):
 
         KubeResourceVersion.checkpoint_resource_version(last_resource_version)
 
+        next_jobs = []
         for _ in range(self.kube_config.worker_pods_creation_batch_size):
             try:
-                task = self.task_queue.get_nowait()
-                try:
-                    self.kube_scheduler.run_next(task)
-                except ApiException:
-                    self.log.exception('ApiException when attempting to run task, re-queueing.')
-                    self.task_queue.put(task)
-                finally:
-                    self.task_queue.task_done()
+                next_jobs.append(self.task_queue.get_nowait())
             except Empty:
                 break
 
+        errors = []
+        for task, error in self.kube_scheduler.run_next_batch(next_jobs):
+            try:
+                if isinstance(error, ApiException):
+                    self.log.error('ApiException when attempting to run task, re-queueing.',
+                                   exc_info=error)
+                    self.task_queue.put(task)
+                elif error is not None:
+                    errors.append(error)
+            finally:
+                self.task_queue.task_done()
+        if errors:
+            raise errors[0]
+
     def _change_state(self, key, state, pod_id):
         if state != State.RUNNING:
             self.kube_scheduler.delete_pod(pod_id)
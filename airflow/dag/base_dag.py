@@ -25,6 +25,7 @@ class BaseDag():
     Base DAG object that both the SimpleDag and DAG inherit.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @property
     @abstractmethod
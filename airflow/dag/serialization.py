@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+JSON serialization of DAGs, with the attributes the webserver needs to show
+them, so that it can show DAGs without executing the DAG files.
+"""
+
+import datetime
+import json
+
+import pendulum
+from dateutil.relativedelta import relativedelta
+
+from airflow.exceptions import AirflowException
+from airflow.models.baseoperator import BaseOperator
+from airflow.models.dag import DAG
+from airflow.utils import timezone
+
+# Version of the JSON format of serialized DAGs, to bump when it changes
+SERIALIZATION_FORMAT_VERSION = 1
+
+TYPE = '__type'
+VALUE = '__var'
+
+# Attributes of DAGs and operators that are serialized when they exist
+DAG_FIELDS = (
+    '_dag_id', '_description', 'schedule_interval', '_schedule_interval',
+    'start_date', 'end_date', 'fileloc', '_full_filepath', '_concurrency',
+    'max_active_runs', 'dagrun_timeout', '_default_view', 'orientation',
+    'catchup', 'is_subdag', 'doc_md', 'params', 'default_args',
+    'template_searchpath', '_access_control',
+)
+OPERATOR_FIELDS = (
+    'task_id', 'owner', 'email', 'email_on_retry', 'email_on_failure',
+    'retries', 'retry_delay', 'retry_exponential_backoff', 'max_retry_delay',
+    'start_date', 'end_date', 'depends_on_past', 'wait_for_downstream',
+    'params', 'priority_weight', 'weight_rule', 'queue', 'pool', 'sla',
+    'execution_timeout', 'trigger_rule', 'run_as_user', 'task_concurrency',
+    'executor_config', 'do_xcom_push', 'ui_color', 'ui_fgcolor',
+    'doc', 'doc_md', 'doc_rst', 'doc_json', 'doc_yaml',
+)
+
+
+def serialize_value(value):
+    """
+    Encodes a value of a DAG or operator attribute to a JSON-compatible value.
+    Callables are replaced with their qualified name, and other values that
+    can't be encoded with their string representation, or the qualified name
+    of their class when it would contain their address, so that the
+    serialization of a DAG only changes when the DAG changes.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [serialize_value(v) for v in value]
+    if isinstance(value, dict):
+        return {TYPE: 'dict',
+                VALUE: {str(k): serialize_value(v) for k, v in value.items()}}
+    if isinstance(value, (set, frozenset)):
+        return {TYPE: 'set',
+                VALUE: sorted((serialize_value(v) for v in value), key=str)}
+    if isinstance(value, tuple):
+        return {TYPE: 'tuple', VALUE: [serialize_value(v) for v in value]}
+    if isinstance(value, datetime.datetime):
+        return {TYPE: 'datetime',
+                VALUE: timezone.convert_to_utc(value).timestamp()}
+    if isinstance(value, datetime.timedelta):
+        return {TYPE: 'timedelta', VALUE: value.total_seconds()}
+    if isinstance(value, relativedelta):
+        return {TYPE: 'relativedelta',
+                VALUE: {k: v for k, v in vars(value).items()
+                        if not k.startswith('_') and isinstance(v, (int, float)) and v}}
+    if isinstance(value, datetime.tzinfo) and hasattr(value, 'name'):
+        return {TYPE: 'timezone', VALUE: value.name}
+    if callable(value):
+        return _qualified_name(value)
+    if type(value).__repr__ is object.__repr__ and type(value).__str__ is object.__str__:
+        return _qualified_name(type(value))
+    return str(value)
+
+
+def _qualified_name(obj):
+    module = getattr(obj, '__module__', None)
+    name = getattr(obj, '__qualname__', None) or getattr(obj, '__name__', None)
+    if name is None:
+        # E.g. functools.partial objects
+        return _qualified_name(type(obj))
+    return '{}.{}'.format(module, name) if module else name
+
+
+def deserialize_value(value):
+    """
+    Decodes a value encoded by ``serialize_value``.
+    """
+    if isinstance(value, list):
+        return [deserialize_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    type_, var = value[TYPE], value[VALUE]
+    if type_ == 'dict':
+        return {k: deserialize_value(v) for k, v in var.items()}
+    if type_ == 'set':
+        return set(deserialize_value(v) for v in var)
+    if type_ == 'tuple':
+        return tuple(deserialize_value(v) for v in var)
+    if type_ == 'datetime':
+        return pendulum.from_timestamp(var, tz=timezone.utc)
+    if type_ == 'timedelta':
+        return datetime.timedelta(seconds=var)
+    if type_ == 'relativedelta':
+        return relativedelta(**var)
+    if type_ == 'timezone':
+        return pendulum.timezone(var)
+    raise AirflowException("Unknown serialized type {}".format(type_))
+
+
+def _serialize_fields(obj, fields):
+    return {field: serialize_value(getattr(obj, field)) for field in fields
+            if hasattr(obj, field)}
+
+
+class SerializedBaseOperator(BaseOperator):
+    """
+    An operator rebuilt from its JSON serialization. It has the attributes of
+    the original operator that the webserver shows, like its type, colors and
+    template fields, but not its code, so it can't be executed.
+    """
+
+    def __init__(self, task_id, task_type='BaseOperator', **kwargs):
+        super().__init__(task_id=task_id, **kwargs)
+        self._task_type = task_type
+
+    @property
+    def task_type(self):
+        return self._task_type
+
+    @classmethod
+    def serialize_operator(cls, op):
+        """
+        :param op: the operator
+        :type op: airflow.models.BaseOperator
+        :return: the JSON-compatible serialization of the operator
+        :rtype: dict
+        """
+        encoded = _serialize_fields(op, OPERATOR_FIELDS)
+        encoded['task_type'] = op.task_type
+        encoded['template_fields'] = list(op.template_fields)
+        for field in op.template_fields:
+            content = getattr(op, field, None)
+            if isinstance(content, str) and content.endswith(tuple(op.template_ext)):
+                try:
+                    env = op.get_template_env()
+                    content = env.loader.get_source(env, content)[0]
+                except Exception:
+                    pass
+            encoded[field] = serialize_value(content)
+        encoded['downstream_task_ids'] = sorted(op.downstream_task_ids)
+        return encoded
+
+    @classmethod
+    def deserialize_operator(cls, encoded):
+        """
+        :param encoded: the serialization of an operator
+        :type encoded: dict
+        :rtype: SerializedBaseOperator
+        """
+        op = cls(task_id=encoded['task_id'], task_type=encoded['task_type'])
+        for field, value in encoded.items():
+            if field not in ('task_id', 'task_type', 'downstream_task_ids'):
+                setattr(op, field, deserialize_value(value))
+        # The template files of the template fields were read when serializing
+        op.template_ext = []
+        return op
+
+
+class SerializedDAG(DAG):
+    """
+    A DAG rebuilt from its JSON serialization, made of SerializedBaseOperators.
+    """
+
+    @classmethod
+    def serialize_dag(cls, dag):
+        """
+        :param dag: the DAG
+        :type dag: airflow.models.DAG
+        :return: the JSON-compatible serialization of the DAG
+        :rtype: dict
+        """
+        encoded = _serialize_fields(dag, DAG_FIELDS)
+        encoded['timezone'] = serialize_value(dag.timezone)
+        encoded['tasks'] = [SerializedBaseOperator.serialize_operator(task)
+                            for task in dag.tasks]
+        return {'version': SERIALIZATION_FORMAT_VERSION, 'dag': encoded}
+
+    @classmethod
+    def deserialize_dag(cls, serialized):
+        """
+        :param serialized: the serialization of a DAG
+        :type serialized: dict
+        :rtype: SerializedDAG
+        """
+        if serialized.get('version') != SERIALIZATION_FORMAT_VERSION:
+            raise AirflowException(
+                "Cannot deserialize a DAG serialized with version {}, expected "
+                "version {}".format(serialized.get('version'),
+                                    SERIALIZATION_FORMAT_VERSION))
+        encoded = serialized['dag']
+        dag = cls(dag_id=encoded['_dag_id'])
+        for field, value in encoded.items():
+            if field not in ('_dag_id', 'tasks'):
+                setattr(dag, field, deserialize_value(value))
+
+        downstream_task_ids = {}
+        for encoded_task in encoded['tasks']:
+            task = SerializedBaseOperator.deserialize_operator(encoded_task)
+            task._dag = dag
+            dag.task_dict[task.task_id] = task
+            downstream_task_ids[task.task_id] = encoded_task['downstream_task_ids']
+        for task_id, downstream_ids in downstream_task_ids.items():
+            for downstream_id in downstream_ids:
+                dag.task_dict[task_id]._downstream_task_ids.add(downstream_id)
+                dag.task_dict[downstream_id]._upstream_task_ids.add(task_id)
+        return dag
+
+    @classmethod
+    def to_json(cls, dag):
+        """
+        :param dag: the DAG
+        :type dag: airflow.models.DAG
+        :return: the JSON serialization of the DAG
+        :rtype: str
+        """
+        return json.dumps(cls.serialize_dag(dag), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        :param data: the JSON serialization of a DAG
+        :type data: str
+        :rtype: SerializedDAG
+        """
+        return cls.deserialize_dag(json.loads(data))
@@ -59,6 +59,7 @@ class Executors:
     CeleryExecutor = "CeleryExecutor"
     DaskExecutor = "DaskExecutor"
     KubernetesExecutor = "KubernetesExecutor"
+    SimulatedExecutor = "SimulatedExecutor"
 
 
 def _get_executor(executor_name):
@@ -80,6 +81,9 @@ def _get_executor(executor_name):
     elif executor_name == Executors.KubernetesExecutor:
         from airflow.contrib.executors.kubernetes_executor import KubernetesExecutor
         return KubernetesExecutor()
+    elif executor_name == Executors.SimulatedExecutor:
+        from airflow.executors.simulated_executor import SimulatedExecutor
+        return SimulatedExecutor()
     else:
         # Loading plugins
         _integrate_plugins()
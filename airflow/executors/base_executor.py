@@ -17,8 +17,15 @@
 # specific language governing permissions and limitations
 # under the License.
 
-from builtins import range
-from collections import OrderedDict
+import heapq
+import itertools
+import time
+from collections import OrderedDict, defaultdict
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
 
 # To avoid circular imports
 import airflow.utils.dag_processing
@@ -30,6 +37,180 @@ from airflow.utils.state import State
 PARALLELISM = configuration.conf.getint('core', 'PARALLELISM')
 
 
+class _Descending(object):
+    """
+    Wraps a value so that it sorts in descending order, for any comparable value.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+
+class QueuedTaskPriorities(object):
+    """
+    The priorities of the tasks queued in an executor, to take the tasks with
+    the highest priority without sorting all of them. Tasks with the same
+    priority are taken in the order they were queued in.
+
+    The tasks themselves stay in the ``queued_tasks`` dict of the executor. The
+    priorities are kept in a heap whose entries for tasks that were removed from
+    ``queued_tasks`` are dropped lazily. Tasks added to ``queued_tasks`` without
+    ``queue_command`` have no priority and are taken after the others, in the
+    order they were added in.
+    """
+
+    def __init__(self):
+        # Heap of (descending priority, sequence number, key)
+        self._heap = []
+        # Map from task instance key to the sequence number of its heap entry
+        self._sequences = {}
+        self._sequence = itertools.count()
+        # Map from task instance key to the time it was queued at, oldest first
+        self._enqueue_times = OrderedDict()
+
+    def push(self, key, priority):
+        """
+        Adds a task that was just queued.
+        """
+        self._enqueue_times.pop(key, None)
+        self._enqueue_times[key] = time.time()
+        self.put_back(key, priority)
+
+    def put_back(self, key, priority):
+        """
+        Adds back a task that was taken but is still queued, e.g. because it
+        could not be sent.
+        """
+        sequence = next(self._sequence)
+        self._sequences[key] = sequence
+        heapq.heappush(self._heap, (_Descending(priority), sequence, key))
+
+    def take(self, queued_tasks, n):
+        """
+        Removes the ``n`` queued tasks with the highest priority from the heap,
+        the caller is responsible for removing them from ``queued_tasks``.
+
+        :param queued_tasks: the tasks queued in the executor
+        :type queued_tasks: dict
+        :param n: the number of tasks to take
+        :type n: int
+        :return: the keys of the tasks, by decreasing priority
+        :rtype: list[tuple]
+        """
+        keys = []
+        while self._heap and len(keys) < n:
+            _, sequence, key = heapq.heappop(self._heap)
+            if self._sequences.get(key) != sequence:
+                continue
+            del self._sequences[key]
+            if key in queued_tasks:
+                keys.append(key)
+
+        if len(keys) < n:
+            # The heap is empty, the tasks left have no priority
+            taken_keys = set(keys)
+            for key in queued_tasks:
+                if len(keys) >= n:
+                    break
+                if key not in taken_keys:
+                    keys.append(key)
+
+        if len(self._heap) > 2 * len(queued_tasks) + 100:
+            self._heap = [heap_entry for heap_entry in self._heap
+                          if heap_entry[2] in queued_tasks and
+                          self._sequences.get(heap_entry[2]) == heap_entry[1]]
+            heapq.heapify(self._heap)
+            self._sequences = {key: sequence for _, sequence, key in self._heap}
+        return keys
+
+    def oldest_age(self, queued_tasks):
+        """
+        :param queued_tasks: the tasks queued in the executor
+        :type queued_tasks: dict
+        :return: the number of seconds the oldest task has been queued for
+        :rtype: float
+        """
+        while self._enqueue_times:
+            key, enqueue_time = next(iter(self._enqueue_times.items()))
+            if key in queued_tasks:
+                return time.time() - enqueue_time
+            del self._enqueue_times[key]
+        return 0
+
+
+class EventBuffer(MutableMapping):
+    """
+    The states reported by an executor for task instances, as a mapping from
+    task instance key to state, stored by dag_id so that the events of some
+    DAGs are taken without looking at the events of the other DAGs.
+    """
+
+    def __init__(self):
+        # Map from dag_id to the map from task instance key to state
+        self._events_by_dag = defaultdict(dict)
+        self._len = 0
+
+    @staticmethod
+    def _get_dag_id(key):
+        return key[0] if isinstance(key, tuple) else key
+
+    def __getitem__(self, key):
+        dag_events = self._events_by_dag.get(self._get_dag_id(key))
+        if dag_events is None:
+            raise KeyError(key)
+        return dag_events[key]
+
+    def __setitem__(self, key, state):
+        dag_events = self._events_by_dag[self._get_dag_id(key)]
+        if key not in dag_events:
+            self._len += 1
+        dag_events[key] = state
+
+    def __delitem__(self, key):
+        dag_id = self._get_dag_id(key)
+        dag_events = self._events_by_dag.get(dag_id)
+        if dag_events is None:
+            raise KeyError(key)
+        del dag_events[key]
+        self._len -= 1
+        if not dag_events:
+            del self._events_by_dag[dag_id]
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(list(self._events_by_dag.values()))
+
+    def __len__(self):
+        return self._len
+
+    def pop_dag_events(self, dag_id):
+        """
+        Removes the events of a DAG.
+
+        :param dag_id: the id of the DAG
+        :type dag_id: unicode
+        :return: a map from task instance key to state
+        :rtype: dict
+        """
+        dag_events = self._events_by_dag.pop(dag_id, {})
+        self._len -= len(dag_events)
+        return dag_events
+
+    def dag_ids(self):
+        """
+        :return: the ids of the DAGs with events
+        :rtype: list[unicode]
+        """
+        return list(self._events_by_dag)
+
+
 class BaseExecutor(LoggingMixin):
 
     def __init__(self, parallelism=PARALLELISM):
@@ -43,8 +224,9 @@ class BaseExecutor(LoggingMixin):
         """
         self.parallelism = parallelism
         self.queued_tasks = OrderedDict()
+        self.queued_priorities = QueuedTaskPriorities()
         self.running = {}
-        self.event_buffer = {}
+        self.event_buffer = EventBuffer()
 
     def start(self):  # pragma: no cover
         """
@@ -58,6 +240,7 @@ class BaseExecutor(LoggingMixin):
         if key not in self.queued_tasks and key not in self.running:
             self.log.info("Adding to queue: %s", command)
             self.queued_tasks[key] = (command, priority, queue, simple_task_instance)
+            self.queued_priorities.push(key, priority)
         else:
             self.log.info("could not queue task %s", key)
 
@@ -104,6 +287,20 @@ class BaseExecutor(LoggingMixin):
         if task_instance.key in self.queued_tasks or task_instance.key in self.running:
             return True
 
+    def get_open_slots(self):
+        """
+        Returns how many more task instances the executor can take now, so that
+        the scheduler does not queue task instances that would wait in the
+        executor. The task instances already queued in the executor take slots.
+
+        :return: the number of open slots, or None if the executor is not limited
+        :rtype: int
+        """
+        if not self.parallelism:
+            return None
+        open_slots = self.parallelism - len(self.running) - len(self.queued_tasks)
+        return max(0, open_slots)
+
     def sync(self):
         """
         Sync will get called periodically by the heartbeat method.
@@ -127,15 +324,12 @@ class BaseExecutor(LoggingMixin):
 
         Stats.gauge('executor.open_slots', open_slots)
         Stats.gauge('executor.queued_tasks', num_queued_tasks)
+        Stats.gauge('executor.queued_tasks_age',
+                    self.queued_priorities.oldest_age(self.queued_tasks))
         Stats.gauge('executor.running_tasks', num_running_tasks)
 
-        sorted_queue = sorted(
-            [(k, v) for k, v in self.queued_tasks.items()],
-            key=lambda x: x[1][1],
-            reverse=True)
-        for i in range(min((open_slots, len(self.queued_tasks)))):
-            key, (command, _, queue, simple_ti) = sorted_queue.pop(0)
-            self.queued_tasks.pop(key)
+        for key in self.queued_priorities.take(self.queued_tasks, open_slots):
+            command, _, queue, simple_ti = self.queued_tasks.pop(key)
             self.running[key] = command
             self.execute_async(key=key,
                                command=command,
@@ -167,14 +361,16 @@ class BaseExecutor(LoggingMixin):
         :return: a dict of events
         """
         cleared_events = dict()
+        buffered_dag_ids = self.event_buffer.dag_ids()
         if dag_ids is None:
-            cleared_events = self.event_buffer
-            self.event_buffer = dict()
-        else:
-            for key in list(self.event_buffer.keys()):
-                dag_id, _, _, _ = key
-                if dag_id in dag_ids:
-                    cleared_events[key] = self.event_buffer.pop(key)
+            dag_ids = buffered_dag_ids
+        elif len(buffered_dag_ids) < len(dag_ids):
+            dag_ids = [dag_id for dag_id in buffered_dag_ids if dag_id in dag_ids]
+        for dag_id in dag_ids:
+            dag_events = self.event_buffer.pop_dag_events(dag_id)
+            if dag_events:
+                Stats.incr('executor.events.{}'.format(dag_id), len(dag_events))
+                cleared_events.update(dag_events)
 
         return cleared_events
 
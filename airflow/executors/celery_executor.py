@@ -20,17 +20,22 @@
 import math
 import os
 import subprocess
+import threading
 import time
 import traceback
-from multiprocessing import Pool, cpu_count
+from multiprocessing import Pool, TimeoutError, cpu_count
+from queue import Empty, Queue
 
 from celery import Celery
 from celery import states as celery_states
+from celery.backends.base import KeyValueStoreBackend
+from celery.backends.database import DatabaseBackend, Task as TaskDb
 
 from airflow import configuration
 from airflow.config_templates.default_celery import DEFAULT_CELERY_CONFIG
 from airflow.exceptions import AirflowException
 from airflow.executors.base_executor import BaseExecutor
+from airflow.stats import Stats
 from airflow.utils.log.logging_mixin import LoggingMixin
 from airflow.utils.module_loading import import_string
 from airflow.utils.timeout import timeout
@@ -40,6 +45,20 @@ CELERY_FETCH_ERR_MSG_HEADER = 'Error fetching Celery task state'
 
 CELERY_SEND_ERR_MSG_HEADER = 'Error sending Celery task'
 
+# Timeout (in seconds) of a single call to Celery from the sync pool
+OPERATION_TIMEOUT = 2
+
+# Time (in seconds) given to the sync pool on top of the operation timeouts
+# before it is considered stuck and replaced
+SYNC_POOL_TIMEOUT_MARGIN = 30
+
+# Maximum number of task states fetched from the result backend in one call
+BULK_STATE_FETCH_BATCH_SIZE = 1000
+
+# Time (in seconds) waited before connecting again to the broker to receive
+# task events after the connection was lost
+EVENT_RECEIVER_RETRY_DELAY = 5
+
 '''
 To start the celery worker, run the command:
 airflow worker
@@ -100,7 +119,7 @@ def fetch_celery_task_state(celery_task):
     """
 
     try:
-        with timeout(seconds=2):
+        with timeout(seconds=OPERATION_TIMEOUT):
             # Accessing state property of celery task will make actual network request
             # to get the current state of the task.
             res = (celery_task[0], celery_task[1].state)
@@ -114,7 +133,7 @@ def fetch_celery_task_state(celery_task):
 def send_task_to_executor(task_tuple):
     key, simple_ti, command, queue, task = task_tuple
     try:
-        with timeout(seconds=2):
+        with timeout(seconds=OPERATION_TIMEOUT):
             result = task.apply_async(args=[command], queue=queue)
     except Exception as e:
         exception_traceback = "Celery Task ID: {}\n{}".format(key,
@@ -124,6 +143,76 @@ def send_task_to_executor(task_tuple):
     return key, command, result
 
 
+class CeleryTaskEventReceiver(LoggingMixin):
+    """
+    Receives the events sent by Celery workers when tasks finish, in a
+    background thread connected to the broker. Workers only send events when
+    ``worker_send_task_events`` is set in the Celery configuration, or when
+    started with ``-E``.
+
+    :param celery_app: the Celery application whose events are received
+    :type celery_app: celery.Celery
+    """
+
+    # Map from the handled event types to the state of the task they report
+    TASK_EVENT_STATES = {
+        'task-succeeded': celery_states.SUCCESS,
+        'task-failed': celery_states.FAILURE,
+        'task-revoked': celery_states.REVOKED,
+    }
+
+    def __init__(self, celery_app):
+        self.celery_app = celery_app
+        self._events = Queue()
+        self._stopped = threading.Event()
+        self._receiver = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='CeleryTaskEventReceiver')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        handlers = {event_type: self._on_event for event_type in self.TASK_EVENT_STATES}
+        while not self._stopped.is_set():
+            try:
+                with self.celery_app.connection_for_read() as connection:
+                    self._receiver = self.celery_app.events.Receiver(
+                        connection, handlers=handlers)
+                    self._receiver.should_stop = self._stopped.is_set()
+                    self._receiver.capture(limit=None, timeout=None, wakeup=False)
+            except Exception:
+                self.log.exception("Error receiving Celery task events, connecting "
+                                   "again in %s seconds", EVENT_RECEIVER_RETRY_DELAY)
+                self._stopped.wait(EVENT_RECEIVER_RETRY_DELAY)
+
+    def _on_event(self, event):
+        self._events.put((event['uuid'], self.TASK_EVENT_STATES[event['type']]))
+
+    def get_task_states(self):
+        """
+        Returns the states of the tasks reported by the events received since
+        the last call.
+
+        :return: the Celery task ids and states, in the order they were received
+        :rtype: list[tuple[str, str]]
+        """
+        task_states = []
+        while True:
+            try:
+                task_states.append(self._events.get_nowait())
+            except Empty:
+                return task_states
+
+    def stop(self):
+        self._stopped.set()
+        if self._receiver is not None:
+            self._receiver.should_stop = True
+        if self._thread is not None:
+            self._thread.join(timeout=EVENT_RECEIVER_RETRY_DELAY)
+
+
 class CeleryExecutor(BaseExecutor):
     """
     CeleryExecutor is recommended for production use of Airflow. It allows
@@ -149,11 +238,65 @@ class CeleryExecutor(BaseExecutor):
         self.tasks = {}
         self.last_state = {}
 
+        # When task events are used, the states of the tasks are only polled
+        # every so often in case some events were lost
+        self._task_events = configuration.getboolean('celery', 'TASK_EVENTS')
+        self._task_events_reconciliation_interval = configuration.getint(
+            'celery', 'TASK_EVENTS_RECONCILIATION_INTERVAL')
+        self._event_receiver = None
+        self._last_reconciliation_time = 0
+
     def start(self):
         self.log.debug(
             'Starting Celery Executor using %s processes for syncing',
             self._sync_parallelism
         )
+        self._get_sync_pool()
+        if self._task_events:
+            self._event_receiver = CeleryTaskEventReceiver(app)
+            self._event_receiver.start()
+
+    def _get_sync_pool(self):
+        """
+        Returns the pool of processes used to send tasks to Celery and to fetch
+        their states, starting it if needed. The pool is kept across heartbeats,
+        the processes that die are replaced by the pool itself.
+
+        :rtype: multiprocessing.pool.Pool
+        """
+        if self._sync_pool is None:
+            self.log.debug("Starting a pool of %s processes to sync with Celery",
+                           self._sync_parallelism)
+            self._sync_pool = Pool(processes=self._sync_parallelism)
+        return self._sync_pool
+
+    def _terminate_sync_pool(self):
+        if self._sync_pool is not None:
+            self._sync_pool.terminate()
+            self._sync_pool.join()
+            self._sync_pool = None
+
+    def _map_in_sync_pool(self, func, iterable, chunksize):
+        """
+        Calls ``func`` on every item of ``iterable`` in the sync pool. If the pool
+        does not answer in time, e.g. because one of its processes died while
+        working on a chunk, the pool is replaced and no results are returned.
+
+        :return: the results of the calls, in order
+        :rtype: list
+        """
+        pool = self._get_sync_pool()
+        pool_timeout = OPERATION_TIMEOUT * chunksize + SYNC_POOL_TIMEOUT_MARGIN
+        try:
+            return pool.map_async(func, iterable, chunksize=chunksize).get(pool_timeout)
+        except TimeoutError:
+            self.log.error("The Celery sync pool did not answer within %s seconds, "
+                           "restarting it", pool_timeout)
+        except Exception:
+            self.log.exception("The Celery sync pool failed, restarting it")
+        self._terminate_sync_pool()
+        Stats.incr('celery.sync_pool_restarts')
+        return []
 
     def _num_tasks_per_send_process(self, to_send_count):
         """
@@ -186,15 +329,17 @@ class CeleryExecutor(BaseExecutor):
         self.log.debug("%s in queue", len(self.queued_tasks))
         self.log.debug("%s open slots", open_slots)
 
-        sorted_queue = sorted(
-            [(k, v) for k, v in self.queued_tasks.items()],
-            key=lambda x: x[1][1],
-            reverse=True)
+        Stats.gauge('executor.open_slots', open_slots)
+        Stats.gauge('executor.queued_tasks', len(self.queued_tasks))
+        Stats.gauge('executor.queued_tasks_age',
+                    self.queued_priorities.oldest_age(self.queued_tasks))
+        Stats.gauge('executor.running_tasks', len(self.running))
 
         task_tuples_to_send = []
 
-        for i in range(min((open_slots, len(self.queued_tasks)))):
-            key, (command, _, queue, simple_ti) = sorted_queue.pop(0)
+        # The tasks stay queued until they are sent successfully
+        for key in self.queued_priorities.take(self.queued_tasks, open_slots):
+            command, _, queue, simple_ti = self.queued_tasks[key]
             task_tuples_to_send.append((key, simple_ti, command, queue,
                                         execute_command))
 
@@ -210,16 +355,15 @@ class CeleryExecutor(BaseExecutor):
             # Use chunking instead of a work queue to reduce context switching
             # since tasks are roughly uniform in size
             chunksize = self._num_tasks_per_send_process(len(task_tuples_to_send))
-            num_processes = min(len(task_tuples_to_send), self._sync_parallelism)
-
-            send_pool = Pool(processes=num_processes)
-            key_and_async_results = send_pool.map(
-                send_task_to_executor,
-                task_tuples_to_send,
-                chunksize=chunksize)
 
-            send_pool.close()
-            send_pool.join()
+            # Tasks that were sent but whose results were lost with a failed pool
+            # stay queued and are sent again, running them twice is prevented
+            # by the task instance state checks of `airflow run`.
+            with Stats.timer('celery.send_tasks'):
+                key_and_async_results = self._map_in_sync_pool(
+                    send_task_to_executor,
+                    task_tuples_to_send,
+                    chunksize=chunksize)
             self.log.debug('Sent all tasks.')
 
             for key, command, result in key_and_async_results:
@@ -236,33 +380,37 @@ class CeleryExecutor(BaseExecutor):
                     self.tasks[key] = result
                     self.last_state[key] = celery_states.PENDING
 
+            # The tasks that could not be sent are taken again on the next heartbeat
+            for key, _, _, _, _ in task_tuples_to_send:
+                if key in self.queued_tasks:
+                    self.queued_priorities.put_back(key, self.queued_tasks[key][1])
+
         # Calling child class sync method
         self.log.debug("Calling the %s sync method", self.__class__)
         self.sync()
 
-    def sync(self):
-        num_processes = min(len(self.tasks), self._sync_parallelism)
-        if num_processes == 0:
+    def sync(self, reconcile=False):
+        if self._event_receiver is not None:
+            self._process_task_events()
+            if (not reconcile and time.time() - self._last_reconciliation_time <
+                    self._task_events_reconciliation_interval):
+                return
+            self._last_reconciliation_time = time.time()
+
+        if not self.tasks:
             self.log.debug("No task to query celery, skipping sync")
             return
 
         self.log.debug("Inquiring about %s celery task(s) using %s processes",
-                       len(self.tasks), num_processes)
-
-        # Recreate the process pool each sync in case processes in the pool die
-        self._sync_pool = Pool(processes=num_processes)
+                       len(self.tasks), self._sync_parallelism)
 
         # Use chunking instead of a work queue to reduce context switching since tasks are
         # roughly uniform in size
         chunksize = self._num_tasks_per_fetch_process()
 
         self.log.debug("Waiting for inquiries to complete...")
-        task_keys_to_states = self._sync_pool.map(
-            fetch_celery_task_state,
-            self.tasks.items(),
-            chunksize=chunksize)
-        self._sync_pool.close()
-        self._sync_pool.join()
+        with Stats.timer('celery.fetch_states'):
+            task_keys_to_states = self._fetch_task_states(chunksize)
         self.log.debug("Inquiries completed.")
 
         for key_and_state in task_keys_to_states:
@@ -273,25 +421,103 @@ class CeleryExecutor(BaseExecutor):
                 )
                 continue
             key, state = key_and_state
+            self._update_task_state(key, state)
+
+    def _update_task_state(self, key, state):
+        try:
+            if self.last_state[key] != state:
+                if state == celery_states.SUCCESS:
+                    self.success(key)
+                    del self.tasks[key]
+                    del self.last_state[key]
+                elif state == celery_states.FAILURE:
+                    self.fail(key)
+                    del self.tasks[key]
+                    del self.last_state[key]
+                elif state == celery_states.REVOKED:
+                    self.fail(key)
+                    del self.tasks[key]
+                    del self.last_state[key]
+                else:
+                    self.log.info("Unexpected state: %s", state)
+                    self.last_state[key] = state
+        except Exception:
+            self.log.exception("Error syncing the Celery executor, ignoring it.")
+
+    def _process_task_events(self):
+        task_states = self._event_receiver.get_task_states()
+        if not task_states:
+            return
+        Stats.incr('celery.task_events', len(task_states))
+        task_ids_to_keys = {async_result.task_id: key
+                            for key, async_result in self.tasks.items()}
+        for task_id, state in task_states:
+            # Events of the tasks sent by other schedulers, or of the tasks
+            # whose states were already polled, are ignored
+            key = task_ids_to_keys.get(task_id)
+            if key is not None and key in self.tasks:
+                self._update_task_state(key, state)
+
+    def _fetch_task_states(self, chunksize):
+        """
+        Fetches the states of the running tasks, with a few bulk calls to the
+        result backend when it is a key-value store (e.g. Redis) or a database,
+        and by polling the tasks one by one in the sync pool otherwise.
+
+        :param chunksize: number of tasks polled by a process of the sync pool
+            at a time
+        :type chunksize: int
+        :return: the key and state of the tasks, or the exceptions raised while
+            fetching them
+        :rtype: list[tuple[str, str] | ExceptionWithTraceback]
+        """
+        backend = app.backend
+        if isinstance(backend, KeyValueStoreBackend):
+            fetch_states = self._fetch_states_from_kv_backend
+        elif isinstance(backend, DatabaseBackend):
+            fetch_states = self._fetch_states_from_db_backend
+        else:
+            return self._map_in_sync_pool(
+                fetch_celery_task_state,
+                list(self.tasks.items()),
+                chunksize=chunksize)
+
+        items = list(self.tasks.items())
+        task_keys_to_states = []
+        for i in range(0, len(items), BULK_STATE_FETCH_BATCH_SIZE):
+            batch = items[i:i + BULK_STATE_FETCH_BATCH_SIZE]
             try:
-                if self.last_state[key] != state:
-                    if state == celery_states.SUCCESS:
-                        self.success(key)
-                        del self.tasks[key]
-                        del self.last_state[key]
-                    elif state == celery_states.FAILURE:
-                        self.fail(key)
-                        del self.tasks[key]
-                        del self.last_state[key]
-                    elif state == celery_states.REVOKED:
-                        self.fail(key)
-                        del self.tasks[key]
-                        del self.last_state[key]
-                    else:
-                        self.log.info("Unexpected state: %s", state)
-                        self.last_state[key] = state
-            except Exception:
-                self.log.exception("Error syncing the Celery executor, ignoring it.")
+                task_ids = [async_result.task_id for _, async_result in batch]
+                with timeout(seconds=OPERATION_TIMEOUT):
+                    states_by_task_id = fetch_states(backend, task_ids)
+            except Exception as e:
+                exception_traceback = "Celery Task keys: {}\n{}".format(
+                    [key for key, _ in batch], traceback.format_exc())
+                task_keys_to_states.append(ExceptionWithTraceback(e, exception_traceback))
+                continue
+            task_keys_to_states.extend(
+                (key, states_by_task_id.get(task_id, celery_states.PENDING))
+                for (key, _), task_id in zip(batch, task_ids))
+        return task_keys_to_states
+
+    @staticmethod
+    def _fetch_states_from_kv_backend(backend, task_ids):
+        keys = [backend.get_key_for_task(task_id) for task_id in task_ids]
+        values = backend.mget(keys)
+        return {
+            task_id: backend.decode_result(value)['status']
+            for task_id, value in zip(task_ids, values) if value
+        }
+
+    @staticmethod
+    def _fetch_states_from_db_backend(backend, task_ids):
+        session = backend.ResultSession()
+        try:
+            tasks = session.query(TaskDb.task_id, TaskDb.status).filter(
+                TaskDb.task_id.in_(task_ids)).all()
+        finally:
+            session.close()
+        return dict(tasks)
 
     def end(self, synchronous=False):
         if synchronous:
@@ -299,4 +525,14 @@ class CeleryExecutor(BaseExecutor):
                     task.state not in celery_states.READY_STATES
                     for task in self.tasks.values()]):
                 time.sleep(5)
-        self.sync()
+        self.sync(reconcile=True)
+        self._stop()
+
+    def terminate(self):
+        self._stop()
+
+    def _stop(self):
+        if self._event_receiver is not None:
+            self._event_receiver.stop()
+            self._event_receiver = None
+        self._terminate_sync_pool()
@@ -17,17 +17,32 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import warnings
+from collections import defaultdict
+
 import distributed
 import subprocess
-import warnings
 
 from airflow import configuration
 from airflow.executors.base_executor import BaseExecutor
 
 
+def _run_airflow_command(command):
+    return subprocess.check_call(command, close_fds=True)
+
+
 class DaskExecutor(BaseExecutor):
     """
     DaskExecutor submits tasks to a Dask Distributed cluster.
+
+    The tasks queued in a heartbeat are submitted together, with one
+    ``Client.map`` call per set of required worker resources. When
+    ``queues_as_resources`` is enabled in the ``[dask]`` section, tasks of a
+    queue other than the default one require one unit of the worker resource
+    named after the queue, so they only run on the workers started with it,
+    e.g. ``dask-worker --resources "gpu=1"``, otherwise queues are ignored.
+    Other resources can be required with
+    ``executor_config={"DaskExecutor": {"resources": {"memory": 8e9}}}``.
     """
     def __init__(self, cluster_address=None):
         if cluster_address is None:
@@ -40,6 +55,9 @@ class DaskExecutor(BaseExecutor):
         self.tls_ca = configuration.get('dask', 'tls_ca')
         self.tls_key = configuration.get('dask', 'tls_key')
         self.tls_cert = configuration.get('dask', 'tls_cert')
+        self.default_queue = configuration.conf.get('celery', 'default_queue')
+        self.queues_as_resources = configuration.conf.getboolean(
+            'dask', 'queues_as_resources')
         super().__init__(parallelism=0)
 
     def start(self):
@@ -56,42 +74,67 @@ class DaskExecutor(BaseExecutor):
 
         self.client = distributed.Client(self.cluster_address, security=security)
         self.futures = {}
+        self._completed = distributed.as_completed()
+        # Map from the resources tasks require to the tasks waiting to be submitted
+        self._pending = defaultdict(list)
 
-    def execute_async(self, key, command, queue=None, executor_config=None):
-        if queue is not None:
-            warnings.warn(
-                'DaskExecutor does not support queues. '
-                'All tasks will be run in the same cluster'
-            )
+    def _get_resources(self, queue, executor_config):
+        """
+        :return: the Dask worker resources a task requires
+        :rtype: dict
+        """
+        resources = {}
+        if queue is not None and queue != self.default_queue:
+            if self.queues_as_resources:
+                resources[queue] = 1
+            else:
+                warnings.warn(
+                    'DaskExecutor only supports queues when queues_as_resources '
+                    'is enabled. All tasks will be run in the same cluster'
+                )
+        if executor_config:
+            from airflow.executors import Executors
+            resources.update(
+                executor_config.get(Executors.DaskExecutor, {}).get('resources', {}))
+        return resources
 
-        def airflow_run():
-            return subprocess.check_call(command, shell=True, close_fds=True)
+    def execute_async(self, key, command, queue=None, executor_config=None):
+        resources = self._get_resources(queue, executor_config)
+        self._pending[tuple(sorted(resources.items()))].append((key, command))
 
-        future = self.client.submit(airflow_run, pure=False)
-        self.futures[future] = key
+    def _submit_pending(self):
+        for resources, tasks in self._pending.items():
+            keys, commands = zip(*tasks)
+            futures = self.client.map(_run_airflow_command, commands, pure=False,
+                                      resources=dict(resources) or None)
+            for key, future in zip(keys, futures):
+                self.futures[future] = key
+            self._completed.update(futures)
+            self.log.debug("Submitted %s tasks requiring %s", len(futures), resources)
+        self._pending.clear()
 
     def _process_future(self, future):
-        if future.done():
-            key = self.futures[future]
-            if future.exception():
-                self.log.error("Failed to execute task: %s", repr(future.exception()))
-                self.fail(key)
-            elif future.cancelled():
-                self.log.error("Failed to execute task")
-                self.fail(key)
-            else:
-                self.success(key)
-            self.futures.pop(future)
+        key = self.futures.pop(future)
+        if future.cancelled():
+            self.log.error("Failed to execute task")
+            self.fail(key)
+        elif future.exception():
+            self.log.error("Failed to execute task: %s", repr(future.exception()))
+            self.fail(key)
+        else:
+            self.success(key)
 
     def sync(self):
-        # make a copy so futures can be popped during iteration
-        for future in self.futures.copy():
+        self._submit_pending()
+        for future in self._completed.next_batch(block=False):
             self._process_future(future)
 
     def end(self):
-        for future in distributed.as_completed(self.futures.copy()):
+        self._submit_pending()
+        for future in self._completed:
             self._process_future(future)
 
     def terminate(self):
-        self.client.cancel(self.futures.keys())
+        self._pending.clear()
+        self.client.cancel(list(self.futures.keys()))
         self.end()
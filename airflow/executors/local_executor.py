@@ -38,18 +38,30 @@ the LocalExecutor, the worker processes are running waiting for tasks, once the
 LocalExecutor receives the call to shutdown the executor a poison token is sent to the
 workers to terminate them. Processes used in this strategy are of class QueuedLocalWorker.
 
+In both strategies, workers run each command in a new Python interpreter by default.
+When `[core] local_executor_fork_tasks` is set, they instead run the `airflow` command
+in a child forked from the worker, which has already imported Airflow and the
+`[core] local_executor_preload_modules`, so that the `airflow run --local` process
+of a task does not start a new Python interpreter. The task itself is run by the
+`[core] task_runner`, so it only starts without a new interpreter and without
+parsing its DAG again when the ForkTaskRunner is used too.
+
 Arguably, `SequentialExecutor` could be thought as a LocalExecutor with limited
 parallelism of just 1 worker, i.e. `self.parallelism = 1`.
 This option could lead to the unification of the executor implementations, running
 locally, into just one `LocalExecutor` with multiple modes.
 """
 
+import importlib
 import multiprocessing
+import os
+import signal
 import subprocess
 
 from builtins import range
 from queue import Empty
 
+from airflow import configuration, settings
 from airflow.executors.base_executor import BaseExecutor
 from airflow.utils.log.logging_mixin import LoggingMixin
 from airflow.utils.state import State
@@ -60,14 +72,22 @@ class LocalWorker(multiprocessing.Process, LoggingMixin):
     """LocalWorker Process implementation to run airflow commands. Executes the given
     command and puts the result into a result queue when done, terminating execution."""
 
-    def __init__(self, result_queue):
+    def __init__(self, result_queue, fork_tasks=False, preload_modules=()):
         """
         :param result_queue: the queue to store result states tuples (key, State)
         :type result_queue: multiprocessing.Queue
+        :param fork_tasks: whether to run the commands in a forked child instead
+            of a new Python interpreter
+        :type fork_tasks: bool
+        :param preload_modules: modules to import before running commands in
+            forked children
+        :type preload_modules: list[unicode]
         """
         super().__init__()
         self.daemon = True
         self.result_queue = result_queue
+        self.fork_tasks = fork_tasks
+        self.preload_modules = list(preload_modules)
         self.key = None
         self.command = None
 
@@ -82,17 +102,74 @@ class LocalWorker(multiprocessing.Process, LoggingMixin):
         if key is None:
             return
         self.log.info("%s running %s", self.__class__.__name__, command)
+        if self.fork_tasks:
+            state = self._execute_work_in_fork(command)
+        else:
+            state = self._execute_work_in_subprocess(command)
+        self.result_queue.put((key, state))
+
+    def _execute_work_in_subprocess(self, command):
         try:
             subprocess.check_call(command, close_fds=True)
-            state = State.SUCCESS
+            return State.SUCCESS
         except subprocess.CalledProcessError as e:
-            state = State.FAILED
             self.log.error("Failed to execute task %s.", str(e))
             # TODO: Why is this commented out?
             # raise e
-        self.result_queue.put((key, state))
+            return State.FAILED
+
+    def _execute_work_in_fork(self, command):
+        """
+        Runs an ``airflow`` command in a forked child, parsing its arguments
+        with the CLI parser, and waits for it to exit.
+
+        :return: the state of the command
+        """
+        pid = os.fork()
+        if pid:
+            _, status = os.waitpid(pid, 0)
+            if status == 0:
+                return State.SUCCESS
+            self.log.error("Failed to execute task %s, exit status %s.", command, status)
+            return State.FAILED
+
+        exit_code = 1
+        try:
+            # The child must not run the signal handlers of the scheduler
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+            # Database connections can't be shared with the parent
+            settings.engine.dispose()
+            settings.configure_orm()
+
+            from airflow.bin.cli import get_parser
+            # Skip the name of the executable
+            args = get_parser().parse_args(command[1:])
+            args.func(args)
+            exit_code = 0
+        except SystemExit as e:
+            exit_code = 0 if e.code in (None, 0) else 1
+        except Exception:
+            self.log.exception("Failed to execute task %s.", command)
+        finally:
+            os._exit(exit_code)
+
+    def preload(self):
+        """
+        Imports the modules the commands run in forked children need, so that
+        the children don't import them again.
+        """
+        if not self.fork_tasks:
+            return
+        for module in ['airflow.bin.cli'] + self.preload_modules:
+            try:
+                importlib.import_module(module)
+            except Exception:
+                self.log.exception("Could not preload %s", module)
 
     def run(self):
+        self.preload()
         self.execute_work(self.key, self.command)
 
 
@@ -102,11 +179,13 @@ class QueuedLocalWorker(LocalWorker):
     continue executing commands as they become available in the queue. It will terminate
     execution once the poison token is found."""
 
-    def __init__(self, task_queue, result_queue):
-        super().__init__(result_queue=result_queue)
+    def __init__(self, task_queue, result_queue, fork_tasks=False, preload_modules=()):
+        super().__init__(result_queue=result_queue, fork_tasks=fork_tasks,
+                         preload_modules=preload_modules)
         self.task_queue = task_queue
 
     def run(self):
+        self.preload()
         while True:
             key, command = self.task_queue.get()
             try:
@@ -147,7 +226,9 @@ class LocalExecutor(BaseExecutor):
             :param command: the command to execute
             :type command: str
             """
-            local_worker = LocalWorker(self.executor.result_queue)
+            local_worker = LocalWorker(self.executor.result_queue,
+                                       fork_tasks=self.executor.fork_tasks,
+                                       preload_modules=self.executor.preload_modules)
             local_worker.key = key
             local_worker.command = command
             self.executor.workers_used += 1
@@ -174,7 +255,9 @@ class LocalExecutor(BaseExecutor):
         def start(self):
             self.queue = self.executor.manager.Queue()
             self.executor.workers = [
-                QueuedLocalWorker(self.queue, self.executor.result_queue)
+                QueuedLocalWorker(self.queue, self.executor.result_queue,
+                                  fork_tasks=self.executor.fork_tasks,
+                                  preload_modules=self.executor.preload_modules)
                 for _ in range(self.executor.parallelism)
             ]
 
@@ -218,6 +301,10 @@ class LocalExecutor(BaseExecutor):
         self.workers = []
         self.workers_used = 0
         self.workers_active = 0
+        self.fork_tasks = configuration.conf.getboolean('core', 'local_executor_fork_tasks')
+        self.preload_modules = [
+            module.strip() for module in configuration.conf.get(
+                'core', 'local_executor_preload_modules').split(',') if module.strip()]
         self.impl = (LocalExecutor._UnlimitedParallelism(self) if self.parallelism == 0
                      else LocalExecutor._LimitedParallelism(self))
 
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import heapq
+import itertools
+import random
+import time
+
+from sqlalchemy import func
+
+from airflow import configuration
+from airflow.exceptions import AirflowConfigException
+from airflow.executors.base_executor import BaseExecutor
+from airflow.utils import timezone
+from airflow.utils.db import provide_session
+from airflow.utils.state import State
+
+# Name of a distribution of durations -> (number of parameters, sampler)
+DURATION_DISTRIBUTIONS = {
+    'constant': (1, lambda rnd, seconds: seconds),
+    'uniform': (2, lambda rnd, low, high: rnd.uniform(low, high)),
+    'exponential': (1, lambda rnd, mean: rnd.expovariate(1.0 / mean) if mean else 0.0),
+    'lognormal': (2, lambda rnd, mu, sigma: rnd.lognormvariate(mu, sigma)),
+}
+
+
+def get_duration_sampler(spec):
+    """
+    Returns a function drawing durations from the distribution described by
+    ``spec``, one of ``constant:<seconds>``, ``uniform:<min>,<max>``,
+    ``exponential:<mean>`` or ``lognormal:<mu>,<sigma>``. Durations are in
+    seconds, and negative durations are drawn as 0.
+
+    :param spec: description of the distribution
+    :type spec: str
+    :return: a function of a ``random.Random`` returning a duration
+    :rtype: callable
+    """
+    name, _, params = spec.strip().partition(':')
+    if name not in DURATION_DISTRIBUTIONS:
+        raise AirflowConfigException(
+            "Unknown duration distribution {!r}, expected one of {}".format(
+                name, ", ".join(sorted(DURATION_DISTRIBUTIONS))))
+    num_params, sampler = DURATION_DISTRIBUTIONS[name]
+    try:
+        params = [float(param) for param in params.split(',')] if params else []
+    except ValueError:
+        raise AirflowConfigException(
+            "Invalid parameters for the duration distribution {!r}".format(spec))
+    if len(params) != num_params:
+        raise AirflowConfigException(
+            "The duration distribution {} takes {} parameter(s), got {!r}".format(
+                name, num_params, spec))
+
+    def sample(rnd):
+        return max(sampler(rnd, *params), 0.0)
+    return sample
+
+
+class SimulatedExecutor(BaseExecutor):
+    """
+    SimulatedExecutor does not run the task instances it is sent. Every task
+    instance takes one of the slots of the executor for a simulated duration,
+    drawn from a configurable distribution, and then succeeds or fails at a
+    configurable rate. It is meant to measure the capacity of the scheduler
+    without the cost of running tasks.
+
+    The outcome is reported through ``change_state`` and, unless ``update_db``
+    is False, written to the task instances in the metadata database like the
+    task would do itself, with a bulk update per heartbeat. Failed task
+    instances are set to FAILED directly, retries are not simulated.
+
+    :param slots: how many task instances can be running at the same time,
+        ``0`` for infinity
+    :type slots: int
+    :param duration: distribution of the durations of the task instances,
+        see :func:`get_duration_sampler`
+    :type duration: str
+    :param failure_rate: probability for a task instance to fail
+    :type failure_rate: float
+    :param seed: seed of the random generator, for reproducible runs
+    :type seed: int
+    :param update_db: whether to set the state of the task instances in the
+        metadata database
+    :type update_db: bool
+    """
+
+    def __init__(self, slots=None, duration=None, failure_rate=None, seed=None,
+                 update_db=True):
+        if slots is None:
+            slots = configuration.conf.getint('simulated_executor', 'slots')
+        if duration is None:
+            duration = configuration.conf.get('simulated_executor', 'duration')
+        if failure_rate is None:
+            failure_rate = configuration.conf.getfloat('simulated_executor',
+                                                       'failure_rate')
+        if seed is None:
+            seed = configuration.conf.get('simulated_executor', 'seed') or None
+        super().__init__(parallelism=slots)
+
+        self.sample_duration = get_duration_sampler(duration)
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.update_db = update_db
+
+        # Heap of (end time, sequence number, key, state) of the running tasks
+        self._ending = []
+        self._sequence = itertools.count()
+        self._started = []
+
+    def execute_async(self, key, command, queue=None, executor_config=None):
+        duration = self.sample_duration(self.random)
+        state = State.FAILED if self.random.random() < self.failure_rate else State.SUCCESS
+        heapq.heappush(self._ending,
+                       (time.time() + duration, next(self._sequence), key, state))
+        self._started.append(key)
+
+    def sync(self):
+        now = time.time()
+        ended = []
+        while self._ending and self._ending[0][0] <= now:
+            _, _, key, state = heapq.heappop(self._ending)
+            ended.append((key, state))
+
+        if self.update_db:
+            ended_keys = set(key for key, _ in ended)
+            self._set_states(
+                started=[key for key in self._started if key not in ended_keys],
+                ended=ended)
+        self._started = []
+
+        for key, state in ended:
+            self.change_state(key, state)
+
+    @provide_session
+    def _set_states(self, started, ended, session=None):
+        """
+        Sets the state of the task instances that started or ended since the last
+        sync in the metadata database, with one update per state.
+        """
+        from airflow.models import TaskInstance as TI
+
+        now = timezone.utcnow()
+        TI.bulk_set_state(
+            [key[:3] for key in started], [State.QUEUED], State.RUNNING,
+            values={'start_date': now}, session=session)
+        for state in (State.SUCCESS, State.FAILED):
+            TI.bulk_set_state(
+                [key[:3] for key, key_state in ended if key_state == state],
+                [State.QUEUED, State.RUNNING], state,
+                values={'start_date': func.coalesce(TI.start_date, now),
+                        'end_date': now},
+                session=session)
+        session.commit()
+
+    def end(self):
+        self.heartbeat()
+        while self.queued_tasks or self._ending:
+            if self._ending:
+                time.sleep(min(max(self._ending[0][0] - time.time(), 0), 1))
+            self.heartbeat()
+
+    def terminate(self):
+        self._ending = []
+        self._started = []
@@ -18,6 +18,7 @@
 # under the License.
 
 import getpass
+import importlib
 import logging
 import multiprocessing
 import os
@@ -40,7 +41,7 @@ from airflow import configuration as conf
 from airflow import executors, models, settings
 from airflow.exceptions import (AirflowException, DagConcurrencyLimitReached,
                                 NoAvailablePoolSlot, PoolNotFound)
-from airflow.models import DAG, DagPickle, DagRun, SlaMiss, errors
+from airflow.models import DAG, DagPickle, DagRun, SerializedDagModel, SlaMiss, errors
 from airflow.stats import Stats
 from airflow.task.task_runner import get_task_runner
 from airflow.ti_deps.dep_context import DepContext, QUEUE_DEPS, RUN_DEPS
@@ -55,6 +56,7 @@ from airflow.utils.dag_processing import (AbstractDagFileProcessor,
 from airflow.utils.db import create_session, provide_session
 from airflow.utils.email import get_email_address_list, send_email
 from airflow.utils.log.logging_mixin import LoggingMixin, StreamLogWriter, set_context
+from airflow.utils.loop_profiler import LoopPhaseProfiler
 from airflow.utils.net import get_hostname
 from airflow.utils.sqlalchemy import UtcDateTime
 from airflow.utils.state import State
@@ -526,6 +528,329 @@ class DagFileProcessor(AbstractDagFileProcessor, LoggingMixin):
         return self._start_time
 
 
+class DagFileProcessorWorker(LoggingMixin):
+    """
+    Long-lived process of a DagFileProcessorPool. It configures the ORM and
+    imports the preloaded modules once, then processes the files it is sent
+    one after the other, and exits after ``max_files`` files to bound the
+    growth of its memory.
+
+    :param name: the name of the process
+    :type name: unicode
+    :param pickle_dags: whether to serialize the DAG objects to the DB
+    :type pickle_dags: bool
+    :param dag_id_white_list: If specified, only look at these DAG ID's
+    :type dag_id_white_list: list[unicode]
+    :param max_files: number of files to process before exiting, 0 for no limit
+    :type max_files: int
+    :param preload_modules: modules to import before processing any file
+    :type preload_modules: list[unicode]
+    """
+
+    def __init__(self, name, pickle_dags, dag_id_white_list, max_files, preload_modules):
+        self.max_files = max_files
+        self.num_files = 0
+        self._conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=DagFileProcessorWorker._run,
+            args=(self._conn, child_conn, pickle_dags, dag_id_white_list,
+                  max_files, preload_modules, name),
+            name="{}-Process".format(name))
+        self._process.daemon = True
+        self._process.start()
+        child_conn.close()
+
+    @staticmethod
+    def _run(parent_conn, conn, pickle_dags, dag_id_white_list, max_files,
+             preload_modules, thread_name):
+        # This runs in the worker process
+        parent_conn.close()
+        log = logging.getLogger("airflow.processor")
+        threading.current_thread().name = thread_name
+
+        # Re-configure the ORM engine as there are issues with multiple processes
+        settings.configure_orm()
+        for module in preload_modules:
+            try:
+                importlib.import_module(module)
+            except Exception:
+                log.exception("Failed to preload %s", module)
+        preloaded_modules = set(sys.modules)
+        dags_folder = os.path.join(os.path.realpath(settings.DAGS_FOLDER), '')
+
+        try:
+            num_files = 0
+            while not max_files or num_files < max_files:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    break
+                if request is None:
+                    break
+                file_path, zombies = request
+                num_files += 1
+
+                set_context(log, file_path)
+                sys.stdout = StreamLogWriter(log, logging.INFO)
+                sys.stderr = StreamLogWriter(log, logging.WARN)
+                result = None
+                try:
+                    start_time = time.time()
+                    log.info("Started process (PID=%s) to work on %s",
+                             os.getpid(), file_path)
+                    scheduler_job = SchedulerJob(dag_ids=dag_id_white_list, log=log)
+                    result = scheduler_job.process_file(file_path, zombies, pickle_dags)
+                    log.info("Processing %s took %.3f seconds",
+                             file_path, time.time() - start_time)
+                except Exception:
+                    log.exception("Got an exception while processing %s", file_path)
+                finally:
+                    sys.stdout = sys.__stdout__
+                    sys.stderr = sys.__stderr__
+
+                # Forget the modules of the DAGs folder imported by the file, so
+                # that the next files import their latest version
+                for name in set(sys.modules) - preloaded_modules:
+                    module_file = getattr(sys.modules[name], '__file__', None) or ''
+                    if os.path.realpath(module_file).startswith(dags_folder):
+                        del sys.modules[name]
+
+                conn.send(result)
+        finally:
+            settings.dispose_orm()
+
+    @property
+    def pid(self):
+        return self._process.pid
+
+    @property
+    def exit_code(self):
+        return self._process.exitcode
+
+    @property
+    def retired(self):
+        """
+        :return: whether the worker exits after the file it is processing
+        :rtype: bool
+        """
+        return bool(self.max_files) and self.num_files >= self.max_files
+
+    def is_alive(self):
+        return self._process.is_alive()
+
+    def submit(self, file_path, zombies):
+        self.num_files += 1
+        self._conn.send((file_path, zombies))
+
+    def poll(self):
+        """
+        :return: whether the result of the file being processed is available
+        :rtype: bool
+        """
+        return self._conn.poll()
+
+    def receive(self):
+        """
+        :return: the result of the file that was processed, or None if the worker
+            died while processing it
+        :rtype: list[airflow.utils.dag_processing.SimpleDag]
+        """
+        try:
+            return self._conn.recv()
+        except (EOFError, OSError):
+            return None
+
+    def stop(self):
+        """
+        Asks the worker to exit once it is done with the file it is processing.
+        """
+        try:
+            self._conn.send(None)
+        except (EOFError, OSError):
+            pass
+        self._process.join(5)
+        self.kill()
+
+    def kill(self, sigkill=False):
+        if self._process.is_alive():
+            self._process.terminate()
+            # Arbitrarily wait 5s for the process to die
+            self._process.join(5)
+        if sigkill and self._process.is_alive():
+            self.log.warning("Killing PID %s", self._process.pid)
+            os.kill(self._process.pid, signal.SIGKILL)
+        self._conn.close()
+
+
+class DagFileProcessorPool(LoggingMixin):
+    """
+    Pool of long-lived processes calling SchedulerJob.process_file(), to avoid
+    paying for a new process, with a new ORM engine, for every file. Workers are
+    started lazily, in the process the processors are started from, and are
+    replaced once they processed ``max_files_per_worker`` files or died. The
+    pool is the processor factory of the DagFileProcessorManager, which stops
+    the idle workers when it ends.
+
+    :param pickle_dags: whether to serialize the DAG objects to the DB
+    :type pickle_dags: bool
+    :param dag_id_white_list: If specified, only look at these DAG ID's
+    :type dag_id_white_list: list[unicode]
+    :param max_files_per_worker: number of files a worker processes before being
+        replaced, 0 for no limit
+    :type max_files_per_worker: int
+    :param preload_modules: modules the workers import before processing files
+    :type preload_modules: list[unicode]
+    """
+
+    def __init__(self, pickle_dags, dag_id_white_list, max_files_per_worker=0,
+                 preload_modules=()):
+        self._pickle_dags = pickle_dags
+        self._dag_id_white_list = dag_id_white_list
+        self._max_files_per_worker = max_files_per_worker
+        self._preload_modules = list(preload_modules)
+        self._idle_workers = []
+        self._num_workers_started = 0
+
+    def __call__(self, file_path, zombies):
+        return self.get_processor(file_path, zombies)
+
+    def get_processor(self, file_path, zombies):
+        """
+        :param file_path: a Python file containing Airflow DAG definitions
+        :type file_path: unicode
+        :param zombies: zombie task instances to kill
+        :type zombies: list[airflow.utils.dag_processing.SimpleTaskInstance]
+        :rtype: PooledDagFileProcessor
+        """
+        return PooledDagFileProcessor(self, file_path, zombies)
+
+    def acquire_worker(self):
+        while self._idle_workers:
+            worker = self._idle_workers.pop()
+            if worker.is_alive():
+                return worker
+            worker.kill()
+
+        worker = DagFileProcessorWorker(
+            "DagFileProcessorWorker{}".format(self._num_workers_started),
+            self._pickle_dags,
+            self._dag_id_white_list,
+            self._max_files_per_worker,
+            self._preload_modules)
+        self._num_workers_started += 1
+        Stats.incr('dag_processing.worker_starts')
+        return worker
+
+    def release_worker(self, worker):
+        if worker.retired or not worker.is_alive():
+            worker.kill()
+        else:
+            self._idle_workers.append(worker)
+
+    def get_all_pids(self):
+        """
+        :return: the PIDs of the idle workers
+        :rtype: list[int]
+        """
+        return [worker.pid for worker in self._idle_workers]
+
+    def terminate(self):
+        """
+        Stops the idle workers.
+        """
+        for worker in self._idle_workers:
+            worker.stop()
+        self._idle_workers = []
+
+
+class PooledDagFileProcessor(AbstractDagFileProcessor, LoggingMixin):
+    """Processes a file with a worker of a DagFileProcessorPool."""
+
+    def __init__(self, pool, file_path, zombies):
+        """
+        :param pool: the pool to get a worker from
+        :type pool: DagFileProcessorPool
+        :param file_path: a Python file containing Airflow DAG definitions
+        :type file_path: unicode
+        :param zombies: zombie task instances to kill
+        :type zombies: list[airflow.utils.dag_processing.SimpleTaskInstance]
+        """
+        self._pool = pool
+        self._file_path = file_path
+        self._zombies = zombies
+        self._worker = None
+        self._result = None
+        self._done = False
+        self._exit_code = None
+        self._start_time = None
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+    def start(self):
+        """
+        Send the file to an idle worker of the pool.
+        """
+        self._worker = self._pool.acquire_worker()
+        self._worker.submit(self._file_path, self._zombies)
+        self._start_time = timezone.utcnow()
+
+    def terminate(self, sigkill=False):
+        """
+        Terminate (and then kill) the worker processing the file, the pool
+        replaces it.
+
+        :param sigkill: whether to issue a SIGKILL if SIGTERM doesn't work.
+        :type sigkill: bool
+        """
+        if self._worker is None:
+            raise AirflowException("Tried to call stop before starting!")
+        self._worker.kill(sigkill)
+
+    @property
+    def pid(self):
+        if self._worker is None:
+            raise AirflowException("Tried to get PID before starting!")
+        return self._worker.pid
+
+    @property
+    def exit_code(self):
+        if not self._done:
+            raise AirflowException("Tried to call retcode before process was finished!")
+        return self._exit_code
+
+    @property
+    def done(self):
+        if self._worker is None:
+            raise AirflowException("Tried to see if it's done before starting!")
+
+        if self._done:
+            return True
+
+        if self._worker.poll():
+            self._result = self._worker.receive()
+        elif self._worker.is_alive():
+            return False
+
+        self._done = True
+        self._exit_code = 0 if self._worker.is_alive() else self._worker.exit_code
+        self._pool.release_worker(self._worker)
+        return True
+
+    @property
+    def result(self):
+        if not self.done:
+            raise AirflowException("Tried to get the result before it's done!")
+        return self._result
+
+    @property
+    def start_time(self):
+        if self._start_time is None:
+            raise AirflowException("Tried to get start time before it started!")
+        return self._start_time
+
+
 class SchedulerJob(BaseJob):
     """
     This SchedulerJob runs for a specific time interval and schedules the jobs
@@ -548,6 +873,8 @@ class SchedulerJob(BaseJob):
             processor_poll_interval=conf.getfloat('scheduler', 'processor_poll_interval'),
             do_pickle=False,
             log=None,
+            profile_loops=None,
+            profile_trace_file=None,
             *args, **kwargs):
         """
         :param dag_id: if specified, only schedule tasks with this DAG ID
@@ -566,6 +893,12 @@ class SchedulerJob(BaseJob):
         :param do_pickle: once a DAG object is obtained by executing the Python
             file, whether to serialize the DAG object to the DB
         :type do_pickle: bool
+        :param profile_loops: if specified, exit after this number of scheduler
+            loops and log the timings of their phases
+        :type profile_loops: int
+        :param profile_trace_file: if specified, write the timings of the phases
+            of every scheduler loop to this file as lines of JSON
+        :type profile_trace_file: unicode
         """
         # for BaseJob compatibility
         self.dag_id = dag_id
@@ -579,6 +912,11 @@ class SchedulerJob(BaseJob):
         self._processor_poll_interval = processor_poll_interval
 
         self.do_pickle = do_pickle
+
+        self.profile_loops = profile_loops
+        self.loop_profiler = LoopPhaseProfiler(
+            stat_prefix='scheduler.loop',
+            trace_file=profile_trace_file)
         super().__init__(*args, **kwargs)
 
         self.heartrate = conf.getint('scheduler', 'SCHEDULER_HEARTBEAT_SEC')
@@ -592,6 +930,9 @@ class SchedulerJob(BaseJob):
             self.using_sqlite = True
 
         self.max_tis_per_query = conf.getint('scheduler', 'max_tis_per_query')
+        self.batch_task_instance_scheduling = conf.getboolean(
+            'scheduler', 'batch_task_instance_scheduling')
+        self.store_serialized_dags = conf.getboolean('core', 'store_serialized_dags')
         self.processor_agent = None
         self._last_loop = False
 
@@ -936,9 +1277,16 @@ class SchedulerJob(BaseJob):
         for run in active_dag_runs:
             self.log.debug("Examining active DAG run: %s", run)
             # this needs a fresh session sometimes tis get detached
-            tis = run.get_task_instances(state=(State.NONE,
-                                                State.UP_FOR_RETRY,
-                                                State.UP_FOR_RESCHEDULE))
+            run_tis = run.get_task_instances()
+            tis = [ti for ti in run_tis if ti.state in (State.NONE,
+                                                        State.UP_FOR_RETRY,
+                                                        State.UP_FOR_RESCHEDULE)]
+            # the trigger rules of all the task instances of the run are evaluated
+            # in memory against its finished task instances
+            dep_context = DepContext(
+                flag_upstream_failed=True,
+                finished_tasks=[ti for ti in run_tis
+                                if ti.state in State.finished() + [State.UPSTREAM_FAILED]])
 
             # this loop is quite slow as it uses are_dependencies_met for
             # every task (in ti.is_runnable). This is also called in
@@ -950,7 +1298,7 @@ class SchedulerJob(BaseJob):
                 ti.task = task
 
                 if ti.are_dependencies_met(
-                        dep_context=DepContext(flag_upstream_failed=True),
+                        dep_context=dep_context,
                         session=session):
                     self.log.debug('Queuing task: %s', ti)
                     task_instances_list.append(ti.key)
@@ -988,12 +1336,17 @@ class SchedulerJob(BaseJob):
                 models.DagRun.state != State.RUNNING,
                 models.DagRun.state.is_(None)))
         if self.using_sqlite:
-            tis_to_change = query \
-                .with_for_update() \
+            keys_to_change = query \
+                .with_entities(models.TaskInstance.dag_id,
+                               models.TaskInstance.task_id,
+                               models.TaskInstance.execution_date) \
                 .all()
-            for ti in tis_to_change:
-                ti.set_state(new_state, session=session)
-                tis_changed += 1
+            tis_changed = len(models.TaskInstance.bulk_set_state(
+                keys=keys_to_change,
+                old_states=old_states,
+                new_state=new_state,
+                session=session))
+            session.commit()
         else:
             subq = query.subquery()
             tis_changed = session \
@@ -1016,29 +1369,33 @@ class SchedulerJob(BaseJob):
     @provide_session
     def __get_concurrency_maps(self, states, session=None):
         """
-        Get the concurrency maps.
+        Get the concurrency maps with a single grouped query, shared by the whole
+        selection of executable task instances.
 
         :param states: List of states to query for
         :type states: list[airflow.utils.state.State]
-        :return: A map from (dag_id, task_id) to # of task instances and
-         a map from (dag_id, task_id) to # of task instances in the given state list
-        :rtype: dict[tuple[str, str], int]
+        :return: A map from pool to # of task instances, a map from dag_id to
+         # of task instances and a map from (dag_id, task_id) to # of task
+         instances in the given state list
+        :rtype: tuple[dict[str, int], dict[str, int], dict[tuple[str, str], int]]
 
         """
         TI = models.TaskInstance
         ti_concurrency_query = (
             session
-            .query(TI.task_id, TI.dag_id, func.count('*'))
+            .query(TI.pool, TI.dag_id, TI.task_id, func.count('*'))
             .filter(TI.state.in_(states))
-            .group_by(TI.task_id, TI.dag_id)
+            .group_by(TI.pool, TI.dag_id, TI.task_id)
         ).all()
+        pool_map = defaultdict(int)
         dag_map = defaultdict(int)
         task_map = defaultdict(int)
         for result in ti_concurrency_query:
-            task_id, dag_id, count = result
+            pool, dag_id, task_id, count = result
+            pool_map[pool] += count
             dag_map[dag_id] += count
-            task_map[(dag_id, task_id)] = count
-        return dag_map, task_map
+            task_map[(dag_id, task_id)] += count
+        return pool_map, dag_map, task_map
 
     @provide_session
     def _find_executable_task_instances(self, simple_dag_bag, states, session=None):
@@ -1057,6 +1414,13 @@ class SchedulerJob(BaseJob):
         """
         executable_tis = []
 
+        # Don't look for task instances the executor could not take
+        executor_open_slots = self.executor.get_open_slots()
+        if executor_open_slots == 0:
+            self.log.info("Not looking for tasks to execute since the executor "
+                          "has no open slots")
+            return executable_tis
+
         # Get all task instances associated with scheduled
         # DagRuns which are not backfilled, in the given states,
         # and the dag is not paused
@@ -1086,7 +1450,8 @@ class SchedulerJob(BaseJob):
         else:
             ti_query = ti_query.filter(TI.state.in_(states))
 
-        task_instances_to_examine = ti_query.all()
+        with Stats.timer('scheduler.find_executable_task_instances.query_candidates'):
+            task_instances_to_examine = ti_query.all()
 
         if len(task_instances_to_examine) == 0:
             self.log.debug("No tasks to consider for execution.")
@@ -1100,28 +1465,37 @@ class SchedulerJob(BaseJob):
             task_instance_str
         )
 
-        # Get the pool settings
-        pools = {p.pool: p for p in session.query(models.Pool).all()}
-
         pool_to_task_instances = defaultdict(list)
         for task_instance in task_instances_to_examine:
             pool_to_task_instances[task_instance.pool].append(task_instance)
 
         states_to_count_as_running = [State.RUNNING, State.QUEUED]
-        # dag_id to # of running tasks and (dag_id, task_id) to # of running tasks.
-        dag_concurrency_map, task_concurrency_map = self.__get_concurrency_maps(
-            states=states_to_count_as_running, session=session)
-
+        with Stats.timer('scheduler.find_executable_task_instances.query_slots'):
+            # Get the pool settings
+            pools = {p.pool: p for p in session.query(models.Pool).all()}
+            # pool to # of running tasks, dag_id to # of running tasks and
+            # (dag_id, task_id) to # of running tasks.
+            pool_concurrency_map, dag_concurrency_map, task_concurrency_map = \
+                self.__get_concurrency_maps(
+                    states=states_to_count_as_running, session=session)
+
+        selection_timer = Stats.timer(
+            'scheduler.find_executable_task_instances.select').start()
         # Go through each pool, and queue up a task for execution if there are
         # any open slots in the pool.
         for pool, task_instances in pool_to_task_instances.items():
+            if executor_open_slots == 0:
+                self.log.info("Not scheduling more tasks since the executor has no "
+                              "open slots left")
+                break
             pool_name = pool
             if not pool:
                 # Arbitrary:
                 # If queued outside of a pool, trigger no more than
                 # non_pooled_task_slot_count
-                open_slots = models.Pool.default_pool_open_slots()
                 pool_name = models.Pool.default_pool_name
+                open_slots = (models.Pool.default_pool_slots() -
+                              pool_concurrency_map[pool_name])
             else:
                 if pool not in pools:
                     self.log.warning(
@@ -1130,7 +1504,7 @@ class SchedulerJob(BaseJob):
                     )
                     open_slots = 0
                 else:
-                    open_slots = pools[pool].open_slots(session=session)
+                    open_slots = pools[pool].slots - pool_concurrency_map[pool]
 
             num_ready = len(task_instances)
             self.log.info(
@@ -1145,6 +1519,8 @@ class SchedulerJob(BaseJob):
             # Number of tasks that cannot be scheduled because of no open slot in pool
             num_starving_tasks = 0
             for current_index, task_instance in enumerate(priority_sorted_task_instances):
+                if executor_open_slots == 0:
+                    break
                 if open_slots <= 0:
                     self.log.info(
                         "Not scheduling since there are %s open slots in pool %s",
@@ -1192,13 +1568,17 @@ class SchedulerJob(BaseJob):
                         task_instance.key
                     )
                     continue
+
                 executable_tis.append(task_instance)
                 open_slots -= 1
+                if executor_open_slots is not None:
+                    executor_open_slots -= 1
                 dag_concurrency_map[dag_id] += 1
                 task_concurrency_map[(task_instance.dag_id, task_instance.task_id)] += 1
 
             Stats.gauge('pool.starving_tasks.{pool_name}'.format(pool_name=pool_name),
                         num_starving_tasks)
+        selection_timer.stop()
 
         task_instance_str = "\n\t".join(
             [repr(x) for x in executable_tis])
@@ -1233,40 +1613,31 @@ class SchedulerJob(BaseJob):
             return []
 
         TI = models.TaskInstance
-        filter_for_ti_state_change = (
-            [and_(
-                TI.dag_id == ti.dag_id,
-                TI.task_id == ti.task_id,
-                TI.execution_date == ti.execution_date)
-                for ti in task_instances])
-        ti_query = (
-            session
-            .query(TI)
-            .filter(or_(*filter_for_ti_state_change)))
-
-        if None in acceptable_states:
-            ti_query = ti_query.filter(
-                or_(TI.state == None, TI.state.in_(acceptable_states))  # noqa: E711
-            )
-        else:
-            ti_query = ti_query.filter(TI.state.in_(acceptable_states))
-
-        tis_to_set_to_queued = (
-            ti_query
-            .with_for_update()
-            .all())
-        if len(tis_to_set_to_queued) == 0:
+        queued_dttm = timezone.utcnow()
+        changed_keys = TI.bulk_set_state(
+            keys=[(ti.dag_id, ti.task_id, ti.execution_date) for ti in task_instances],
+            old_states=acceptable_states,
+            new_state=State.QUEUED,
+            values={'queued_dttm': func.coalesce(TI.queued_dttm, queued_dttm)},
+            session=session)
+        if len(changed_keys) == 0:
             self.log.info("No tasks were able to have their state changed to queued.")
             session.commit()
             return []
 
-        # set TIs to queued state
-        for task_instance in tis_to_set_to_queued:
-            task_instance.state = State.QUEUED
-            task_instance.queued_dttm = (timezone.utcnow()
-                                         if not task_instance.queued_dttm
-                                         else task_instance.queued_dttm)
-            session.merge(task_instance)
+        # reflect the state change on the task instances we already hold instead
+        # of loading them again
+        task_instances_by_id = defaultdict(list)
+        for task_instance in task_instances:
+            task_instances_by_id[(task_instance.dag_id, task_instance.task_id)].append(
+                task_instance)
+        tis_to_set_to_queued = []
+        for dag_id, task_id, execution_date in changed_keys:
+            for task_instance in task_instances_by_id[(dag_id, task_id)]:
+                if task_instance.execution_date == execution_date:
+                    task_instance.state = State.QUEUED
+                    task_instance.queued_dttm = task_instance.queued_dttm or queued_dttm
+                    tis_to_set_to_queued.append(task_instance)
 
         # Generate a list of SimpleTaskInstance for the use of queuing
         # them in the executor.
@@ -1501,11 +1872,22 @@ class SchedulerJob(BaseJob):
         known_file_paths = list_py_file_paths(self.subdir)
         self.log.info("There are %s files in %s", len(known_file_paths), self.subdir)
 
-        def processor_factory(file_path, zombies):
-            return DagFileProcessor(file_path,
-                                    pickle_dags,
-                                    self.dag_ids,
-                                    zombies)
+        if conf.getboolean('scheduler', 'parser_worker_pool'):
+            processor_pool = DagFileProcessorPool(
+                pickle_dags,
+                self.dag_ids,
+                max_files_per_worker=conf.getint('scheduler', 'parser_worker_max_files'),
+                preload_modules=[
+                    module.strip() for module
+                    in conf.get('scheduler', 'parser_preload_modules').split(',')
+                    if module.strip()])
+            processor_factory = processor_pool
+        else:
+            def processor_factory(file_path, zombies):
+                return DagFileProcessor(file_path,
+                                        pickle_dags,
+                                        self.dag_ids,
+                                        zombies)
 
         # When using sqlite, we do not use async_mode
         # so the scheduler job and DAG parser don't access the DB at the same time.
@@ -1555,21 +1937,25 @@ class SchedulerJob(BaseJob):
         # Last time that self.heartbeat() was called.
         last_self_heartbeat_time = timezone.utcnow()
 
+        profiler = self.loop_profiler
+
         # For the execute duration, parse and schedule DAGs
         while True:
             self.log.debug("Starting Loop...")
-            loop_start_time = time.time()
+            profiler.start_loop()
 
             if self.using_sqlite:
-                self.processor_agent.heartbeat()
-                # For the sqlite case w/ 1 thread, wait until the processor
-                # is finished to avoid concurrent access to the DB.
-                self.log.debug(
-                    "Waiting for processors to finish since we're using sqlite")
-                self.processor_agent.wait_until_finished()
+                with profiler.phase('wait_for_processors'):
+                    self.processor_agent.heartbeat()
+                    # For the sqlite case w/ 1 thread, wait until the processor
+                    # is finished to avoid concurrent access to the DB.
+                    self.log.debug(
+                        "Waiting for processors to finish since we're using sqlite")
+                    self.processor_agent.wait_until_finished()
 
             self.log.debug("Harvesting DAG parsing results")
-            simple_dags = self.processor_agent.harvest_simple_dags()
+            with profiler.phase('harvest_simple_dags'):
+                simple_dags = self.processor_agent.harvest_simple_dags()
             self.log.debug("Harvested {} SimpleDAGs".format(len(simple_dags)))
 
             # Send tasks for execution if available
@@ -1582,52 +1968,66 @@ class SchedulerJob(BaseJob):
                     # a non-running state. Handle task instances that belong to
                     # DAG runs in those states
 
-                    # If a task instance is up for retry but the corresponding DAG run
-                    # isn't running, mark the task instance as FAILED so we don't try
-                    # to re-run it.
-                    self._change_state_for_tis_without_dagrun(simple_dag_bag,
-                                                              [State.UP_FOR_RETRY],
-                                                              State.FAILED)
-                    # If a task instance is scheduled or queued or up for reschedule,
-                    # but the corresponding DAG run isn't running, set the state to
-                    # NONE so we don't try to re-run it.
-                    self._change_state_for_tis_without_dagrun(simple_dag_bag,
-                                                              [State.QUEUED,
-                                                               State.SCHEDULED,
-                                                               State.UP_FOR_RESCHEDULE],
-                                                              State.NONE)
-
-                    self._execute_task_instances(simple_dag_bag,
-                                                 (State.SCHEDULED,))
+                    with profiler.phase('change_state_for_tis_without_dagrun'):
+                        # If a task instance is up for retry but the corresponding DAG
+                        # run isn't running, mark the task instance as FAILED so we
+                        # don't try to re-run it.
+                        self._change_state_for_tis_without_dagrun(simple_dag_bag,
+                                                                  [State.UP_FOR_RETRY],
+                                                                  State.FAILED)
+                        # If a task instance is scheduled or queued or up for
+                        # reschedule, but the corresponding DAG run isn't running,
+                        # set the state to NONE so we don't try to re-run it.
+                        self._change_state_for_tis_without_dagrun(
+                            simple_dag_bag,
+                            [State.QUEUED, State.SCHEDULED, State.UP_FOR_RESCHEDULE],
+                            State.NONE)
+
+                    with profiler.phase('execute_task_instances'):
+                        self._execute_task_instances(simple_dag_bag,
+                                                     (State.SCHEDULED,))
                 except Exception as e:
                     self.log.error("Error queuing tasks")
                     self.log.exception(e)
+                    profiler.end_loop(failed=True)
+                    if self.profile_loops and profiler.num_loops >= self.profile_loops:
+                        self.log.info("Exiting scheduler loop after profiling %s loops",
+                                      profiler.num_loops)
+                        break
                     continue
 
             # Call heartbeats
             self.log.debug("Heartbeating the executor")
-            self.executor.heartbeat()
+            with profiler.phase('executor_heartbeat'):
+                self.executor.heartbeat()
 
-            self._change_state_for_tasks_failed_to_execute()
+            with profiler.phase('change_state_for_tasks_failed_to_execute'):
+                self._change_state_for_tasks_failed_to_execute()
 
             # Process events from the executor
-            self._process_executor_events(simple_dag_bag)
+            with profiler.phase('process_executor_events'):
+                self._process_executor_events(simple_dag_bag)
 
             # Heartbeat the scheduler periodically
             time_since_last_heartbeat = (timezone.utcnow() -
                                          last_self_heartbeat_time).total_seconds()
             if time_since_last_heartbeat > self.heartrate:
                 self.log.debug("Heartbeating the scheduler")
-                self.heartbeat()
+                with profiler.phase('scheduler_heartbeat'):
+                    self.heartbeat()
                 last_self_heartbeat_time = timezone.utcnow()
 
             is_unit_test = conf.getboolean('core', 'unit_test_mode')
-            loop_end_time = time.time()
-            loop_duration = loop_end_time - loop_start_time
+            loop_duration = profiler.end_loop() / 1000
             self.log.debug(
                 "Ran scheduling loop in %.2f seconds",
                 loop_duration)
 
+            if self.profile_loops and profiler.num_loops >= self.profile_loops:
+                self.log.info("Exiting scheduler loop after profiling %s loops",
+                              profiler.num_loops)
+                break
+
             if not is_unit_test:
                 self.log.debug("Sleeping for %.2f seconds", self._processor_poll_interval)
                 time.sleep(self._processor_poll_interval)
@@ -1650,6 +2050,8 @@ class SchedulerJob(BaseJob):
                     .format(sleep_length))
                 sleep(sleep_length)
 
+        profiler.log_report()
+
         # Stop any processors
         self.processor_agent.terminate()
 
@@ -1662,11 +2064,109 @@ class SchedulerJob(BaseJob):
                 execute_start_time.isoformat()
             )
             models.DAG.deactivate_stale_dags(execute_start_time)
+            if self.store_serialized_dags:
+                SerializedDagModel.remove_inactive_dags()
 
         self.executor.end()
 
         settings.Session.remove()
 
+    def _schedule_task_instances(self, dagbag, ti_keys, session):
+        """
+        Sets the task instances with the given keys whose queue dependencies are
+        met to the SCHEDULED state, creating the ones that are not in the DB yet.
+
+        Instead of locking, checking and merging the task instances one by one,
+        the existing task instances are locked and loaded with one
+        SELECT ... FOR UPDATE per chunk of max_tis_per_query keys, the queue
+        dependencies are checked in memory, as none of them needs the DB, and
+        the existing task instances to schedule are updated with one UPDATE per
+        task of the chunk, which also writes the attributes that come from the
+        current definition of the task, like its pool, queue and priority. The
+        caller is responsible for committing the session.
+
+        :param dagbag: the DagBag of the DAGs of the task instances
+        :type dagbag: airflow.models.DagBag
+        :param ti_keys: the keys of the task instances to schedule, only their
+            (dag_id, task_id, execution_date) are used, not their try number
+        :type ti_keys: list[tuple]
+        :param session: database session
+        :type session: sqlalchemy.orm.session.Session
+        """
+        TI = models.TaskInstance
+        # We can defer checking the task dependency checks to the worker themselves
+        # since they can be expensive to run in the scheduler.
+        dep_context = DepContext(deps=QUEUE_DEPS, ignore_task_deps=True)
+
+        def filter_for_keys(keys):
+            return or_(*[
+                and_(
+                    TI.dag_id == dag_id,
+                    TI.task_id == task_id,
+                    TI.execution_date == execution_date)
+                for dag_id, task_id, execution_date in keys])
+
+        # TaskInstance.key also has the try number, which is not part of the
+        # primary key of the task instances
+        ti_keys = [ti_key[:3] for ti_key in ti_keys]
+
+        def schedule_chunk(result, keys):
+            existing_tis = {
+                (ti.dag_id, ti.task_id, ti.execution_date): ti
+                for ti in session.query(TI)
+                .filter(filter_for_keys(keys))
+                .with_for_update()
+                .all()
+            }
+
+            # Map from (dag_id, task_id) to the execution dates to schedule
+            dates_to_schedule = defaultdict(list)
+            for ti_key in keys:
+                task = dagbag.dags[ti_key[0]].get_task(ti_key[1])
+                ti = existing_tis.get(ti_key)
+                if ti is None:
+                    ti = TI(task, ti_key[2])
+                    self.log.info("Creating %s in ORM", ti)
+                    session.add(ti)
+                else:
+                    ti.task = task
+
+                # Only schedule tasks that have their dependencies met, e.g. to
+                # avoid a task that recently got its state changed to RUNNING from
+                # somewhere other than the scheduler from getting its state
+                # overwritten.
+                if ti.are_dependencies_met(
+                        dep_context=dep_context,
+                        session=session,
+                        verbose=True):
+                    if ti_key in existing_tis:
+                        dates_to_schedule[ti_key[:2]].append(ti_key[2])
+                    else:
+                        ti.state = State.SCHEDULED
+
+            num_scheduled = sum(len(dates) for dates in dates_to_schedule.values())
+            if num_scheduled:
+                self.log.info("Setting %s task instances to the %s state",
+                              num_scheduled, State.SCHEDULED)
+            for (dag_id, task_id), execution_dates in dates_to_schedule.items():
+                task = dagbag.dags[dag_id].get_task(task_id)
+                (session
+                 .query(TI)
+                 .filter(TI.dag_id == dag_id,
+                         TI.task_id == task_id,
+                         TI.execution_date.in_(execution_dates))
+                 .update({
+                     TI.state: State.SCHEDULED,
+                     TI.queue: task.queue,
+                     TI.pool: task.pool,
+                     TI.priority_weight: task.priority_weight_total,
+                     TI.operator: task.__class__.__name__,
+                     TI.run_as_user: task.run_as_user,
+                 }, synchronize_session=False))
+            return result + num_scheduled
+
+        helpers.reduce_in_chunks(schedule_chunk, ti_keys, 0, self.max_tis_per_query)
+
     @provide_session
     def process_file(self, file_path, zombies, pickle_dags=False, session=None):
         """
@@ -1700,7 +2200,7 @@ class SchedulerJob(BaseJob):
         simple_dags = []
 
         try:
-            dagbag = models.DagBag(file_path, include_examples=False)
+            dagbag = models.DagBag(file_path, include_examples=False, use_parse_cache=True)
         except Exception:
             self.log.exception("Failed at reloading the DAG file %s", file_path)
             Stats.incr('dag_file_refresh_error', 1, 1)
@@ -1713,9 +2213,20 @@ class SchedulerJob(BaseJob):
             self.update_import_errors(session, dagbag)
             return []
 
-        # Save individual DAGs in the ORM and update DagModel.last_scheduled_time
-        for dag in dagbag.dags.values():
-            dag.sync_to_db()
+        # Save individual DAGs in the ORM and update DagModel.last_scheduled_time.
+        # SubDAGs are saved along with their parent DAG.
+        DAG.bulk_sync_to_db(
+            [dag for dag in dagbag.dags.values() if not dag.parent_dag],
+            session=session)
+
+        # Store the serialized DAGs, including SubDAGs, for the webserver
+        if self.store_serialized_dags:
+            for dag in dagbag.dags.values():
+                try:
+                    SerializedDagModel.write_dag(dag, session=session)
+                except Exception:
+                    self.log.exception("Failed to serialize DAG %s", dag.dag_id)
+            session.commit()
 
         paused_dag_ids = [dag.dag_id for dag in dagbag.dags.values()
                           if dag.is_paused]
@@ -1746,33 +2257,36 @@ class SchedulerJob(BaseJob):
 
         self._process_dags(dagbag, dags, ti_keys_to_schedule)
 
-        for ti_key in ti_keys_to_schedule:
-            dag = dagbag.dags[ti_key[0]]
-            task = dag.get_task(ti_key[1])
-            ti = models.TaskInstance(task, ti_key[2])
-
-            ti.refresh_from_db(session=session, lock_for_update=True)
-            # We can defer checking the task dependency checks to the worker themselves
-            # since they can be expensive to run in the scheduler.
-            dep_context = DepContext(deps=QUEUE_DEPS, ignore_task_deps=True)
-
-            # Only schedule tasks that have their dependencies met, e.g. to avoid
-            # a task that recently got its state changed to RUNNING from somewhere
-            # other than the scheduler from getting its state overwritten.
-            # TODO(aoen): It's not great that we have to check all the task instance
-            # dependencies twice; once to get the task scheduled, and again to actually
-            # run the task. We should try to come up with a way to only check them once.
-            if ti.are_dependencies_met(
-                    dep_context=dep_context,
-                    session=session,
-                    verbose=True):
-                # Task starts out in the scheduled state. All tasks in the
-                # scheduled state will be sent to the executor
-                ti.state = State.SCHEDULED
-
-            # Also save this task instance to the DB.
-            self.log.info("Creating / updating %s in ORM", ti)
-            session.merge(ti)
+        if self.batch_task_instance_scheduling:
+            self._schedule_task_instances(dagbag, ti_keys_to_schedule, session=session)
+        else:
+            for ti_key in ti_keys_to_schedule:
+                dag = dagbag.dags[ti_key[0]]
+                task = dag.get_task(ti_key[1])
+                ti = models.TaskInstance(task, ti_key[2])
+
+                ti.refresh_from_db(session=session, lock_for_update=True)
+                # We can defer checking the task dependency checks to the worker themselves
+                # since they can be expensive to run in the scheduler.
+                dep_context = DepContext(deps=QUEUE_DEPS, ignore_task_deps=True)
+
+                # Only schedule tasks that have their dependencies met, e.g. to avoid
+                # a task that recently got its state changed to RUNNING from somewhere
+                # other than the scheduler from getting its state overwritten.
+                # TODO(aoen): It's not great that we have to check all the task instance
+                # dependencies twice; once to get the task scheduled, and again to actually
+                # run the task. We should try to come up with a way to only check them once.
+                if ti.are_dependencies_met(
+                        dep_context=dep_context,
+                        session=session,
+                        verbose=True):
+                    # Task starts out in the scheduled state. All tasks in the
+                    # scheduled state will be sent to the executor
+                    ti.state = State.SCHEDULED
+
+                # Also save this task instance to the DB.
+                self.log.info("Creating / updating %s in ORM", ti)
+                session.merge(ti)
         # commit batch
         session.commit()
 
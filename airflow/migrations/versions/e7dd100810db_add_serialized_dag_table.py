@@ -0,0 +1,75 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""add serialized_dag table
+
+Revision ID: e7dd100810db
+Revises: 939bb1e647c8
+Create Date: 2019-06-03 10:12:41.281934
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = 'e7dd100810db'
+down_revision = '939bb1e647c8'
+branch_labels = None
+depends_on = None
+
+TABLE_NAME = 'serialized_dag'
+
+
+# For Microsoft SQL Server, TIMESTAMP is a row-id type,
+# having nothing to do with date-time.  DateTime() will
+# be sufficient.
+def mssql_timestamp():
+    return sa.DateTime()
+
+
+def mysql_timestamp():
+    return mysql.TIMESTAMP(fsp=6)
+
+
+def sa_timestamp():
+    return sa.TIMESTAMP(timezone=True)
+
+
+def upgrade():
+    # See 0e2a74e0fc9f_add_time_zone_awareness
+    conn = op.get_bind()
+    if conn.dialect.name == 'mysql':
+        timestamp = mysql_timestamp
+    elif conn.dialect.name == 'mssql':
+        timestamp = mssql_timestamp
+    else:
+        timestamp = sa_timestamp
+
+    op.create_table(
+        TABLE_NAME,
+        sa.Column('dag_id', sa.String(length=250), nullable=False),
+        sa.Column('fileloc', sa.String(length=2000), nullable=False),
+        # The serialization of big DAGs doesn't fit in a MySQL TEXT column
+        sa.Column('data', sa.Text().with_variant(mysql.MEDIUMTEXT(), 'mysql'), nullable=False),
+        # use explicit server_default=None otherwise mysql implies defaults for first timestamp column
+        sa.Column('last_updated', timestamp(), nullable=False, server_default=None),
+        sa.PrimaryKeyConstraint('dag_id')
+    )
+
+
+def downgrade():
+    op.drop_table(TABLE_NAME)
@@ -1275,30 +1275,88 @@ class DAG(BaseDag, LoggingMixin):
         :type sync_time: datetime
         :return: None
         """
+        DAG.bulk_sync_to_db([self], owner=owner, sync_time=sync_time, session=session)
 
-        if owner is None:
-            owner = self.owner
+    def _orm_attributes(self, owner):
+        """
+        Returns the attributes of this DAG that are persisted in its DagModel,
+        apart from the last time it was synced.
+        """
+        return {
+            'fileloc': self.fileloc,
+            'is_subdag': self.is_subdag,
+            'owners': owner,
+            'is_active': True,
+            'default_view': self._default_view,
+            'description': self.description,
+            'schedule_interval': self.schedule_interval,
+        }
+
+    @staticmethod
+    @provide_session
+    def bulk_sync_to_db(dags, owner=None, sync_time=None, session=None):
+        """
+        Save attributes about the given DAGs and their SubDAGs to the DB, like
+        ``sync_to_db``, with a single SELECT for all of them.
+
+        Only the DagModels whose persisted attributes differ from the ones of
+        their DAG are updated one by one. The last time the other DAGs were
+        synced is updated with a single UPDATE, which is the common case when
+        DAG files are parsed over and over again without changing.
+
+        :param dags: the DAGs to save to the DB
+        :type dags: Iterable[airflow.models.DAG]
+        :param owner: the owners of the DAGs, defaults to the owner of each DAG.
+            SubDAGs get the owners of their parent DAG.
+        :type owner: unicode
+        :param sync_time: The time that the DAGs should be marked as sync'ed
+        :type sync_time: datetime
+        :return: None
+        """
         if sync_time is None:
             sync_time = timezone.utcnow()
 
-        orm_dag = session.query(
-            DagModel).filter(DagModel.dag_id == self.dag_id).first()
-        if not orm_dag:
-            orm_dag = DagModel(dag_id=self.dag_id)
-            self.log.info("Creating ORM DAG for %s", self.dag_id)
-        orm_dag.fileloc = self.fileloc
-        orm_dag.is_subdag = self.is_subdag
-        orm_dag.owners = owner
-        orm_dag.is_active = True
-        orm_dag.last_scheduler_run = sync_time
-        orm_dag.default_view = self._default_view
-        orm_dag.description = self.description
-        orm_dag.schedule_interval = self.schedule_interval
-        session.merge(orm_dag)
-        session.commit()
+        # Map from dag_id to the DAG and the attributes of its DagModel
+        attributes_by_dag_id = OrderedDict()
+        to_visit = [(dag, owner or dag.owner) for dag in reversed(list(dags))]
+        while to_visit:
+            dag, dag_owner = to_visit.pop()
+            if dag.dag_id in attributes_by_dag_id:
+                continue
+            attributes_by_dag_id[dag.dag_id] = dag._orm_attributes(dag_owner)
+            to_visit.extend((subdag, dag_owner) for subdag in reversed(dag.subdags))
+        if not attributes_by_dag_id:
+            return
 
-        for subdag in self.subdags:
-            subdag.sync_to_db(owner=owner, sync_time=sync_time, session=session)
+        orm_dags = {
+            orm_dag.dag_id: orm_dag
+            for orm_dag in session.query(DagModel)
+            .filter(DagModel.dag_id.in_(list(attributes_by_dag_id)))
+            .all()
+        }
+
+        unchanged_dag_ids = []
+        for dag_id, attributes in attributes_by_dag_id.items():
+            orm_dag = orm_dags.get(dag_id)
+            if orm_dag is None:
+                LoggingMixin().log.info("Creating ORM DAG for %s", dag_id)
+                orm_dag = DagModel(dag_id=dag_id)
+                session.add(orm_dag)
+            elif all(getattr(orm_dag, name) == value
+                     for name, value in attributes.items()):
+                unchanged_dag_ids.append(dag_id)
+                continue
+            for name, value in attributes.items():
+                setattr(orm_dag, name, value)
+            orm_dag.last_scheduler_run = sync_time
+
+        if unchanged_dag_ids:
+            (session
+             .query(DagModel)
+             .filter(DagModel.dag_id.in_(unchanged_dag_ids))
+             .update({DagModel.last_scheduler_run: sync_time},
+                     synchronize_session=False))
+        session.commit()
 
     @staticmethod
     @provide_session
@@ -27,11 +27,12 @@ import os
 import sys
 import textwrap
 import zipfile
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from datetime import datetime
 
 import six
 from croniter import croniter, CroniterBadCronError, CroniterBadDateError, CroniterNotAlphaError
+from sqlalchemy.exc import SQLAlchemyError
 
 from airflow import configuration, settings
 from airflow.dag.base_dag import BaseDagBag
@@ -39,6 +40,7 @@ from airflow.exceptions import AirflowDagCycleException
 from airflow.executors import get_default_executor
 from airflow.stats import Stats
 from airflow.utils import timezone
+from airflow.utils.dag_parse_cache import DagParseCache
 from airflow.utils.dag_processing import list_py_file_paths, correct_maybe_zipped
 from airflow.utils.db import provide_session
 from airflow.utils.helpers import pprinttable
@@ -67,6 +69,24 @@ class DagBag(BaseDagBag, LoggingMixin):
         file has been skipped. This is to prevent overloading the user with logging
         messages about skipped files. Therefore only once per DagBag is a file logged
         being skipped.
+    :param store_serialized_dags: whether to read the DAGs from the serialized DAGs
+        stored in the DB by the scheduler, one by one when they are asked for,
+        instead of executing the DAG files
+    :type store_serialized_dags: bool
+    :param lazy_load: whether to only parse the file of a DAG when it is asked for,
+        found with the file location the scheduler stored in the DB, instead of
+        parsing all the files of the folder up front. The folder is only fully
+        parsed when a DAG can't be found this way.
+    :type lazy_load: bool
+    :param max_cached_dags: when lazily loading DAGs, the maximum number of parsed
+        DAGs to keep, the least recently asked for are forgotten first. 0 for no
+        limit.
+    :type max_cached_dags: int
+    :param use_parse_cache: whether to load the DAGs of unchanged files from the
+        parse cache, when it is enabled by ``dag_parse_cache``. The DAGs of the
+        cache are rebuilt without importing their file, so this is only meant
+        for the DAG file processors of the scheduler.
+    :type use_parse_cache: bool
     """
 
     # static class variables to detetct dag cycle
@@ -79,7 +99,11 @@ class DagBag(BaseDagBag, LoggingMixin):
             dag_folder=None,
             executor=None,
             include_examples=configuration.conf.getboolean('core', 'LOAD_EXAMPLES'),
-            safe_mode=configuration.conf.getboolean('core', 'DAG_DISCOVERY_SAFE_MODE')):
+            safe_mode=configuration.conf.getboolean('core', 'DAG_DISCOVERY_SAFE_MODE'),
+            store_serialized_dags=False,
+            lazy_load=False,
+            max_cached_dags=0,
+            use_parse_cache=False):
 
         # do not use default arg in signature, to fix import cycle on plugin load
         if executor is None:
@@ -87,17 +111,36 @@ class DagBag(BaseDagBag, LoggingMixin):
         dag_folder = dag_folder or settings.DAGS_FOLDER
         self.log.info("Filling up the DagBag from %s", dag_folder)
         self.dag_folder = dag_folder
-        self.dags = {}
+        self.include_examples = include_examples
+        self.safe_mode = safe_mode
+        self.lazy_load = lazy_load
+        self.max_cached_dags = max_cached_dags
+        # Lazily loaded DAGs are kept from the least to the most recently used
+        self.dags = OrderedDict() if lazy_load else {}
+        # Whether all the files of the folder were parsed
+        self.collected = False
         # the file's last modified timestamp when we last read it
         self.file_last_changed = {}
         self.executor = executor
         self.import_errors = {}
         self.has_logged = False
-
-        self.collect_dags(
-            dag_folder=dag_folder,
-            include_examples=include_examples,
-            safe_mode=safe_mode)
+        self.store_serialized_dags = store_serialized_dags
+        # Map from dag_id to the last time the serialized DAG was stored
+        self.serialized_dags_last_updated = {}
+
+        self.parse_cache = None
+        if use_parse_cache and configuration.conf.getboolean('core', 'dag_parse_cache') \
+                and not store_serialized_dags:
+            self.parse_cache = DagParseCache(
+                cache_folder=configuration.conf.get('core', 'dag_parse_cache_folder'),
+                dags_folder=settings.DAGS_FOLDER,
+                ttl=configuration.conf.getint('core', 'dag_parse_cache_ttl'))
+
+        if not lazy_load:
+            self.collect_dags(
+                dag_folder=dag_folder,
+                include_examples=include_examples,
+                safe_mode=safe_mode)
 
     def size(self):
         """
@@ -113,6 +156,11 @@ class DagBag(BaseDagBag, LoggingMixin):
         """
         Gets the DAG out of the dictionary, and refreshes it if expired
         """
+        if self.store_serialized_dags:
+            return self._get_serialized_dag(dag_id)
+        if self.lazy_load:
+            return self._get_lazy_dag(dag_id)
+
         from airflow.models.dag import DagModel  # Avoid circular import
 
         # If asking for a known subdag, we want to refresh the parent
@@ -142,6 +190,100 @@ class DagBag(BaseDagBag, LoggingMixin):
                 del self.dags[dag_id]
         return self.dags.get(dag_id)
 
+    def _get_serialized_dag(self, dag_id):
+        """
+        Gets the DAG from its serialization in the DB, and reads it again if it
+        was stored again since it was read
+        """
+        from airflow.models.serialized_dag import SerializedDagModel  # Avoid circular import
+
+        last_updated = SerializedDagModel.get_last_updated(dag_id)
+        if last_updated is None:
+            self.dags.pop(dag_id, None)
+            self.serialized_dags_last_updated.pop(dag_id, None)
+            return None
+        if dag_id not in self.dags or \
+                self.serialized_dags_last_updated.get(dag_id) != last_updated:
+            dag, last_updated = SerializedDagModel.get_dag(dag_id)
+            if dag is None:
+                return None
+            self.dags[dag_id] = dag
+            self.serialized_dags_last_updated[dag_id] = last_updated
+        return self.dags[dag_id]
+
+    def _get_lazy_dag(self, dag_id):
+        """
+        Gets the DAG out of the dictionary, and parses its file if it was not
+        parsed yet, or if the file changed or the DAG expired since then
+        """
+        from airflow.models.dag import DagModel  # Avoid circular import
+
+        try:
+            orm_dag = DagModel.get_current(dag_id)
+        except SQLAlchemyError:
+            # E.g. the metadata DB was not initialized yet
+            self.log.warning("Could not find DAG %s in the DB", dag_id, exc_info=True)
+            orm_dag = None
+        if orm_dag and self._is_in_folder(orm_dag.fileloc):
+            dag = self.dags.get(dag_id)
+            if dag is None or \
+                    self._file_changed(orm_dag.fileloc) or \
+                    (orm_dag.last_expired and dag.last_loaded < orm_dag.last_expired):
+                self.dags.pop(dag_id, None)
+                self.process_file(
+                    filepath=orm_dag.fileloc, only_if_updated=False, safe_mode=self.safe_mode)
+
+        if dag_id not in self.dags and not self.collected:
+            # The DAG is unknown to the DB or is not in its file anymore
+            self.log.info("Could not find the file of DAG %s, parsing all the files of %s",
+                          dag_id, self.dag_folder)
+            # Only bound the DAGs once the requested DAG is the most recently used
+            max_cached_dags, self.max_cached_dags = self.max_cached_dags, 0
+            try:
+                self.collect_dags(
+                    only_if_updated=False,
+                    include_examples=self.include_examples,
+                    safe_mode=self.safe_mode)
+            finally:
+                self.max_cached_dags = max_cached_dags
+
+        dag = self.dags.get(dag_id)
+        if dag is not None:
+            self.dags[dag_id] = self.dags.pop(dag_id)
+        self._evict_dags()
+        return dag
+
+    def _evict_dags(self):
+        """
+        Forgets the least recently used DAGs when lazily loading DAGs, to keep at
+        most max_cached_dags DAGs
+        """
+        while self.max_cached_dags and len(self.dags) > self.max_cached_dags:
+            self.dags.popitem(last=False)
+
+    def _is_in_folder(self, filepath):
+        """
+        Whether a file is in the folder of this DagBag, or in the example DAGs
+        folder when the examples are included
+        """
+        folders = [self.dag_folder]
+        if self.include_examples:
+            import airflow.example_dags
+            folders.append(airflow.example_dags.__path__[0])
+        filepath = os.path.realpath(filepath)
+        for folder in folders:
+            folder = os.path.realpath(folder)
+            if filepath == folder or filepath.startswith(os.path.join(folder, '')):
+                return True
+        return False
+
+    def _file_changed(self, filepath):
+        try:
+            last_changed = datetime.fromtimestamp(os.path.getmtime(filepath))
+        except OSError:
+            return True
+        return self.file_last_changed.get(filepath) != last_changed
+
     def process_file(self, filepath, only_if_updated=True, safe_mode=True):
         """
         Given a path to a python module or zip file, this method imports
@@ -170,6 +312,24 @@ class DagBag(BaseDagBag, LoggingMixin):
             self.log.exception(e)
             return found_dags
 
+        parse_cache_key = None
+        if self.parse_cache:
+            try:
+                parse_cache_key = self.parse_cache.get_key(filepath)
+            except Exception:
+                self.log.exception("Failed to get the parse cache key of %s", filepath)
+            if parse_cache_key:
+                cached_dags = self.parse_cache.load(parse_cache_key)
+                if cached_dags is not None:
+                    self.log.debug("Loaded the DAGs of %s from the parse cache", filepath)
+                    for dag in cached_dags:
+                        # The policy was applied before the DAGs were cached
+                        self.bag_dag(dag, parent_dag=dag, root_dag=dag, apply_policy=False)
+                        found_dags.append(dag)
+                        found_dags += dag.subdags
+                    self.file_last_changed[filepath] = file_last_changed_on_disk
+                    return found_dags
+
         mods = []
         is_zipfile = zipfile.is_zipfile(filepath)
         if not is_zipfile:
@@ -267,6 +427,14 @@ class DagBag(BaseDagBag, LoggingMixin):
                         self.file_last_changed[dag.full_filepath] = \
                             file_last_changed_on_disk
 
+        if parse_cache_key and not any(
+                path in self.import_errors
+                for path in set([filepath] + [dag.full_filepath for dag in found_dags])):
+            self.parse_cache.store(
+                parse_cache_key,
+                [dag for dag in found_dags if not dag.is_subdag],
+                module_names=[m.__name__ for m in mods])
+
         self.file_last_changed[filepath] = file_last_changed_on_disk
         return found_dags
 
@@ -302,10 +470,14 @@ class DagBag(BaseDagBag, LoggingMixin):
                     Stats.incr('zombies_killed')
         session.commit()
 
-    def bag_dag(self, dag, parent_dag, root_dag):
+    def bag_dag(self, dag, parent_dag, root_dag, apply_policy=True):
         """
         Adds the DAG into the bag, recurses into sub dags.
         Throws AirflowDagCycleException if a cycle is detected in this dag or its subdags
+
+        :param apply_policy: whether to apply the cluster policy to the tasks,
+            False for DAGs it was already applied to
+        :type apply_policy: bool
         """
 
         dag.test_cycle()  # throws if a task cycle is found
@@ -313,8 +485,9 @@ class DagBag(BaseDagBag, LoggingMixin):
         dag.resolve_template_files()
         dag.last_loaded = timezone.utcnow()
 
-        for task in dag.tasks:
-            settings.policy(task)
+        if apply_policy:
+            for task in dag.tasks:
+                settings.policy(task)
 
         subdags = dag.subdags
 
@@ -323,7 +496,8 @@ class DagBag(BaseDagBag, LoggingMixin):
                 subdag.full_filepath = dag.full_filepath
                 subdag.parent_dag = dag
                 subdag.is_subdag = True
-                self.bag_dag(subdag, parent_dag=dag, root_dag=root_dag)
+                self.bag_dag(subdag, parent_dag=dag, root_dag=root_dag,
+                             apply_policy=apply_policy)
 
             self.dags[dag.dag_id] = dag
             self.log.debug('Loaded DAG %s', dag)
@@ -355,7 +529,15 @@ class DagBag(BaseDagBag, LoggingMixin):
 
         **Note**: The patterns in .airflowignore are treated as
         un-anchored regexes, not shell-like glob patterns.
+
+        When the DAGs are read from their serialization, no file is imported and
+        the DAGs that were already read are forgotten, to be read again.
         """
+        if self.store_serialized_dags:
+            self.dags = {}
+            self.serialized_dags_last_updated = {}
+            return
+
         start_dttm = timezone.utcnow()
         dag_folder = dag_folder or self.dag_folder
 
@@ -394,6 +576,10 @@ class DagBag(BaseDagBag, LoggingMixin):
             'dagbag_import_errors', len(self.import_errors), 1)
         self.dagbag_stats = sorted(
             stats, key=lambda x: x.duration, reverse=True)
+        if dag_folder == correct_maybe_zipped(self.dag_folder):
+            self.collected = True
+        if self.lazy_load:
+            self._evict_dags()
 
     def dagbag_report(self):
         """Prints a report around DagBag loading stats"""
@@ -38,11 +38,19 @@ class Pool(Base):
     def __repr__(self):
         return self.pool
 
+    @staticmethod
+    def default_pool_slots():
+        """
+        Returns the number of slots of the pool used by task instances that are
+        not assigned to any pool
+        """
+        return conf.getint('core', 'non_pooled_task_slot_count')
+
     @staticmethod
     @provide_session
     def default_pool_open_slots(session):
         from airflow.models import TaskInstance as TI  # To avoid circular imports
-        total_slots = conf.getint('core', 'non_pooled_task_slot_count')
+        total_slots = Pool.default_pool_slots()
         used_slots = session.query(func.count()).filter(
             TI.pool == Pool.default_pool_name).filter(
             TI.state.in_([State.RUNNING, State.QUEUED])).scalar()
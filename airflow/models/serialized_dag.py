@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from sqlalchemy import Column, String, Text
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+
+from airflow.dag.serialization import SerializedDAG
+from airflow.models.base import Base, ID_LEN
+from airflow.models.dag import DagModel
+from airflow.utils import timezone
+from airflow.utils.db import provide_session
+from airflow.utils.sqlalchemy import UtcDateTime
+
+
+class SerializedDagModel(Base):
+    """
+    Model that stores the JSON serialization of DAGs, written by the scheduler
+    after parsing the DAG files, so that the webserver can show the DAGs
+    without executing the DAG files.
+    """
+    __tablename__ = 'serialized_dag'
+
+    dag_id = Column(String(ID_LEN), primary_key=True)
+    fileloc = Column(String(2000), nullable=False)
+    # The serialization of big DAGs doesn't fit in a MySQL TEXT column
+    data = Column(Text().with_variant(MEDIUMTEXT(), 'mysql'), nullable=False)
+    last_updated = Column(UtcDateTime, nullable=False)
+
+    def __repr__(self):
+        return '<SerializedDag: {}>'.format(self.dag_id)
+
+    @classmethod
+    @provide_session
+    def write_dag(cls, dag, session=None):
+        """
+        Serializes a DAG and stores it, unless its serialization did not
+        change. The caller is responsible for committing the session.
+
+        :param dag: the DAG to store
+        :type dag: airflow.models.DAG
+        :param session: database session
+        :type session: sqlalchemy.orm.session.Session
+        :return: whether the serialization of the DAG changed
+        :rtype: bool
+        """
+        data = SerializedDAG.to_json(dag)
+        stored_data = (session
+                       .query(cls.data)
+                       .filter(cls.dag_id == dag.dag_id)
+                       .scalar())
+        if stored_data == data:
+            return False
+        session.merge(cls(dag_id=dag.dag_id, fileloc=dag.fileloc, data=data,
+                          last_updated=timezone.utcnow()))
+        return True
+
+    @classmethod
+    @provide_session
+    def get_last_updated(cls, dag_id, session=None):
+        """
+        :param dag_id: the DAG ID
+        :type dag_id: unicode
+        :return: the last time the DAG was stored, None if it is not stored
+        :rtype: datetime
+        """
+        return (session
+                .query(cls.last_updated)
+                .filter(cls.dag_id == dag_id)
+                .scalar())
+
+    @classmethod
+    @provide_session
+    def get_dag(cls, dag_id, session=None):
+        """
+        :param dag_id: the DAG ID
+        :type dag_id: unicode
+        :return: the DAG rebuilt from its serialization, and the last time it
+            was stored, or (None, None) if it is not stored
+        :rtype: tuple[airflow.dag.serialization.SerializedDAG, datetime]
+        """
+        row = session.query(cls).filter(cls.dag_id == dag_id).first()
+        if row is None:
+            return None, None
+        return SerializedDAG.from_json(row.data), row.last_updated
+
+    @classmethod
+    @provide_session
+    def remove_inactive_dags(cls, session=None):
+        """
+        Removes the serialization of the DAGs that are not active anymore, e.g.
+        because their DAG file was deleted.
+
+        :param session: database session
+        :type session: sqlalchemy.orm.session.Session
+        """
+        inactive_dag_ids = session.query(DagModel.dag_id).filter(~DagModel.is_active)
+        (session
+         .query(cls)
+         .filter(cls.dag_id.in_(inactive_dag_ids))
+         .delete(synchronize_session=False))
+        session.commit()
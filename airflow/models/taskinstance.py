@@ -29,7 +29,9 @@ from datetime import timedelta
 from urllib.parse import quote
 
 import dill
-from sqlalchemy import Column, String, Float, Integer, PickleType, Index, func
+from sqlalchemy import (
+    Column, String, Float, Integer, PickleType, Index, and_, func, or_, tuple_
+)
 from sqlalchemy.orm import reconstructor
 
 from airflow import configuration, settings
@@ -481,6 +483,86 @@ class TaskInstance(Base, LoggingMixin):
         session.merge(self)
         session.commit()
 
+    @staticmethod
+    @provide_session
+    def bulk_set_state(keys, old_states, new_state, values=None, session=None):
+        """
+        Moves the task instances identified by the given keys that are in one of
+        the old states to the new state, and returns the keys of the task
+        instances that were changed. The state change is done with a single
+        UPDATE statement instead of loading and flushing every task instance.
+
+        On PostgreSQL the rows are locked with SKIP LOCKED, so rows locked by
+        another scheduler are left alone, and the changed keys are returned by
+        the same statement with RETURNING. On other databases the rows are
+        locked and read with a SELECT ... FOR UPDATE first. The caller is
+        responsible for committing the session.
+
+        :param keys: the (dag_id, task_id, execution_date) of the task instances
+        :type keys: list[tuple]
+        :param old_states: only task instances in one of these states are changed
+        :type old_states: Iterable[airflow.utils.state.State]
+        :param new_state: the state to set
+        :type new_state: airflow.utils.state.State
+        :param values: other column names and values to set along with the state,
+            values can be SQL expressions
+        :type values: dict
+        :param session: database session
+        :type session: sqlalchemy.orm.session.Session
+        :return: the (dag_id, task_id, execution_date) of the changed task instances
+        :rtype: list[tuple]
+        """
+        if not keys:
+            return []
+
+        TI = TaskInstance
+        old_states = list(old_states)
+        filter_for_keys = or_(*[
+            and_(
+                TI.dag_id == dag_id,
+                TI.task_id == task_id,
+                TI.execution_date == execution_date)
+            for dag_id, task_id, execution_date in keys])
+        if None in old_states:
+            filter_for_states = or_(TI.state == None, TI.state.in_(old_states))  # noqa: E711
+        else:
+            filter_for_states = TI.state.in_(old_states)
+
+        values = dict(values or {})
+        values['state'] = new_state
+
+        qry = (
+            session
+            .query(TI.dag_id, TI.task_id, TI.execution_date)
+            .filter(filter_for_keys)
+            .filter(filter_for_states))
+
+        if session.bind.dialect.name == 'postgresql':
+            table = TI.__table__
+            locked = qry.with_for_update(skip_locked=True).statement
+            stmt = (
+                table
+                .update()
+                .where(tuple_(table.c.dag_id,
+                              table.c.task_id,
+                              table.c.execution_date).in_(locked))
+                .values(values)
+                .returning(table.c.dag_id, table.c.task_id, table.c.execution_date))
+            return [tuple(row) for row in session.execute(stmt)]
+
+        changed_keys = [tuple(row) for row in qry.with_for_update().all()]
+        if changed_keys:
+            (session
+             .query(TI)
+             .filter(or_(*[
+                 and_(
+                     TI.dag_id == dag_id,
+                     TI.task_id == task_id,
+                     TI.execution_date == execution_date)
+                 for dag_id, task_id, execution_date in changed_keys]))
+             .update(values, synchronize_session=False))
+        return changed_keys
+
     @property
     def is_premature(self):
         """
@@ -24,6 +24,7 @@ from six import string_types
 import socket
 import string
 import textwrap
+import time
 from typing import Any
 
 from airflow import configuration as conf
@@ -32,6 +33,35 @@ from airflow.exceptions import InvalidStatsNameException
 log = logging.getLogger(__name__)
 
 
+class Timer(object):
+    """
+    Reports the time spent between ``start`` and ``stop``, in milliseconds,
+    through the ``timing`` method of a stats logger. Can be used as a context
+    manager. The measured duration is also kept on the timer so callers can
+    log it.
+    """
+
+    def __init__(self, stats_logger, stat):
+        self.stats_logger = stats_logger
+        self.stat = stat
+        self.duration = None
+        self._start = None
+
+    def start(self):
+        self._start = time.time()
+        return self
+
+    def stop(self):
+        self.duration = (time.time() - self._start) * 1000
+        self.stats_logger.timing(self.stat, self.duration)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
 class DummyStatsLogger(object):
     @classmethod
     def incr(cls, stat, count=1, rate=1):
@@ -49,6 +79,10 @@ class DummyStatsLogger(object):
     def timing(cls, stat, dt):
         pass
 
+    @classmethod
+    def timer(cls, stat):
+        return Timer(cls, stat)
+
 
 # Only characters in the character set are considered valid
 # for the stat_name if stat_name_default_handler is used.
@@ -110,6 +144,9 @@ class SafeStatsdLogger(object):
     def timing(self, stat, dt):
         return self.statsd.timing(stat, dt)
 
+    def timer(self, stat):
+        return Timer(self, stat)
+
 
 Stats = DummyStatsLogger  # type: Any
 
@@ -36,6 +36,9 @@ def get_task_runner(local_task_job):
     """
     if _TASK_RUNNER == "StandardTaskRunner":
         return StandardTaskRunner(local_task_job)
+    elif _TASK_RUNNER == "ForkTaskRunner":
+        from airflow.task.task_runner.fork_task_runner import ForkTaskRunner
+        return ForkTaskRunner(local_task_job)
     elif _TASK_RUNNER == "CgroupTaskRunner":
         from airflow.contrib.task_runner.cgroup_task_runner import CgroupTaskRunner
         return CgroupTaskRunner(local_task_job)
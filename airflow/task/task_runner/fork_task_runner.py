@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import getpass
+import os
+import signal
+import sys
+import threading
+
+import psutil
+
+from airflow.task.task_runner.standard_task_runner import StandardTaskRunner
+from airflow.utils.helpers import reap_process_group
+
+
+class ForkTaskRunner(StandardTaskRunner):
+    """
+    Runs the raw Airflow task in a child forked from the process of the local
+    task job, which has already imported Airflow and parsed the DAG of the task,
+    instead of starting a new Python interpreter. The output of the child is
+    captured like the output of the `airflow run --raw` subprocess, and the
+    child leads its own process group so that terminating it also terminates
+    the processes it started.
+
+    Tasks run as another user still run in a subprocess, started with sudo.
+    """
+    def __init__(self, local_task_job):
+        super().__init__(local_task_job)
+        self._pid = None
+        self._return_code = None
+
+    def start(self):
+        if self.run_as_user and self.run_as_user != getpass.getuser():
+            super().start()
+            return
+        self.process = self._start_by_fork()
+
+    def _start_by_fork(self):
+        # Output buffered before the fork would be written by both processes
+        sys.stdout.flush()
+        sys.stderr.flush()
+        read_fd, write_fd = os.pipe()
+
+        pid = os.fork()
+        if pid:
+            os.close(write_fd)
+            self.log.info('Running %s in forked process %s', self._command, pid)
+            self._pid = pid
+
+            # Start daemon thread to read the output of the child
+            log_reader = threading.Thread(
+                target=self._read_task_logs,
+                args=(os.fdopen(read_fd, 'r'),),
+            )
+            log_reader.daemon = True
+            log_reader.start()
+            return psutil.Process(pid)
+
+        exit_code = 1
+        try:
+            os.setsid()
+            os.close(read_fd)
+            os.dup2(write_fd, sys.stdout.fileno())
+            os.dup2(write_fd, sys.stderr.fileno())
+            os.close(write_fd)
+
+            # The child must not run the signal handlers of the local task job
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+            # Database connections can't be shared with the parent, the run
+            # command configures the ORM again
+            from airflow import settings
+            settings.engine.dispose()
+
+            from airflow.bin.cli import get_parser
+            # Skip the name of the executable
+            args = get_parser().parse_args(self._command[1:])
+            args.func(args, dag=getattr(self._task_instance.task, 'dag', None))
+            exit_code = 0
+        except SystemExit as e:
+            exit_code = 0 if e.code in (None, 0) else 1
+        except Exception:
+            self.log.exception("Failed to run %s", self._command)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    def return_code(self):
+        if self._pid is None:
+            return super().return_code()
+        if self._return_code is None:
+            try:
+                pid, status = os.waitpid(self._pid, os.WNOHANG)
+            except ChildProcessError:
+                # The child was reaped by someone else, its exit status is lost
+                self.log.warning("Could not get the exit status of process %s", self._pid)
+                self._return_code = 1
+                return self._return_code
+            if pid:
+                if os.WIFSIGNALED(status):
+                    self._return_code = -os.WTERMSIG(status)
+                else:
+                    self._return_code = os.WEXITSTATUS(status)
+        return self._return_code
+
+    def terminate(self):
+        if self._pid is None:
+            super().terminate()
+            return
+        if self._return_code is None and psutil.pid_exists(self._pid):
+            return_codes = reap_process_group(self._pid, self.log)
+            # The child is reaped while waiting for it to terminate
+            if self._pid in return_codes:
+                self._return_code = return_codes[self._pid]
@@ -66,6 +66,11 @@ class DepContext(object):
     :type ignore_task_deps: bool
     :param ignore_ti_state: Ignore the task instance's previous failure/success
     :type ignore_ti_state: bool
+    :param finished_tasks: The finished task instances of the dag run the evaluated task
+        instances belong to. When set, dependencies on the state of upstream tasks (e.g.
+        the trigger rule) are computed in memory from these instead of issuing a query
+        per task instance. Leave unset to always read upstream states from the database.
+    :type finished_tasks: list[airflow.models.TaskInstance]
     """
     def __init__(
             self,
@@ -76,7 +81,8 @@ class DepContext(object):
             ignore_in_retry_period=False,
             ignore_in_reschedule_period=False,
             ignore_task_deps=False,
-            ignore_ti_state=False):
+            ignore_ti_state=False,
+            finished_tasks=None):
         self.deps = deps or set()
         self.flag_upstream_failed = flag_upstream_failed
         self.ignore_all_deps = ignore_all_deps
@@ -85,6 +91,24 @@ class DepContext(object):
         self.ignore_in_reschedule_period = ignore_in_reschedule_period
         self.ignore_task_deps = ignore_task_deps
         self.ignore_ti_state = ignore_ti_state
+        self.finished_tasks = finished_tasks
+        self._finished_tasks_by_task_id = None
+
+    def get_finished_tasks_by_task_id(self):
+        """
+        Returns the finished task instances of the dag run indexed by task id, so that
+        the upstream task instances of a task can be looked up through the DAG's
+        adjacency without scanning the whole dag run. Returns None if this context was
+        not given the finished task instances.
+
+        :rtype: dict[str, airflow.models.TaskInstance]
+        """
+        if self.finished_tasks is None:
+            return None
+        if self._finished_tasks_by_task_id is None:
+            self._finished_tasks_by_task_id = {
+                ti.task_id: ti for ti in self.finished_tasks}
+        return self._finished_tasks_by_task_id
 
 
 # In order to be able to get queued a task must have one of these states
@@ -17,6 +17,8 @@
 # specific language governing permissions and limitations
 # under the License.
 
+from collections import Counter
+
 from sqlalchemy import case, func
 
 import airflow
@@ -24,6 +26,14 @@ from airflow.ti_deps.deps.base_ti_dep import BaseTIDep
 from airflow.utils.db import provide_session
 from airflow.utils.state import State
 
+# Upstream states taken into account when evaluating trigger rules
+COUNTED_STATES = [
+    State.SUCCESS,
+    State.FAILED,
+    State.UPSTREAM_FAILED,
+    State.SKIPPED,
+]
+
 
 class TriggerRuleDep(BaseTIDep):
     """
@@ -36,7 +46,6 @@ class TriggerRuleDep(BaseTIDep):
 
     @provide_session
     def _get_dep_statuses(self, ti, session, dep_context):
-        TI = airflow.models.TaskInstance
         TR = airflow.utils.trigger_rule.TriggerRule
 
         # Checking that all upstream dependencies have succeeded
@@ -49,9 +58,68 @@ class TriggerRuleDep(BaseTIDep):
             yield self._passing_status(reason="The task had a dummy trigger rule set.")
             return
 
-        # TODO(unknown): this query becomes quite expensive with dags that have many
-        # tasks. It should be refactored to let the task report to the dag run and get the
-        # aggregates from there.
+        finished_tasks = dep_context.get_finished_tasks_by_task_id()
+        if finished_tasks is not None:
+            successes, skipped, failed, upstream_failed, done = \
+                self._get_states_count_upstream_ti(ti, finished_tasks)
+        else:
+            successes, skipped, failed, upstream_failed, done = \
+                self._query_states_count_upstream_ti(ti, session)
+
+        for dep_status in self._evaluate_trigger_rule(
+                ti=ti,
+                successes=successes,
+                skipped=skipped,
+                failed=failed,
+                upstream_failed=upstream_failed,
+                done=done,
+                flag_upstream_failed=dep_context.flag_upstream_failed,
+                session=session):
+            yield dep_status
+
+    @staticmethod
+    def _get_states_count_upstream_ti(ti, finished_tasks):
+        """
+        Counts the states of the upstream task instances of the given task instance in
+        memory, following the upstream task ids of its task.
+
+        :param ti: the task instance to count the upstream states of
+        :type ti: airflow.models.TaskInstance
+        :param finished_tasks: the finished task instances of the dag run keyed by
+            task id
+        :type finished_tasks: dict[str, airflow.models.TaskInstance]
+        :return: a tuple of successes, skipped, failed, upstream_failed and done counts
+        :rtype: tuple[int]
+        """
+        counter = Counter()
+        for task_id in ti.task.upstream_task_ids:
+            upstream_ti = finished_tasks.get(task_id)
+            if upstream_ti is not None and upstream_ti.state in COUNTED_STATES:
+                counter[upstream_ti.state] += 1
+        return (
+            counter[State.SUCCESS],
+            counter[State.SKIPPED],
+            counter[State.FAILED],
+            counter[State.UPSTREAM_FAILED],
+            sum(counter.values()),
+        )
+
+    @staticmethod
+    def _query_states_count_upstream_ti(ti, session):
+        """
+        Counts the states of the upstream task instances of the given task instance
+        with an aggregate query. This costs a query per task instance, callers that
+        evaluate a whole dag run should pass its finished task instances in the
+        dependency context instead.
+
+        :param ti: the task instance to count the upstream states of
+        :type ti: airflow.models.TaskInstance
+        :param session: database session
+        :type session: sqlalchemy.orm.session.Session
+        :return: a tuple of successes, skipped, failed, upstream_failed and done counts
+        :rtype: tuple[int]
+        """
+        TI = airflow.models.TaskInstance
         qry = (
             session
             .query(
@@ -69,23 +137,10 @@ class TriggerRuleDep(BaseTIDep):
                 TI.dag_id == ti.dag_id,
                 TI.task_id.in_(ti.task.upstream_task_ids),
                 TI.execution_date == ti.execution_date,
-                TI.state.in_([
-                    State.SUCCESS, State.FAILED,
-                    State.UPSTREAM_FAILED, State.SKIPPED]),
+                TI.state.in_(COUNTED_STATES),
             )
         )
-
-        successes, skipped, failed, upstream_failed, done = qry.first()
-        for dep_status in self._evaluate_trigger_rule(
-                ti=ti,
-                successes=successes,
-                skipped=skipped,
-                failed=failed,
-                upstream_failed=upstream_failed,
-                done=done,
-                flag_upstream_failed=dep_context.flag_upstream_failed,
-                session=session):
-            yield dep_status
+        return qry.first()
 
     @provide_session
     def _evaluate_trigger_rule(
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import ast
+import os
+import time
+from collections import defaultdict, namedtuple
+
+from airflow.exceptions import AirflowConfigException
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+CREATED = 'created'
+MODIFIED = 'modified'
+DELETED = 'deleted'
+
+WATCHED_EXTENSIONS = ('.py', '.zip')
+IGNORE_FILE_NAME = '.airflowignore'
+
+DagDirChanges = namedtuple('DagDirChanges', ['changed_paths', 'structure_changed'])
+"""
+Changes of a DAG directory since they were last looked for.
+
+:param changed_paths: the files that were modified, and the files importing them
+:param structure_changed: whether files were created or deleted, or whether the
+    changes are unknown, in which case the directory needs to be listed again
+"""
+
+
+def _is_watched(path):
+    return (path.endswith(WATCHED_EXTENSIONS) or
+            os.path.basename(path) == IGNORE_FILE_NAME)
+
+
+def _walk_files(directory):
+    for root, _, files in os.walk(directory, followlinks=True):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            if _is_watched(path):
+                yield path
+
+
+class DagImportGraph(object):
+    """
+    Graph of the imports between the Python files of a DAG directory, used to
+    find the DAG files that need to be parsed again when a module they import,
+    directly or not, is changed. Modules are resolved relative to the DAG
+    directory, which is on ``sys.path`` when DAG files are parsed.
+
+    :param directory: the DAG directory
+    :type directory: unicode
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        # Map from file path to the paths of the modules it imports
+        self._imports = {}
+        # Map from file path to its modification time when it was parsed
+        self._mtimes = {}
+
+    def refresh(self):
+        """
+        Parses the Python files of the directory that changed since the last
+        refresh, and forgets about the deleted ones.
+        """
+        paths = set(path for path in _walk_files(self._directory)
+                    if path.endswith('.py'))
+        for path in list(self._imports):
+            if path not in paths:
+                self.remove(path)
+        for path in paths:
+            self.update(path)
+
+    def update(self, path):
+        """
+        Parses the imports of a file again if it changed since it was parsed.
+
+        :param path: path of the file
+        :type path: unicode
+        """
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self.remove(path)
+            return
+        if self._mtimes.get(path) == mtime:
+            return
+        self._mtimes[path] = mtime
+        self._imports[path] = self._parse_imports(path)
+
+    def remove(self, path):
+        self._imports.pop(path, None)
+        self._mtimes.pop(path, None)
+
+    def dependents(self, paths):
+        """
+        Returns the files importing any of the given files, directly or not.
+
+        :param paths: paths of the imported files
+        :type paths: Iterable[unicode]
+        :rtype: set[unicode]
+        """
+        imported_by = defaultdict(set)
+        for path, imports in self._imports.items():
+            for imported_path in imports:
+                imported_by[imported_path].add(path)
+
+        dependents = set()
+        to_visit = list(paths)
+        while to_visit:
+            for path in imported_by.get(to_visit.pop(), ()):
+                if path not in dependents:
+                    dependents.add(path)
+                    to_visit.append(path)
+        return dependents
+
+    def dependencies(self, path):
+        """
+        Returns the files of the directory imported by the given file, directly
+        or not. The imports of the files are parsed if needed.
+
+        :param path: path of the importing file
+        :type path: unicode
+        :rtype: set[unicode]
+        """
+        dependencies = set()
+        to_visit = [path]
+        while to_visit:
+            visited_path = to_visit.pop()
+            self.update(visited_path)
+            for imported_path in self._imports.get(visited_path, ()):
+                if imported_path not in dependencies and os.path.isfile(imported_path):
+                    dependencies.add(imported_path)
+                    to_visit.append(imported_path)
+        dependencies.discard(path)
+        return dependencies
+
+    def _parse_imports(self, path):
+        try:
+            with open(path, 'rb') as source:
+                tree = ast.parse(source.read(), path)
+        except Exception:
+            return set()
+
+        module_names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                module_names.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                module = self._absolute_module(path, node.module, node.level)
+                if module is None:
+                    continue
+                if module:
+                    module_names.add(module)
+                module_names.update(
+                    '.'.join(filter(None, (module, alias.name))) for alias in node.names)
+
+        module_paths = set()
+        for module_name in module_names:
+            module_paths.update(self._module_paths(module_name))
+        return module_paths
+
+    def _absolute_module(self, path, module, level):
+        if not level:
+            return module
+        package_dir = os.path.dirname(path)
+        for _ in range(level - 1):
+            package_dir = os.path.dirname(package_dir)
+        package = os.path.relpath(package_dir, self._directory)
+        if package.startswith(os.pardir):
+            return None
+        parts = [] if package == os.curdir else package.split(os.sep)
+        return '.'.join(parts + ([module] if module else []))
+
+    def _module_paths(self, module_name):
+        # Importing a module also runs the __init__.py of its parent packages
+        parts = module_name.split('.')
+        paths = []
+        for i in range(1, len(parts) + 1):
+            base = os.path.join(self._directory, *parts[:i])
+            paths.append(base + '.py')
+            paths.append(os.path.join(base, '__init__.py'))
+        return paths
+
+
+class PollingDagDirWatcher(LoggingMixin):
+    """
+    Finds the changed files of a directory by comparing the modification time
+    and size of its files with the ones they had at the previous poll.
+
+    :param directory: the directory to watch
+    :type directory: unicode
+    :param poll_interval: minimum number of seconds between two polls
+    :type poll_interval: float
+    """
+
+    def __init__(self, directory, poll_interval=0):
+        self._directory = directory
+        self._poll_interval = poll_interval
+        self._last_poll_time = 0
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for path in _walk_files(self._directory):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime, stat.st_size)
+        self._last_poll_time = time.time()
+        return snapshot
+
+    def get_changes(self):
+        """
+        :return: a map from the paths of the changed files to the kind of change
+        :rtype: dict[unicode, str]
+        """
+        if time.time() - self._last_poll_time < self._poll_interval:
+            return {}
+        previous, self._snapshot = self._snapshot, self._take_snapshot()
+        changes = {}
+        for path, stat in self._snapshot.items():
+            if path not in previous:
+                changes[path] = CREATED
+            elif previous[path] != stat:
+                changes[path] = MODIFIED
+        for path in previous:
+            if path not in self._snapshot:
+                changes[path] = DELETED
+        return changes
+
+    def close(self):
+        pass
+
+
+class InotifyDagDirWatcher(LoggingMixin):
+    """
+    Finds the changed files of a directory from the inotify events of the
+    directory and its sub-directories. Requires Linux and the ``inotify_simple``
+    package.
+
+    :param directory: the directory to watch
+    :type directory: unicode
+    """
+
+    def __init__(self, directory):
+        from inotify_simple import INotify, flags
+
+        self._flags = flags
+        self._mask = (flags.CREATE | flags.CLOSE_WRITE | flags.DELETE |
+                      flags.MOVED_FROM | flags.MOVED_TO | flags.DELETE_SELF)
+        self._inotify = INotify()
+        # Map from watch descriptor to the watched directory
+        self._watched_dirs = {}
+        self._watch(directory)
+
+    def _watch(self, directory):
+        for root, _, _ in os.walk(directory, followlinks=True):
+            try:
+                self._watched_dirs[self._inotify.add_watch(root, self._mask)] = root
+            except OSError:
+                self.log.warning("Could not watch %s", root, exc_info=True)
+
+    def get_changes(self):
+        """
+        :return: a map from the paths of the changed files to the kind of change,
+            or None if the changes are unknown
+        :rtype: dict[unicode, str]
+        """
+        flags = self._flags
+        changes = {}
+        for event in self._inotify.read(timeout=0):
+            if event.mask & flags.Q_OVERFLOW:
+                self.log.warning("Too many inotify events, some were lost")
+                return None
+            if event.mask & flags.IGNORED:
+                self._watched_dirs.pop(event.wd, None)
+                continue
+            directory = self._watched_dirs.get(event.wd)
+            if directory is None or not event.name:
+                continue
+            path = os.path.join(directory, event.name)
+
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    self._watch(path)
+                    for file_path in _walk_files(path):
+                        changes[file_path] = CREATED
+                elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+                    # The files of a deleted directory are not reported one by one
+                    return None
+            elif _is_watched(path):
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    changes[path] = CREATED
+                elif event.mask & (flags.DELETE | flags.MOVED_FROM):
+                    changes[path] = DELETED
+                elif changes.get(path) != CREATED:
+                    changes[path] = MODIFIED
+        return changes
+
+    def close(self):
+        self._inotify.close()
+
+
+class DagDirWatcher(LoggingMixin):
+    """
+    Watches a DAG directory for changed files, using inotify events when
+    available and polling otherwise, and finds the DAG files to parse again: the
+    changed files and the files importing them.
+
+    :param directory: the DAG directory
+    :type directory: unicode
+    :param mode: ``inotify``, ``poll``, or ``auto`` to use inotify when it is
+        available and to fall back to polling otherwise
+    :type mode: str
+    :param poll_interval: minimum number of seconds between two polls of the
+        directory when polling
+    :type poll_interval: float
+    """
+
+    MODES = ('auto', 'inotify', 'poll')
+
+    def __init__(self, directory, mode='auto', poll_interval=0):
+        if mode not in self.MODES:
+            raise AirflowConfigException(
+                "Unknown DAG directory watcher mode {!r}, expected one of {}".format(
+                    mode, ", ".join(self.MODES)))
+        self._directory = directory
+        self._mode = mode
+        self._poll_interval = poll_interval
+        self._import_graph = DagImportGraph(directory)
+        self._watcher = None
+        self.refresh()
+
+    def _create_watcher(self):
+        if self._mode in ('auto', 'inotify'):
+            try:
+                return InotifyDagDirWatcher(self._directory)
+            except (ImportError, OSError) as e:
+                if self._mode == 'inotify':
+                    raise
+                self.log.info("Cannot use inotify to watch %s (%s), polling instead",
+                              self._directory, e)
+        return PollingDagDirWatcher(self._directory, self._poll_interval)
+
+    def refresh(self):
+        """
+        Starts watching the directory again from its current content, and parses
+        the imports of its files again.
+        """
+        if self._watcher:
+            self._watcher.close()
+        self._watcher = self._create_watcher()
+        self._import_graph.refresh()
+
+    def get_changes(self):
+        """
+        Returns the changes of the directory since the last call.
+
+        :rtype: DagDirChanges
+        """
+        changes = self._watcher.get_changes()
+        if changes is None:
+            self.refresh()
+            return DagDirChanges(changed_paths=set(), structure_changed=True)
+        if not changes:
+            return DagDirChanges(changed_paths=set(), structure_changed=False)
+
+        structure_changed = False
+        for path, change in changes.items():
+            if change != MODIFIED or os.path.basename(path) == IGNORE_FILE_NAME:
+                structure_changed = True
+            if path.endswith('.py'):
+                self._import_graph.update(path)
+
+        changed_paths = set(path for path, change in changes.items()
+                            if change != DELETED)
+        changed_paths |= self._import_graph.dependents(changes)
+        return DagDirChanges(changed_paths=changed_paths,
+                             structure_changed=structure_changed)
+
+    def close(self):
+        self._watcher.close()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import glob
+import hashlib
+import os
+import sys
+import time
+import zipfile
+
+import dill
+
+from airflow import version
+from airflow.configuration import mkdir_p
+from airflow.stats import Stats
+from airflow.utils.dag_dir_watcher import DagImportGraph
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+# DAG files containing this marker are never cached, e.g. because their DAGs
+# depend on variables, files or the current time
+NO_PARSE_CACHE_MARKER = b'airflow: no_parse_cache'
+
+UNCACHEABLE_SUFFIX = '.uncacheable'
+
+
+class DagParseCache(LoggingMixin):
+    """
+    Cache of the DAGs found in DAG files, stored on disk so that it outlives the
+    short-lived processes parsing DAG files. An entry is keyed by a hash of the
+    Airflow version, the path and content of the DAG file and the content of the
+    modules of the DAGs folder it imports, directly or not, so that an unchanged
+    file does not need to be executed again to get its DAGs.
+
+    The DAGs of a file are not cached if the file contains
+    ``airflow: no_parse_cache``, if they can't be pickled, or once they failed to
+    be unpickled. Entries older than ``ttl`` seconds are ignored, for DAG files
+    whose DAGs depend on more than their code.
+
+    :param cache_folder: the folder the entries are stored in
+    :type cache_folder: unicode
+    :param dags_folder: the DAGs folder, which is on ``sys.path`` when parsing
+        DAG files, to find the imported modules
+    :type dags_folder: unicode
+    :param ttl: seconds after which an entry expires, 0 for never
+    :type ttl: int
+    """
+
+    def __init__(self, cache_folder, dags_folder, ttl=0):
+        self.cache_folder = cache_folder
+        self.ttl = ttl
+        self._import_graph = DagImportGraph(dags_folder) if dags_folder else None
+        mkdir_p(cache_folder)
+
+    def get_key(self, filepath):
+        """
+        Returns the key of the entry of a DAG file, or None if its DAGs must not
+        be cached.
+
+        :param filepath: path of the DAG file
+        :type filepath: unicode
+        :rtype: str
+        """
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        if NO_PARSE_CACHE_MARKER in content:
+            return None
+
+        key = hashlib.sha256()
+        key.update(version.version.encode('utf-8'))
+        key.update(filepath.encode('utf-8'))
+        key.update(content)
+        if self._import_graph and not zipfile.is_zipfile(filepath):
+            for dependency in sorted(self._import_graph.dependencies(filepath)):
+                with open(dependency, 'rb') as f:
+                    key.update(dependency.encode('utf-8'))
+                    key.update(f.read())
+        return '{}-{}'.format(self._path_hash(filepath), key.hexdigest())
+
+    @staticmethod
+    def _path_hash(filepath):
+        return hashlib.sha1(filepath.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_folder, key + '.pkl')
+
+    def load(self, key):
+        """
+        Returns the cached DAGs of an entry, or None if there are none.
+
+        :param key: key of the entry
+        :type key: str
+        :rtype: list[airflow.models.DAG]
+        """
+        entry_path = self._entry_path(key)
+        try:
+            if self.ttl and time.time() - os.path.getmtime(entry_path) > self.ttl:
+                Stats.incr('dag_parse_cache.misses')
+                return None
+            with open(entry_path, 'rb') as f:
+                dags = dill.load(f)
+        except (IOError, OSError):
+            Stats.incr('dag_parse_cache.misses')
+            return None
+        except Exception:
+            self.log.warning("Could not load the cached DAGs of %s, they won't be "
+                             "cached anymore", entry_path, exc_info=True)
+            self._set_uncacheable(key)
+            Stats.incr('dag_parse_cache.misses')
+            return None
+        Stats.incr('dag_parse_cache.hits')
+        return dags
+
+    def store(self, key, dags, module_names=()):
+        """
+        Stores the DAGs of a DAG file, replacing the previous entries of the file.
+
+        :param key: key of the entry
+        :type key: str
+        :param dags: the DAGs found in the file, without their sub-DAGs
+        :type dags: list[airflow.models.DAG]
+        :param module_names: names of the modules the file was imported as. They
+            are hidden from ``sys.modules`` while pickling so that the functions
+            and classes defined in the file are pickled by value.
+        :type module_names: Iterable[str]
+        """
+        if os.path.exists(self._entry_path(key) + UNCACHEABLE_SUFFIX):
+            return
+
+        hidden_modules = {name: sys.modules.pop(name) for name in module_names
+                          if name in sys.modules}
+        try:
+            data = dill.dumps(dags, recurse=True)
+        except Exception:
+            self.log.info("Could not pickle the DAGs of the parse cache entry %s, "
+                          "they won't be cached", key, exc_info=True)
+            self._set_uncacheable(key)
+            return
+        finally:
+            sys.modules.update(hidden_modules)
+
+        self._remove_entries(key.split('-')[0])
+        entry_path = self._entry_path(key)
+        tmp_path = '{}.{}.tmp'.format(entry_path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.rename(tmp_path, entry_path)
+
+    def _set_uncacheable(self, key):
+        self._remove_entries(key.split('-')[0])
+        open(self._entry_path(key) + UNCACHEABLE_SUFFIX, 'w').close()
+
+    def _remove_entries(self, path_hash):
+        for entry_path in glob.glob(os.path.join(self.cache_folder, path_hash + '-*')):
+            try:
+                os.remove(entry_path)
+            except OSError:
+                pass
@@ -34,7 +34,8 @@ import enum
 from queue import Empty
 
 import psutil
-from six.moves import reload_module
+import six
+from six.moves import intern, reload_module
 from sqlalchemy import or_
 from tabulate import tabulate
 
@@ -46,17 +47,47 @@ from airflow.exceptions import AirflowException
 from airflow.models import errors
 from airflow.stats import Stats
 from airflow.utils import timezone
+from airflow.utils.dag_dir_watcher import DagDirWatcher
 from airflow.utils.db import provide_session
 from airflow.utils.log.logging_mixin import LoggingMixin
 from airflow.utils.state import State
 
 
+# Version of the encoding of SimpleDags and SimpleTaskInstances sent between
+# the DAG file processors and the scheduler, to bump when the encoding changes
+SIMPLE_FORMAT_VERSION = 1
+
+
+def _check_simple_format_version(cls, state):
+    if state[0] != SIMPLE_FORMAT_VERSION:
+        raise AirflowException(
+            "Cannot decode a {} encoded with version {}, expected version {}".format(
+                cls.__name__, state[0], SIMPLE_FORMAT_VERSION))
+
+
+def _intern(value):
+    if not isinstance(value, six.string_types):
+        return value
+    try:
+        return intern(value)
+    except TypeError:
+        # Python 2 does not intern unicode strings
+        return value
+
+
 class SimpleDag(BaseDag):
     """
     A simplified representation of a DAG that contains all attributes
     required for instantiating and scheduling its associated tasks.
+
+    SimpleDags are sent in bulk from the DAG file processors to the scheduler,
+    so they have no ``__dict__``, their IDs are interned, and they are pickled
+    as a versioned tuple of the fields the scheduler reads.
     """
 
+    __slots__ = ('_dag_id', '_task_ids', '_full_filepath', '_is_paused',
+                 '_concurrency', '_pickle_id', '_task_concurrency')
+
     def __init__(self, dag, pickle_id=None):
         """
         :param dag: the DAG
@@ -64,19 +95,31 @@ class SimpleDag(BaseDag):
         :param pickle_id: ID associated with the pickled version of this DAG.
         :type pickle_id: unicode
         """
-        self._dag_id = dag.dag_id
-        self._task_ids = [task.task_id for task in dag.tasks]
+        self._dag_id = _intern(dag.dag_id)
+        self._task_ids = [_intern(task.task_id) for task in dag.tasks]
         self._full_filepath = dag.full_filepath
         self._is_paused = dag.is_paused
         self._concurrency = dag.concurrency
         self._pickle_id = pickle_id
-        self._task_special_args = {}
-        for task in dag.tasks:
-            special_args = {}
-            if task.task_concurrency is not None:
-                special_args['task_concurrency'] = task.task_concurrency
-            if len(special_args) > 0:
-                self._task_special_args[task.task_id] = special_args
+        # Only the tasks with a concurrency limit are in the map
+        self._task_concurrency = {
+            _intern(task.task_id): task.task_concurrency
+            for task in dag.tasks if task.task_concurrency is not None
+        }
+
+    def __getstate__(self):
+        return (SIMPLE_FORMAT_VERSION, self._dag_id, tuple(self._task_ids),
+                self._full_filepath, self._is_paused, self._concurrency,
+                self._pickle_id, tuple(self._task_concurrency.items()))
+
+    def __setstate__(self, state):
+        _check_simple_format_version(SimpleDag, state)
+        (_, dag_id, task_ids, self._full_filepath, self._is_paused,
+         self._concurrency, self._pickle_id, task_concurrency) = state
+        self._dag_id = _intern(dag_id)
+        self._task_ids = [_intern(task_id) for task_id in task_ids]
+        self._task_concurrency = {_intern(task_id): limit
+                                  for task_id, limit in task_concurrency}
 
     @property
     def dag_id(self):
@@ -128,29 +171,37 @@ class SimpleDag(BaseDag):
 
     @property
     def task_special_args(self):
-        return self._task_special_args
+        return {task_id: {'task_concurrency': limit}
+                for task_id, limit in self._task_concurrency.items()}
 
     def get_task_special_arg(self, task_id, special_arg_name):
-        if task_id in self._task_special_args and special_arg_name in self._task_special_args[task_id]:
-            return self._task_special_args[task_id][special_arg_name]
+        if special_arg_name == 'task_concurrency':
+            return self._task_concurrency.get(task_id)
         else:
             return None
 
 
 class SimpleTaskInstance(object):
+    """
+    A simplified representation of a task instance, with the fields the
+    scheduler, the executors and the DAG file processors read. Like SimpleDags,
+    SimpleTaskInstances have no ``__dict__`` and are pickled as a versioned
+    tuple.
+    """
+
+    __slots__ = ('_dag_id', '_task_id', '_execution_date', '_start_date',
+                 '_end_date', '_try_number', '_state', '_executor_config',
+                 '_pool', '_priority_weight', '_queue')
+
     def __init__(self, ti):
-        self._dag_id = ti.dag_id
-        self._task_id = ti.task_id
+        self._dag_id = _intern(ti.dag_id)
+        self._task_id = _intern(ti.task_id)
         self._execution_date = ti.execution_date
         self._start_date = ti.start_date
         self._end_date = ti.end_date
         self._try_number = ti.try_number
         self._state = ti.state
         self._executor_config = ti.executor_config
-        if hasattr(ti, 'run_as_user'):
-            self._run_as_user = ti.run_as_user
-        else:
-            self._run_as_user = None
         if hasattr(ti, 'pool'):
             self._pool = ti.pool
         else:
@@ -160,7 +211,20 @@ class SimpleTaskInstance(object):
         else:
             self._priority_weight = None
         self._queue = ti.queue
-        self._key = ti.key
+
+    def __getstate__(self):
+        return (SIMPLE_FORMAT_VERSION, self._dag_id, self._task_id,
+                self._execution_date, self._start_date, self._end_date,
+                self._try_number, self._state, self._executor_config,
+                self._pool, self._priority_weight, self._queue)
+
+    def __setstate__(self, state):
+        _check_simple_format_version(SimpleTaskInstance, state)
+        (_, dag_id, task_id, self._execution_date, self._start_date,
+         self._end_date, self._try_number, self._state, self._executor_config,
+         self._pool, self._priority_weight, self._queue) = state
+        self._dag_id = _intern(dag_id)
+        self._task_id = _intern(task_id)
 
     @property
     def dag_id(self):
@@ -204,7 +268,7 @@ class SimpleTaskInstance(object):
 
     @property
     def key(self):
-        return self._key
+        return self._dag_id, self._task_id, self._execution_date, self._try_number
 
     @property
     def executor_config(self):
@@ -720,7 +784,9 @@ class DagFileProcessorManager(LoggingMixin):
             for unlimited.
         :type max_runs: int
         :param processor_factory: function that creates processors for DAG
-            definition files. Arguments are (dag_definition_path)
+            definition files. Arguments are (dag_definition_path). Factories that
+            keep processes around between processors, like a pool of workers,
+            also have ``get_all_pids()`` and ``terminate()`` methods.
         :type processor_factory: (unicode, unicode, list) -> (AbstractDagFileProcessor)
         :param signal_conn: connection to communicate signal with processor agent.
         :type signal_conn: airflow.models.connection.Connection
@@ -779,6 +845,18 @@ class DagFileProcessorManager(LoggingMixin):
         self.dag_dir_list_interval = conf.getint('scheduler',
                                                  'dag_dir_list_interval')
 
+        # Watch the DAGs directory to process changed files right away, the
+        # directory is still listed every dag_dir_list_interval as a safety net.
+        self._dag_dir_watcher = None
+        dag_dir_watcher_mode = conf.get('scheduler', 'dag_dir_watcher')
+        if dag_dir_watcher_mode != 'off' and os.path.isdir(dag_directory or ''):
+            self._dag_dir_watcher = DagDirWatcher(
+                dag_directory,
+                mode=dag_dir_watcher_mode,
+                poll_interval=conf.getfloat('scheduler', 'dag_dir_watcher_poll_interval'))
+        # Changed files to queue once they are not being processed anymore
+        self._changed_file_paths = set()
+
         self._log = logging.getLogger('airflow.processor_manager')
 
         signal.signal(signal.SIGINT, self._exit_gracefully)
@@ -907,11 +985,24 @@ class DagFileProcessorManager(LoggingMixin):
 
     def _refresh_dag_dir(self):
         """
-        Refresh file paths from dag dir if we haven't done it for too long.
+        Refresh file paths from dag dir if we haven't done it for too long, or if
+        the DAG directory watcher saw files being created or deleted. Queue the
+        files the watcher saw changing.
         """
         elapsed_time_since_refresh = (timezone.utcnow() -
                                       self.last_dag_dir_refresh_time).total_seconds()
-        if elapsed_time_since_refresh > self.dag_dir_list_interval:
+        list_dag_dir = elapsed_time_since_refresh > self.dag_dir_list_interval
+
+        changed_file_paths = set()
+        if self._dag_dir_watcher:
+            changes = self._dag_dir_watcher.get_changes()
+            changed_file_paths = changes.changed_paths
+            if changes.structure_changed:
+                list_dag_dir = True
+            elif list_dag_dir:
+                self._dag_dir_watcher.refresh()
+
+        if list_dag_dir:
             # Build up a list of Python files that could contain DAGs
             self.log.info("Searching for files in %s", self._dag_directory)
             self._file_paths = list_py_file_paths(self._dag_directory)
@@ -925,6 +1016,33 @@ class DagFileProcessorManager(LoggingMixin):
             except Exception:
                 self.log.exception("Error removing old import errors")
 
+        if self._dag_dir_watcher:
+            self._queue_changed_file_paths(changed_file_paths)
+
+    def _queue_changed_file_paths(self, changed_file_paths):
+        """
+        Put the given DAG definition files at the front of the queue, even if they
+        were processed recently. Files being processed are queued once their
+        processor is done.
+
+        :param changed_file_paths: paths of the changed files
+        :type changed_file_paths: set[unicode]
+        """
+        self._changed_file_paths.update(
+            changed_file_paths.intersection(self._file_paths))
+        file_paths_to_queue = [file_path for file_path in self._changed_file_paths
+                               if file_path not in self._processors]
+        if not file_paths_to_queue:
+            return
+
+        self.log.info("Queuing changed files for processing:\n\t%s",
+                      "\n\t".join(file_paths_to_queue))
+        Stats.incr('dag_processing.changed_files', len(file_paths_to_queue))
+        self._changed_file_paths.difference_update(file_paths_to_queue)
+        self._file_path_queue = file_paths_to_queue + [
+            file_path for file_path in self._file_path_queue
+            if file_path not in file_paths_to_queue]
+
     def _print_stat(self):
         """
         Occasionally print out stats about how fast the files are getting processed
@@ -1045,10 +1163,14 @@ class DagFileProcessorManager(LoggingMixin):
 
     def get_all_pids(self):
         """
-        :return: a list of the PIDs for the processors that are running
+        :return: a list of the PIDs for the processors that are running, and of
+            the idle processes of the processor factory
         :rtype: List[int]
         """
-        return [x.pid for x in self._processors.values()]
+        pids = [x.pid for x in self._processors.values()]
+        if hasattr(self._processor_factory, 'get_all_pids'):
+            pids.extend(self._processor_factory.get_all_pids())
+        return pids
 
     def get_runtime(self, file_path):
         """
@@ -1115,6 +1237,7 @@ class DagFileProcessorManager(LoggingMixin):
                 self.log.warning("Stopping processor for %s", file_path)
                 processor.terminate()
         self._processors = filtered_processors
+        self._changed_file_paths.intersection_update(new_file_paths)
 
     def processing_count(self):
         """
@@ -1214,7 +1337,10 @@ class DagFileProcessorManager(LoggingMixin):
 
             self._file_path_queue.extend(files_paths_to_queue)
 
-        zombies = self._find_zombies()
+        # Zombies are looked for in the processor manager, not in the scheduler
+        # loop, so they are timed on their own
+        with Stats.timer('dag_processing.find_zombies'):
+            zombies = self._find_zombies()
 
         # Start more processors if we have enough slots and files to process
         while (self._parallelism - len(self._processors) > 0 and
@@ -1295,6 +1421,13 @@ class DagFileProcessorManager(LoggingMixin):
         Kill all child processes on exit since we don't want to leave
         them as orphaned.
         """
+        if self._dag_dir_watcher:
+            self._dag_dir_watcher.close()
+
+        # Stop the idle processes of the processor factory gracefully first
+        if hasattr(self._processor_factory, 'terminate'):
+            self._processor_factory.terminate()
+
         pids_to_kill = self.get_all_pids()
         if len(pids_to_kill) > 0:
             # First try SIGTERM
@@ -251,6 +251,8 @@ def reap_process_group(pid, log, sig=signal.SIGTERM,
     :param pid: pid to kill
     :param sig: signal type
     :param timeout: how much time a process has to terminate
+    :return: the return codes of the processes that terminated, by pid
+    :rtype: dict[int, int]
     """
 
     def on_terminate(p):
@@ -269,13 +271,14 @@ def reap_process_group(pid, log, sig=signal.SIGTERM,
     except OSError as err:
         # Skip if not such process - we experience a race and it just terminated
         if err.errno == errno.ESRCH:
-            return
+            return {}
         raise
 
     log.info("Sending %s to GPID %s", sig, pg)
     os.killpg(os.getpgid(pid), sig)
 
     gone, alive = psutil.wait_procs(children, timeout=timeout, callback=on_terminate)
+    return_codes = {p.pid: p.returncode for p in gone}
 
     if alive:
         for p in alive:
@@ -284,10 +287,13 @@ def reap_process_group(pid, log, sig=signal.SIGTERM,
         os.killpg(os.getpgid(pid), signal.SIGKILL)
 
         gone, alive = psutil.wait_procs(alive, timeout=timeout, callback=on_terminate)
+        return_codes.update((p.pid, p.returncode) for p in gone)
         if alive:
             for p in alive:
                 log.error("Process %s (%s) could not be killed. Giving up.", p, p.pid)
 
+    return return_codes
+
 
 def parse_template_string(template_string):
     if "{{" in template_string:  # jinja mode
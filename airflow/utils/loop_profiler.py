@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import json
+import math
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+
+from airflow.stats import Stats
+from airflow.utils.log.logging_mixin import LoggingMixin
+
+
+class LoopPhaseProfiler(LoggingMixin):
+    """
+    Times the phases of the iterations of a loop, e.g. the scheduler loop.
+
+    The duration of every phase, and of the whole iteration, is sent to StatsD as
+    ``<stat_prefix>.<phase>`` and ``<stat_prefix>.total`` in milliseconds. The
+    durations of the last ``window_size`` iterations are kept to compute
+    percentiles. If ``trace_file`` is given, every iteration is also written to it
+    as a line of JSON for offline analysis.
+
+    :param stat_prefix: prefix of the names of the timers sent to StatsD
+    :type stat_prefix: str
+    :param window_size: number of iterations to keep to compute percentiles
+    :type window_size: int
+    :param trace_file: path of the file to write the JSON trace to, the file is
+        truncated before the first iteration is written
+    :type trace_file: str
+    """
+
+    TOTAL = 'total'
+
+    def __init__(self, stat_prefix, window_size=1000, trace_file=None):
+        self.stat_prefix = stat_prefix
+        self.window_size = window_size
+        self.trace_file = trace_file
+        self.num_loops = 0
+        self._windows = defaultdict(lambda: deque(maxlen=self.window_size))
+        self._loop_start = None
+        self._phases = None
+
+    def start_loop(self):
+        """
+        Marks the start of an iteration.
+        """
+        self._loop_start = time.time()
+        self._phases = OrderedDict()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager timing a phase of the current iteration. A phase entered
+        several times during an iteration is reported with its cumulated duration.
+
+        :param name: name of the phase
+        :type name: str
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            duration = (time.time() - start) * 1000
+            Stats.timing('{}.{}'.format(self.stat_prefix, name), duration)
+            if self._phases is not None:
+                self._phases[name] = self._phases.get(name, 0) + duration
+
+    def end_loop(self, failed=False):
+        """
+        Marks the end of the current iteration, records its phases and writes
+        them to the trace file if any.
+
+        :param failed: whether the iteration was interrupted by an error, it is
+            then marked as failed in the trace file
+        :type failed: bool
+        :return: the duration of the iteration in milliseconds
+        :rtype: float
+        """
+        duration = (time.time() - self._loop_start) * 1000
+        Stats.timing('{}.{}'.format(self.stat_prefix, self.TOTAL), duration)
+
+        for name, phase_duration in self._phases.items():
+            self._windows[name].append(phase_duration)
+        self._windows[self.TOTAL].append(duration)
+        self.num_loops += 1
+
+        if self.trace_file:
+            mode = 'w' if self.num_loops == 1 else 'a'
+            with open(self.trace_file, mode) as trace_file:
+                json.dump({
+                    'loop': self.num_loops,
+                    'start': self._loop_start,
+                    'duration_ms': duration,
+                    'phases_ms': self._phases,
+                    'failed': failed,
+                }, trace_file)
+                trace_file.write('\n')
+
+        self._phases = None
+        return duration
+
+    def percentile(self, name, percent):
+        """
+        Returns the given percentile of the durations of a phase over the window,
+        using the nearest-rank method, or None if the phase was never recorded.
+
+        :param name: name of the phase, or ``total`` for whole iterations
+        :type name: str
+        :param percent: the percentile to compute, between 0 and 100
+        :type percent: float
+        :rtype: float
+        """
+        durations = sorted(self._windows.get(name, ()))
+        if not durations:
+            return None
+        rank = max(int(math.ceil(percent / 100.0 * len(durations))), 1)
+        return durations[rank - 1]
+
+    def report(self, percents=(50, 90, 99)):
+        """
+        Returns a summary of the durations of every phase over the window.
+
+        :param percents: the percentiles to include in the summary
+        :type percents: tuple[float]
+        :return: a map from phase name to the number of recorded iterations, the
+            mean, maximum and percentile durations in milliseconds
+        :rtype: dict[str, dict[str, float]]
+        """
+        report = OrderedDict()
+        for name, durations in self._windows.items():
+            summary = OrderedDict([
+                ('count', len(durations)),
+                ('mean', sum(durations) / len(durations)),
+                ('max', max(durations)),
+            ])
+            for percent in percents:
+                summary['p{}'.format(percent)] = self.percentile(name, percent)
+            report[name] = summary
+        return report
+
+    def log_report(self):
+        """
+        Logs the summary of the durations of every phase over the window.
+        """
+        for name, summary in self.report().items():
+            self.log.info(
+                "Loop phase %s over the last %s loop(s): %s", name, summary['count'],
+                ", ".join("{}={:.2f}ms".format(key, value)
+                          for key, value in summary.items() if key != 'count'))
@@ -71,11 +71,29 @@ from airflow.www.widgets import AirflowModelListWidget
 
 PAGE_SIZE = conf.getint('webserver', 'page_size')
 if os.environ.get('SKIP_DAGS_PARSING') != 'True':
-    dagbag = models.DagBag(settings.DAGS_FOLDER)
+    dagbag = models.DagBag(
+        settings.DAGS_FOLDER,
+        store_serialized_dags=conf.getboolean('core', 'store_serialized_dags'),
+        lazy_load=conf.getboolean('webserver', 'lazy_load_dags'),
+        max_cached_dags=conf.getint('webserver', 'max_cached_dags'))
 else:
     dagbag = models.DagBag(os.devnull, include_examples=False)
 
 
+@provide_session
+def get_all_dags(session=None):
+    """
+    Returns all the DAGs of the dagbag. When the DAGs are read from the database
+    or loaded lazily, the dagbag only holds the DAGs that were requested, so the
+    DAGs are looked up by the IDs of the active DAGs.
+    """
+    if not (dagbag.store_serialized_dags or dagbag.lazy_load):
+        return list(dagbag.dags.values())
+    dag_ids = session.query(DagModel.dag_id).filter(DagModel.is_active).all()
+    dags = (dagbag.get_dag(dag_id) for dag_id, in dag_ids)
+    return [dag for dag in dags if dag]
+
+
 def get_date_time_num_runs_dag_runs_form_data(request, session, dag):
     dttm = request.args.get('execution_date')
     if dttm:
@@ -455,7 +473,7 @@ class Airflow(AirflowBaseView):
         if not filter_dag_ids:
             return wwwutils.json_response({})
         dag_id = request.args.get('dag_id')
-        dags = [dagbag.dags.get(dag_id)] if dag_id else dagbag.dags.values()
+        dags = [dagbag.get_dag(dag_id)] if dag_id else get_all_dags()
         for dag in dags:
             if 'all_dags' in filter_dag_ids or dag.dag_id in filter_dag_ids:
                 if not dag.is_subdag:
@@ -968,8 +986,12 @@ class Airflow(AirflowBaseView):
 
             for dag_id, active_dag_runs in dags:
                 max_active_runs = 0
-                if dag_id in dagbag.dags:
-                    max_active_runs = dagbag.dags[dag_id].max_active_runs
+                if dagbag.store_serialized_dags or dagbag.lazy_load:
+                    dag = dagbag.get_dag(dag_id)
+                else:
+                    dag = dagbag.dags.get(dag_id)
+                if dag:
+                    max_active_runs = dag.max_active_runs
                 payload.append({
                     'dag_id': dag_id,
                     'active_dag_run': active_dag_runs,
@@ -1285,7 +1307,7 @@ class Airflow(AirflowBaseView):
         dag_id = request.args.get('dag_id')
         blur = conf.getboolean('webserver', 'demo_mode')
         dag = dagbag.get_dag(dag_id)
-        if dag_id not in dagbag.dags:
+        if not dag:
             flash('DAG "{0}" seems to be missing.'.format(dag_id), "error")
             return redirect(url_for('Airflow.index'))
 
@@ -1674,8 +1696,8 @@ class Airflow(AirflowBaseView):
     def refresh_all(self):
         dagbag.collect_dags(only_if_updated=False)
         # sync permissions for all dags
-        for dag_id, dag in dagbag.dags.items():
-            appbuilder.sm.sync_perm_for_dag(dag_id, dag.access_control)
+        for dag in get_all_dags():
+            appbuilder.sm.sync_perm_for_dag(dag.dag_id, dag.access_control)
         flash("All DAGs are now up to date")
         return redirect(url_for('Airflow.index'))
 
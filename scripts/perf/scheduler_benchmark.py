@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Benchmark of the throughput of the scheduler.
+
+A folder of synthetic DAGs is generated from the number of files, the number of
+DAGs per file and the number of tasks per DAG. The tasks of a DAG either all
+depend on a single root task (``wide``) or form a single chain (``deep``). A
+``SchedulerJob`` then runs against the configured metadata database
+(``sql_alchemy_conn``, e.g. SQLite or Postgres) until every task instance of the
+generated DAGs has finished, or until ``--max_loops`` or ``--timeout`` is reached.
+
+The report is written as JSON so that the results of different commits can be
+compared, e.g. with ``--compare baseline.json``. It contains the number of tasks
+scheduled per second, the percentiles of the durations of the scheduler loop and
+of its phases, and the number of queries run by the scheduler per loop. Queries
+run by the DAG file processors, which run in their own processes, are not counted.
+
+To Run:
+    $ python scripts/perf/scheduler_benchmark.py --files 10 --dags_per_file 2 \
+        --tasks_per_dag 20 --shape wide --output report.json
+
+By default the tasks are not run: the SimulatedExecutor marks them successful
+after a simulated duration, immediately unless ``--duration`` is given. Use
+``--executor SequentialExecutor`` to run them for real.
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+import airflow
+from airflow import configuration, settings
+from airflow.executors import SequentialExecutor
+from airflow.executors.simulated_executor import SimulatedExecutor
+from airflow.jobs import SchedulerJob
+from airflow.models import DagModel, DagRun, TaskInstance
+from airflow.utils.db import create_session
+from airflow.utils.loop_profiler import LoopPhaseProfiler
+from airflow.utils.state import State
+
+DAG_ID_PREFIX = 'perf_bench'
+SHAPES = ('wide', 'deep')
+EXECUTORS = ('SimulatedExecutor', 'SequentialExecutor')
+COMPARED_RESULTS = (
+    'tasks_scheduled_per_second',
+    'tasks_finished_per_second',
+    'loop_duration_ms.p50',
+    'loop_duration_ms.p90',
+    'loop_duration_ms.p99',
+    'queries_per_loop.mean',
+)
+
+DAG_FILE_HEADER = '''\
+# Generated by scripts/perf/scheduler_benchmark.py, do not edit.
+from datetime import datetime
+
+from airflow import DAG
+from airflow.operators.dummy_operator import DummyOperator
+'''
+
+DAG_TEMPLATE = '''
+with DAG(dag_id='{dag_id}', schedule_interval='@once',
+         start_date=datetime(2019, 1, 1)) as dag_{index}:
+    tasks = [DummyOperator(task_id='task_{{}}'.format(i)) for i in range({num_tasks})]
+    for i in range(1, {num_tasks}):
+        tasks[{upstream}] >> tasks[i]
+'''
+
+
+def dag_id_for(file_index, dag_index):
+    return '{}_{}_{}'.format(DAG_ID_PREFIX, file_index, dag_index)
+
+
+def generate_dag_folder(folder, num_files, dags_per_file, tasks_per_dag, shape):
+    """
+    Writes the synthetic DAG files to the given folder.
+
+    :return: the ids of the generated DAGs
+    :rtype: list[str]
+    """
+    upstream = '0' if shape == 'wide' else 'i - 1'
+    dag_ids = []
+    for file_index in range(num_files):
+        content = [DAG_FILE_HEADER]
+        for dag_index in range(dags_per_file):
+            dag_id = dag_id_for(file_index, dag_index)
+            content.append(DAG_TEMPLATE.format(
+                dag_id=dag_id, index=dag_index, num_tasks=tasks_per_dag,
+                upstream=upstream))
+            dag_ids.append(dag_id)
+        file_path = os.path.join(folder, '{}_{}.py'.format(DAG_ID_PREFIX, file_index))
+        with open(file_path, 'w') as dag_file:
+            dag_file.write(''.join(content))
+    return dag_ids
+
+
+def reset_dags(dag_ids):
+    """
+    Deletes the runs and task instances of the given DAGs left by a previous
+    benchmark, and registers the DAGs unpaused so that they are scheduled as soon
+    as they are parsed.
+    """
+    with create_session() as session:
+        session.query(TaskInstance).filter(
+            TaskInstance.dag_id.in_(dag_ids)).delete(synchronize_session=False)
+        session.query(DagRun).filter(
+            DagRun.dag_id.in_(dag_ids)).delete(synchronize_session=False)
+        session.query(DagModel).filter(
+            DagModel.dag_id.in_(dag_ids)).delete(synchronize_session=False)
+        for dag_id in dag_ids:
+            session.add(DagModel(dag_id=dag_id, is_paused=False))
+
+
+class QueryCounter(object):
+    """
+    Counts the queries run through the engine of this process.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.enabled = True
+
+    def _on_execute(self, *args, **kwargs):
+        if self.enabled:
+            self.count += 1
+
+    def start(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+
+    def stop(self):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+class BenchmarkLoopProfiler(LoopPhaseProfiler):
+    """
+    Profiles the scheduler loop like ``LoopPhaseProfiler`` and also records the
+    number of queries of every loop. Ends the scheduler once every task instance
+    of the benchmarked DAGs has finished.
+    """
+
+    def __init__(self, job, dag_ids, num_tasks, query_counter, max_loops, timeout,
+                 *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.job = job
+        self.dag_ids = dag_ids
+        self.num_tasks = num_tasks
+        self.query_counter = query_counter
+        self.max_loops = max_loops
+        self.deadline = time.time() + timeout
+        self.queries_per_loop = []
+        self.finished = False
+
+    def start_loop(self):
+        super().start_loop()
+        self.query_counter.count = 0
+
+    def end_loop(self):
+        duration = super().end_loop()
+        self.queries_per_loop.append(self.query_counter.count)
+
+        # The queries checking for completion are not part of the scheduler
+        self.query_counter.enabled = False
+        try:
+            with create_session() as session:
+                num_finished = session.query(TaskInstance).filter(
+                    TaskInstance.dag_id.in_(self.dag_ids),
+                    TaskInstance.state.in_(State.finished()),
+                ).count()
+        finally:
+            self.query_counter.enabled = True
+        self.finished = num_finished >= self.num_tasks
+
+        if self.finished or self.num_loops >= self.max_loops or \
+                time.time() > self.deadline:
+            self.job._last_loop = True
+        return duration
+
+
+def summarize(values, percents=(50, 90, 99)):
+    values = sorted(values)
+    if not values:
+        return OrderedDict([('count', 0)])
+    summary = OrderedDict([
+        ('count', len(values)),
+        ('mean', float(sum(values)) / len(values)),
+        ('max', values[-1]),
+    ])
+    for percent in percents:
+        rank = max(int(math.ceil(percent / 100.0 * len(values))), 1)
+        summary['p{}'.format(percent)] = values[rank - 1]
+    return summary
+
+
+def task_instance_results(dag_ids, start_date):
+    with create_session() as session:
+        tis = session.query(TaskInstance).filter(
+            TaskInstance.dag_id.in_(dag_ids)).all()
+    queued = [ti.queued_dttm for ti in tis if ti.queued_dttm]
+    finished = [ti for ti in tis if ti.state in State.finished()]
+    return OrderedDict([
+        ('task_instances', len(tis)),
+        ('task_instances_queued', len(queued)),
+        ('task_instances_finished', len(finished)),
+        ('last_queued_seconds',
+         (max(queued) - start_date).total_seconds() if queued else None),
+    ])
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args):
+    dag_folder = args.dag_folder or tempfile.mkdtemp(prefix='scheduler_benchmark_')
+    os.makedirs(dag_folder, exist_ok=True)
+    dag_ids = generate_dag_folder(dag_folder, args.files, args.dags_per_file,
+                                  args.tasks_per_dag, args.shape)
+    num_tasks = len(dag_ids) * args.tasks_per_dag
+    reset_dags(dag_ids)
+
+    # Do not pace the scheduler loop, it would hide its actual throughput
+    configuration.conf.set('core', 'unit_test_mode', 'True')
+
+    if args.executor == 'SimulatedExecutor':
+        executor = SimulatedExecutor(slots=args.slots, duration=args.duration,
+                                     failure_rate=0, seed=0)
+    else:
+        executor = SequentialExecutor()
+    job = SchedulerJob(dag_ids=dag_ids, subdir=dag_folder, num_runs=-1,
+                       processor_poll_interval=0, executor=executor)
+    query_counter = QueryCounter(settings.engine)
+    job.loop_profiler = BenchmarkLoopProfiler(
+        job, dag_ids, num_tasks, query_counter, args.max_loops, args.timeout,
+        stat_prefix='scheduler.loop')
+
+    query_counter.start()
+    start = time.time()
+    try:
+        job.run()
+    finally:
+        query_counter.stop()
+        if not args.dag_folder:
+            shutil.rmtree(dag_folder, ignore_errors=True)
+    duration = time.time() - start
+
+    profiler = job.loop_profiler
+    results = task_instance_results(dag_ids, job.start_date)
+    scheduled = results['task_instances_queued']
+    last_queued = results.pop('last_queued_seconds')
+    results['duration_seconds'] = duration
+    results['loops'] = profiler.num_loops
+    results['completed'] = profiler.finished
+    results['tasks_scheduled_per_second'] = scheduled / last_queued if last_queued else None
+    results['tasks_finished_per_second'] = results['task_instances_finished'] / duration
+    results['queries_per_loop'] = summarize(profiler.queries_per_loop)
+    phases = profiler.report()
+    results['loop_duration_ms'] = phases.pop(LoopPhaseProfiler.TOTAL, None)
+    results['phase_duration_ms'] = phases
+
+    return OrderedDict([
+        ('airflow_version', airflow.__version__),
+        ('git_commit', git_commit()),
+        ('timestamp', time.time()),
+        ('database', settings.engine.dialect.name),
+        ('parameters', OrderedDict([
+            ('files', args.files),
+            ('dags_per_file', args.dags_per_file),
+            ('tasks_per_dag', args.tasks_per_dag),
+            ('shape', args.shape),
+            ('executor', args.executor),
+            ('slots', args.slots),
+            ('duration', args.duration),
+            ('max_loops', args.max_loops),
+            ('timeout', args.timeout),
+        ])),
+        ('results', results),
+    ])
+
+
+def get_result(report, path):
+    value = report['results']
+    for key in path.split('.'):
+        value = (value or {}).get(key)
+    return value
+
+
+def compare(report, baseline):
+    """
+    Prints the change of the main results relative to a baseline report.
+    """
+    if report['parameters'] != baseline['parameters']:
+        print("Warning: the benchmark parameters differ from the baseline ones")
+    for path in COMPARED_RESULTS:
+        new, old = get_result(report, path), get_result(baseline, path)
+        if new is None or old is None:
+            continue
+        change = (new - old) * 100.0 / old if old else 0.0
+        print("{:<30} {:>12.2f} {:>12.2f} {:>+9.1f}%".format(path, old, new, change))
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the throughput of the scheduler on synthetic DAGs")
+    parser.add_argument('--files', type=int, default=10,
+                        help="Number of DAG files to generate")
+    parser.add_argument('--dags_per_file', type=int, default=1,
+                        help="Number of DAGs per file")
+    parser.add_argument('--tasks_per_dag', type=int, default=10,
+                        help="Number of tasks per DAG")
+    parser.add_argument('--shape', choices=SHAPES, default='wide',
+                        help="wide: every task depends on the first one, "
+                             "deep: the tasks form a chain")
+    parser.add_argument('--executor', choices=EXECUTORS, default='SimulatedExecutor',
+                        help="Executor the scheduler sends the tasks to")
+    parser.add_argument('--slots', type=int, default=0,
+                        help="Slots of the SimulatedExecutor, 0 for infinity")
+    parser.add_argument('--duration', default='constant:0',
+                        help="Distribution of the durations of the tasks run by "
+                             "the SimulatedExecutor, e.g. uniform:1,5")
+    parser.add_argument('--max_loops', type=int, default=1000,
+                        help="Maximum number of scheduler loops")
+    parser.add_argument('--timeout', type=float, default=600,
+                        help="Maximum duration of the benchmark in seconds")
+    parser.add_argument('--dag_folder',
+                        help="Folder to generate the DAGs in and keep, "
+                             "a temporary folder by default")
+    parser.add_argument('--output', help="File to write the JSON report to")
+    parser.add_argument('--compare', help="JSON report to compare the results to")
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    report = run_benchmark(args)
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            compare(report, json.load(baseline_file))
+
+    return 0 if report['results']['completed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
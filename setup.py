@@ -164,7 +164,7 @@ cgroups = [
 cloudant = ['cloudant>=2.0']
 crypto = ['cryptography>=0.9.3']
 dask = [
-    'distributed>=1.17.1, <2'
+    'distributed>=1.21, <2'
 ]
 databricks = ['requests>=2.20.0, <3']
 datadog = ['datadog>=0.14.0']
@@ -212,6 +212,7 @@ hive = [
     'hmsclient>=0.1.0',
     'pyhive>=0.6.0',
 ]
+inotify = ['inotify_simple>=1.1']
 jdbc = ['jaydebeapi>=1.1.1']
 jenkins = ['python-jenkins>=1.0.0']
 jira = ['JIRA>1.0.7']
@@ -380,6 +381,7 @@ def do_setup():
             'grpc': grpc,
             'hdfs': hdfs,
             'hive': hive,
+            'inotify': inotify,
             'jdbc': jdbc,
             'jira': jira,
             'kerberos': kerberos,
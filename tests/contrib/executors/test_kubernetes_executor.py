@@ -16,6 +16,8 @@
 # under the License.
 #
 
+import threading
+import time
 import unittest
 import uuid
 import re
@@ -33,6 +35,7 @@ try:
     from airflow.contrib.executors.kubernetes_executor import KubernetesExecutor
     from airflow.contrib.executors.kubernetes_executor import KubeConfig
     from airflow.contrib.executors.kubernetes_executor import KubernetesExecutorConfig
+    from airflow.contrib.executors.kubernetes_executor import KubernetesPodStateCache
     from airflow.contrib.kubernetes.worker_configuration import WorkerConfiguration
     from airflow.exceptions import AirflowConfigException
     from airflow.contrib.kubernetes.secret import Secret
@@ -695,5 +698,126 @@ class TestKubernetesExecutor(unittest.TestCase):
         self.assertTrue(kubernetesExecutor.task_queue.empty())
 
 
+class FakeKubeClient(object):
+    """
+    Kubernetes client keeping pods in memory, counting the API calls and the
+    pods created at the same time.
+    """
+    def __init__(self, creation_time=0.1):
+        self.creation_time = creation_time
+        self.pods = {}
+        self.list_calls = 0
+        self.concurrent_creations = 0
+        self.max_concurrent_creations = 0
+        self._lock = threading.Lock()
+
+    def create_namespaced_pod(self, body, namespace, **kwargs):
+        with self._lock:
+            self.concurrent_creations += 1
+            self.max_concurrent_creations = max(self.max_concurrent_creations,
+                                                self.concurrent_creations)
+        time.sleep(self.creation_time)
+        with self._lock:
+            self.concurrent_creations -= 1
+            self.pods[body.metadata.name] = body
+        return body
+
+    def list_namespaced_pod(self, namespace, label_selector='', **kwargs):
+        self.list_calls += 1
+        selector = dict(label.split('=') for label in label_selector.split(',') if label)
+        items = [
+            mock.MagicMock(metadata=pod.metadata,
+                           status=mock.MagicMock(phase='Running'))
+            for pod in self.pods.values()
+            if all(pod.metadata.labels.get(k) == v for k, v in selector.items())]
+        return mock.MagicMock(items=items)
+
+
+@unittest.skipIf(AirflowKubernetesScheduler is None,
+                 'kubernetes python package is not installed')
+class TestKubernetesPodStateCache(unittest.TestCase):
+    def test_update(self):
+        cache = KubernetesPodStateCache()
+        labels = {'dag_id': 'dag', 'task_id': 'task', 'execution_date': 'date'}
+        cache.update('pod', 'ADDED', 'Pending', labels)
+        cache.update('pod', 'MODIFIED', 'Running', labels)
+
+        self.assertEqual('Running', cache.get_phase('pod'))
+        self.assertTrue(cache.has_pod('dag', 'task', 'date'))
+        self.assertFalse(cache.has_pod('dag', 'other_task', 'date'))
+
+        cache.update('pod', 'DELETED', 'Succeeded', labels)
+        self.assertIsNone(cache.get_phase('pod'))
+        self.assertFalse(cache.has_pod('dag', 'task', 'date'))
+        self.assertEqual(0, len(cache))
+
+
+@unittest.skipIf(AirflowKubernetesScheduler is None,
+                 'kubernetes python package is not installed')
+class TestKubernetesExecutorWithFakeClient(unittest.TestCase):
+    def setUp(self):
+        self.kube_client = FakeKubeClient()
+        patch_client = mock.patch(
+            'airflow.contrib.executors.kubernetes_executor.get_kube_client',
+            return_value=self.kube_client)
+        patch_watcher = mock.patch(
+            'airflow.contrib.executors.kubernetes_executor.KubernetesJobWatcher')
+        for patcher in (patch_client, patch_watcher):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _make_pod(pod_id, **kwargs):
+        pod = mock.MagicMock()
+        pod.metadata.name = pod_id
+        return pod
+
+    def test_pods_are_created_concurrently(self):
+        executor = KubernetesExecutor()
+        executor.kube_config.worker_pods_creation_batch_size = 8
+        executor.kube_config.worker_pods_creation_parallelism = 4
+        executor.kube_config.kube_client_request_args = {}
+        executor.start()
+        executor.kube_scheduler.worker_configuration = mock.MagicMock()
+        executor.kube_scheduler.worker_configuration.make_pod.side_effect = self._make_pod
+        executor.kube_scheduler.launcher.run_pod_async = \
+            lambda pod, **kwargs: self.kube_client.create_namespaced_pod(pod, 'default')
+
+        for i in range(8):
+            executor.execute_async(key=('dag', 'task_{}'.format(i), datetime.utcnow(), 1),
+                                   command='command', executor_config={})
+        executor.sync()
+
+        self.assertEqual(8, len(self.kube_client.pods))
+        self.assertEqual(4, self.kube_client.max_concurrent_creations)
+        self.assertTrue(executor.task_queue.empty())
+        executor.kube_scheduler.terminate()
+
+    def test_clear_not_launched_queued_tasks_uses_pod_states(self):
+        executor = KubernetesExecutor()
+        executor.kube_config.kube_client_request_args = {}
+        executor.start()
+
+        launched = mock.MagicMock(dag_id='dag', task_id='launched',
+                                  execution_date=datetime(2019, 1, 1))
+        not_launched = mock.MagicMock(dag_id='dag', task_id='not_launched',
+                                      execution_date=datetime(2019, 1, 1))
+        executor.kube_scheduler.pod_states.update('pod', 'ADDED', 'Running', {
+            'dag_id': 'dag', 'task_id': 'launched',
+            'execution_date': AirflowKubernetesScheduler._datetime_to_label_safe_datestring(
+                launched.execution_date)})
+        session = mock.MagicMock()
+        session.query.return_value.filter.return_value.all.return_value = [
+            launched, not_launched]
+
+        list_calls = self.kube_client.list_calls
+        executor.clear_not_launched_queued_tasks(session=session)
+
+        self.assertEqual(list_calls, self.kube_client.list_calls)
+        # Only the task without a pod is rescheduled
+        self.assertEqual(1, session.query.return_value.filter.return_value.update.call_count)
+        executor.kube_scheduler.terminate()
+
+
 if __name__ == '__main__':
     unittest.main()
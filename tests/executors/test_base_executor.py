@@ -19,7 +19,9 @@
 
 import unittest
 
-from airflow.executors.base_executor import BaseExecutor
+from tests.compat import mock
+
+from airflow.executors.base_executor import BaseExecutor, EventBuffer, QueuedTaskPriorities
 from airflow.utils.state import State
 
 from datetime import datetime
@@ -42,3 +44,95 @@ class BaseExecutorTest(unittest.TestCase):
         self.assertEqual(len(executor.get_event_buffer(("my_dag1",))), 1)
         self.assertEqual(len(executor.get_event_buffer()), 2)
         self.assertEqual(len(executor.event_buffer), 0)
+
+    def test_get_open_slots(self):
+        executor = BaseExecutor(parallelism=3)
+        executor.running['running'] = 'command'
+        executor.queued_tasks['queued'] = ('command', 1, 'queue', None)
+        self.assertEqual(1, executor.get_open_slots())
+
+        executor.queued_tasks['queued_2'] = ('command', 1, 'queue', None)
+        executor.queued_tasks['queued_3'] = ('command', 1, 'queue', None)
+        self.assertEqual(0, executor.get_open_slots())
+
+        self.assertIsNone(BaseExecutor(parallelism=0).get_open_slots())
+
+
+class EventBufferTest(unittest.TestCase):
+    def test_events_by_dag(self):
+        date = datetime.utcnow()
+        key1 = ("my_dag1", "my_task1", date, 1)
+        key2 = ("my_dag2", "my_task1", date, 1)
+        event_buffer = EventBuffer()
+        event_buffer[key1] = State.SUCCESS
+        event_buffer[key2] = State.QUEUED
+        event_buffer[key2] = State.FAILED
+
+        self.assertEqual(2, len(event_buffer))
+        self.assertEqual(State.FAILED, event_buffer[key2])
+        self.assertEqual({key1, key2}, set(event_buffer))
+
+        self.assertEqual({key1: State.SUCCESS}, event_buffer.pop_dag_events("my_dag1"))
+        self.assertEqual({}, event_buffer.pop_dag_events("my_dag1"))
+        self.assertEqual(["my_dag2"], event_buffer.dag_ids())
+
+        del event_buffer[key2]
+        self.assertEqual(0, len(event_buffer))
+        self.assertEqual([], event_buffer.dag_ids())
+        with self.assertRaises(KeyError):
+            event_buffer[key1]
+
+
+class QueuedTaskPrioritiesTest(unittest.TestCase):
+    def test_take(self):
+        queued_tasks = {}
+        priorities = QueuedTaskPriorities()
+        for key, priority in [('low', 1), ('high', 10), ('removed', 20), ('low_2', 1)]:
+            queued_tasks[key] = ('command', priority, 'queue', None)
+            priorities.push(key, priority)
+        del queued_tasks['removed']
+
+        self.assertEqual(['high', 'low'], priorities.take(queued_tasks, 2))
+        # The tasks taken are left to the caller
+        self.assertEqual(3, len(queued_tasks))
+        del queued_tasks['high']
+
+        # Tasks that could not be sent get their priority back
+        priorities.put_back('low', 1)
+        self.assertEqual(['low_2', 'low'], priorities.take(queued_tasks, 5))
+        self.assertEqual([], priorities.take({}, 5))
+
+    def test_tasks_without_priority_are_taken_last(self):
+        queued_tasks = {'no_priority': ('command', 5, 'queue', None),
+                        'low': ('command', 1, 'queue', None)}
+        priorities = QueuedTaskPriorities()
+        priorities.push('low', 1)
+
+        self.assertEqual(['low', 'no_priority'], priorities.take(queued_tasks, 2))
+
+    @mock.patch('airflow.executors.base_executor.time.time')
+    def test_oldest_age(self, mock_time):
+        queued_tasks = {'first': None, 'second': None}
+        priorities = QueuedTaskPriorities()
+        mock_time.return_value = 100
+        priorities.push('first', 1)
+        mock_time.return_value = 110
+        priorities.push('second', 1)
+
+        mock_time.return_value = 130
+        self.assertEqual(30, priorities.oldest_age(queued_tasks))
+        del queued_tasks['first']
+        self.assertEqual(20, priorities.oldest_age(queued_tasks))
+        self.assertEqual(0, priorities.oldest_age({}))
+
+    def test_heartbeat_runs_tasks_by_priority(self):
+        executor = BaseExecutor(parallelism=2)
+        executor.execute_async = mock.MagicMock()
+        for key, priority in [('a', 1), ('b', 3), ('c', 2)]:
+            executor.queue_command(mock.MagicMock(key=key), key, priority, 'queue')
+
+        executor.heartbeat()
+
+        self.assertEqual(['b', 'c'], [call[1]['key'] for call in
+                                      executor.execute_async.call_args_list])
+        self.assertEqual(['a'], list(executor.queued_tasks))
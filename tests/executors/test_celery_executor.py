@@ -18,6 +18,7 @@
 # under the License.
 import os
 import sys
+import time
 import unittest
 import contextlib
 from multiprocessing import Pool
@@ -26,6 +27,8 @@ import mock
 
 from celery import Celery
 from celery import states as celery_states
+from celery.backends.base import KeyValueStoreBackend
+from celery.backends.database import DatabaseBackend
 from celery.contrib.testing.worker import start_worker
 from kombu.asynchronous import set_event_loop
 from parameterized import parameterized
@@ -161,6 +164,110 @@ class CeleryExecutorTest(unittest.TestCase):
         self.assertIn(celery_executor.CELERY_FETCH_ERR_MSG_HEADER, args[0])
         self.assertIn('AttributeError', args[1])
 
+    def test_sync_pool_is_reused(self):
+        executor = celery_executor.CeleryExecutor()
+        executor.tasks = {'key': mock.MagicMock()}
+        executor.last_state = {'key': celery_states.PENDING}
+        # Backends without bulk fetching are polled task by task in the pool
+        with mock.patch.object(celery_executor.app, 'backend', mock.MagicMock()), \
+                mock.patch.object(celery_executor, 'Pool') as mock_pool:
+            mock_pool.return_value.map_async.return_value.get.return_value = [
+                ('key', celery_states.STARTED)]
+            executor.sync()
+            executor.sync()
+            executor.terminate()
+
+        mock_pool.assert_called_once_with(processes=executor._sync_parallelism)
+        self.assertEqual(2, mock_pool.return_value.map_async.call_count)
+        mock_pool.return_value.terminate.assert_called_once_with()
+        self.assertIsNone(executor._sync_pool)
+
+    def test_sync_pool_is_restarted_after_timeout(self):
+        executor = celery_executor.CeleryExecutor()
+        value_tuple = 'command', '_', 'queue', 'should_be_a_simple_ti'
+        executor.queued_tasks['key'] = value_tuple
+        with mock.patch.object(celery_executor, 'Pool') as mock_pool:
+            mock_pool.return_value.map_async.return_value.get.side_effect = \
+                celery_executor.TimeoutError()
+            executor.heartbeat()
+            self.assertIsNone(executor._sync_pool)
+            mock_pool.return_value.terminate.assert_called_once_with()
+
+            # The task stays queued and is sent with a new pool
+            self.assertEqual(executor.queued_tasks['key'], value_tuple)
+            executor.heartbeat()
+        self.assertEqual(2, mock_pool.call_count)
+
+    @staticmethod
+    def _async_result(task_id):
+        async_result = mock.MagicMock()
+        async_result.task_id = task_id
+        return async_result
+
+    def test_fetch_states_from_kv_backend(self):
+        backend = mock.MagicMock(spec=KeyValueStoreBackend)
+        backend.get_key_for_task.side_effect = lambda task_id: 'meta-' + task_id
+        backend.mget.return_value = ['success', None]
+        backend.decode_result.return_value = {'status': celery_states.SUCCESS}
+
+        executor = celery_executor.CeleryExecutor()
+        executor.tasks = {'done': self._async_result('1'),
+                          'waiting': self._async_result('2')}
+        with mock.patch.object(celery_executor.app, 'backend', backend), \
+                mock.patch.object(celery_executor, 'Pool') as mock_pool:
+            task_keys_to_states = executor._fetch_task_states(chunksize=1)
+
+        backend.mget.assert_called_once_with(['meta-1', 'meta-2'])
+        mock_pool.assert_not_called()
+        self.assertEqual(
+            sorted([('done', celery_states.SUCCESS), ('waiting', celery_states.PENDING)]),
+            sorted(task_keys_to_states))
+
+    def test_fetch_states_from_db_backend(self):
+        backend = mock.MagicMock(spec=DatabaseBackend)
+        session = backend.ResultSession.return_value
+        session.query.return_value.filter.return_value.all.return_value = [
+            ('1', celery_states.FAILURE)]
+
+        executor = celery_executor.CeleryExecutor()
+        executor.tasks = {'failed': self._async_result('1'),
+                          'waiting': self._async_result('2')}
+        with mock.patch.object(celery_executor.app, 'backend', backend):
+            task_keys_to_states = executor._fetch_task_states(chunksize=1)
+
+        session.query.assert_called_once()
+        session.close.assert_called_once_with()
+        self.assertEqual(
+            sorted([('failed', celery_states.FAILURE), ('waiting', celery_states.PENDING)]),
+            sorted(task_keys_to_states))
+
+    def test_task_events(self):
+        executor = celery_executor.CeleryExecutor()
+        executor.tasks = {'done': self._async_result('1'),
+                          'failed': self._async_result('2'),
+                          'running': self._async_result('3')}
+        executor.last_state = {key: celery_states.PENDING for key in executor.tasks}
+        executor._event_receiver = celery_executor.CeleryTaskEventReceiver(
+            celery_executor.app)
+        executor._last_reconciliation_time = time.time()
+        executor._event_receiver._on_event({'type': 'task-succeeded', 'uuid': '1'})
+        executor._event_receiver._on_event({'type': 'task-failed', 'uuid': '2'})
+        executor._event_receiver._on_event({'type': 'task-succeeded', 'uuid': 'other'})
+
+        with mock.patch.object(executor, '_fetch_task_states') as mock_fetch:
+            executor.sync()
+            # The states are not polled until the reconciliation interval passed
+            mock_fetch.assert_not_called()
+
+            mock_fetch.return_value = [('running', celery_states.SUCCESS)]
+            executor.sync(reconcile=True)
+            mock_fetch.assert_called_once()
+
+        self.assertEqual(State.SUCCESS, executor.event_buffer['done'])
+        self.assertEqual(State.FAILED, executor.event_buffer['failed'])
+        self.assertEqual(State.SUCCESS, executor.event_buffer['running'])
+        self.assertEqual({}, executor.tasks)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -23,6 +23,7 @@ from airflow import configuration
 from airflow.models import DagBag
 from airflow.jobs import BackfillJob
 from airflow.utils import timezone
+from airflow.utils.state import State
 
 from datetime import timedelta
 
@@ -60,6 +61,8 @@ class BaseDaskTest(unittest.TestCase):
 
         executor.execute_async(key='success', command=success_command)
         executor.execute_async(key='fail', command=fail_command)
+        # The tasks are submitted in batches when syncing
+        executor.sync()
 
         success_future = next(
             k for k, v in executor.futures.items() if v == 'success')
@@ -94,6 +97,38 @@ class DaskExecutorTest(BaseDaskTest):
         executor = DaskExecutor(cluster_address=self.cluster.scheduler_address)
         self.assert_tasks_on_executor(executor)
 
+    @unittest.skipIf(SKIP_DASK, 'Dask unsupported by this configuration')
+    def test_batched_submission(self):
+        executor = DaskExecutor(cluster_address=self.cluster.scheduler_address)
+        executor.start()
+
+        keys = ['task_{}'.format(i) for i in range(20)]
+        for key in keys:
+            executor.running[key] = True
+            executor.execute_async(key=key, command=['true'])
+        executor.execute_async(key='fail', command=['false'])
+        executor.running['fail'] = True
+        executor.end()
+
+        for key in keys:
+            self.assertEqual(State.SUCCESS, executor.event_buffer[key])
+        self.assertEqual(State.FAILED, executor.event_buffer['fail'])
+        self.assertEqual({}, executor.futures)
+        executor.client.close()
+
+    @unittest.skipIf(SKIP_DASK, 'Dask unsupported by this configuration')
+    def test_get_resources(self):
+        executor = DaskExecutor(cluster_address=self.cluster.scheduler_address)
+        executor_config = {'DaskExecutor': {'resources': {'memory': 1e9}}}
+        self.assertEqual({}, executor._get_resources(executor.default_queue, None))
+        # Queues are ignored unless they are mapped to resources
+        self.assertEqual({'memory': 1e9}, executor._get_resources('gpu', executor_config))
+
+        executor.queues_as_resources = True
+        self.assertEqual({}, executor._get_resources(executor.default_queue, None))
+        self.assertEqual({'gpu': 1, 'memory': 1e9},
+                         executor._get_resources('gpu', executor_config))
+
     @unittest.skipIf(SKIP_DASK, 'Dask unsupported by this configuration')
     def test_backfill_integration(self):
         """
@@ -17,9 +17,12 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import multiprocessing
 import unittest
 
-from airflow.executors.local_executor import LocalExecutor
+from tests.compat import mock
+
+from airflow.executors.local_executor import LocalExecutor, LocalWorker
 from airflow.utils.state import State
 
 
@@ -63,6 +66,35 @@ class LocalExecutorTest(unittest.TestCase):
         test_parallelism = 2
         self.execution_parallelism(parallelism=test_parallelism)
 
+    @mock.patch('airflow.bin.cli.get_parser')
+    def test_execute_work_in_fork(self, mock_get_parser):
+        def fake_func(args):
+            if args.task_id == 'fail':
+                raise ValueError("Task failed")
+
+        def parse_args(args):
+            return mock.MagicMock(task_id=args[1], func=fake_func)
+
+        mock_get_parser.return_value.parse_args.side_effect = parse_args
+        result_queue = multiprocessing.Queue()
+        worker = LocalWorker(result_queue, fork_tasks=True)
+
+        worker.execute_work('success', ['airflow', 'run', 'success'])
+        worker.execute_work('fail', ['airflow', 'run', 'fail'])
+
+        self.assertEqual(('success', State.SUCCESS), result_queue.get(timeout=10))
+        self.assertEqual(('fail', State.FAILED), result_queue.get(timeout=10))
+
+    @mock.patch('airflow.executors.local_executor.importlib.import_module')
+    def test_local_worker_preloads_modules(self, mock_import_module):
+        worker = LocalWorker(multiprocessing.Queue(), fork_tasks=True,
+                             preload_modules=['airflow.operators.bash_operator'])
+        with mock.patch.object(worker, 'execute_work') as mock_execute_work:
+            worker.run()
+
+        mock_import_module.assert_any_call('airflow.operators.bash_operator')
+        mock_execute_work.assert_called_once_with(worker.key, worker.command)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import random
+import unittest
+from datetime import datetime
+
+from airflow.exceptions import AirflowConfigException
+from airflow.executors.simulated_executor import SimulatedExecutor, get_duration_sampler
+from airflow.utils.state import State
+from tests.compat import mock
+
+
+class SimulatedExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.date = datetime(2019, 1, 1)
+
+    def _queue(self, executor, task_id):
+        key = ('dag', task_id, self.date, 1)
+        simple_ti = mock.MagicMock(key=key, executor_config=None)
+        executor.queue_command(simple_ti, ['airflow', 'run'])
+        return key
+
+    def test_get_duration_sampler(self):
+        rnd = random.Random(0)
+        self.assertEqual(get_duration_sampler('constant:2')(rnd), 2.0)
+        for _ in range(100):
+            self.assertTrue(1 <= get_duration_sampler('uniform:1,3')(rnd) <= 3)
+            self.assertTrue(get_duration_sampler('exponential:2')(rnd) >= 0)
+        self.assertEqual(get_duration_sampler('exponential:0')(rnd), 0.0)
+
+        for spec in ('normal:1', 'constant', 'uniform:1', 'constant:a'):
+            with self.assertRaises(AirflowConfigException):
+                get_duration_sampler(spec)
+
+    @mock.patch('airflow.executors.simulated_executor.time.time')
+    def test_tasks_end_after_simulated_duration(self, mock_time):
+        mock_time.return_value = 100
+        executor = SimulatedExecutor(slots=2, duration='constant:10', failure_rate=0,
+                                     update_db=False)
+        keys = [self._queue(executor, 'task_{}'.format(i)) for i in range(3)]
+
+        executor.heartbeat()
+        self.assertEqual(set(executor.running), set(keys[:2]))
+        self.assertEqual(len(executor.queued_tasks), 1)
+        self.assertEqual(executor.get_event_buffer(), {})
+
+        mock_time.return_value = 110
+        executor.heartbeat()
+        self.assertEqual(executor.get_event_buffer(),
+                         {keys[0]: State.SUCCESS, keys[1]: State.SUCCESS})
+        self.assertEqual(executor.running, {})
+
+        # The slots freed by the sync are taken on the next heartbeat
+        executor.heartbeat()
+        self.assertEqual(list(executor.running), [keys[2]])
+        self.assertEqual(len(executor.queued_tasks), 0)
+        self.assertEqual(executor.get_event_buffer(), {})
+
+        mock_time.return_value = 120
+        executor.heartbeat()
+        self.assertEqual(executor.get_event_buffer(), {keys[2]: State.SUCCESS})
+
+    def test_failure_rate(self):
+        executor = SimulatedExecutor(slots=0, duration='constant:0', failure_rate=1,
+                                     update_db=False)
+        key = self._queue(executor, 'task')
+        executor.heartbeat()
+        self.assertEqual(executor.get_event_buffer(), {key: State.FAILED})
+
+    @mock.patch('airflow.models.TaskInstance.bulk_set_state')
+    def test_states_written_to_db(self, mock_bulk_set_state):
+        executor = SimulatedExecutor(slots=0, duration='constant:0', failure_rate=0)
+        key = self._queue(executor, 'task')
+        executor.heartbeat()
+
+        calls = {call[0][2]: call[0][0] for call in mock_bulk_set_state.call_args_list}
+        self.assertEqual(calls[State.RUNNING], [])
+        self.assertEqual(calls[State.SUCCESS], [key[:3]])
+        self.assertEqual(calls[State.FAILED], [])
+        self.assertEqual(executor.get_event_buffer(), {key: State.SUCCESS})
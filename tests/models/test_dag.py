@@ -29,6 +29,7 @@ import jinja2
 import pendulum
 import six
 from mock import patch
+from sqlalchemy import event
 
 from airflow import models, settings, configuration
 from airflow.exceptions import AirflowException, AirflowDagCycleException
@@ -898,3 +899,45 @@ class DagTest(unittest.TestCase):
         orm_dag = session.query(DagModel).filter(DagModel.dag_id == 'dag').one()
         self.assertIsNotNone(orm_dag.default_view)
         self.assertEqual(orm_dag.get_default_view(), "graph")
+
+    def test_bulk_sync_to_db_only_updates_changed_dags(self):
+        dag = DAG('test_bulk_sync_to_db', start_date=DEFAULT_DATE)
+        with dag:
+            SubDagOperator(
+                task_id='subtask',
+                owner='owner1',
+                subdag=DAG('test_bulk_sync_to_db.subtask', start_date=DEFAULT_DATE))
+        session = settings.Session()
+        sync_time = timezone.datetime(2019, 1, 1)
+        DAG.bulk_sync_to_db([dag], sync_time=sync_time, session=session)
+
+        def get_orm_dags():
+            session.expire_all()
+            return {orm_dag.dag_id: orm_dag for orm_dag in session.query(DagModel).filter(
+                DagModel.dag_id.like('test_bulk_sync_to_db%'))}
+
+        orm_dags = get_orm_dags()
+        self.assertEqual(2, len(orm_dags))
+        # SubDAGs get the owners of their parent DAG
+        self.assertEqual('owner1', orm_dags['test_bulk_sync_to_db.subtask'].owners)
+
+        # Unchanged DAGs only get their last sync time updated
+        sync_time = timezone.datetime(2019, 1, 2)
+        updated_dag_ids = []
+
+        def on_update(mapper, connection, target):
+            updated_dag_ids.append(target.dag_id)
+
+        event.listen(DagModel, 'before_update', on_update)
+        try:
+            DAG.bulk_sync_to_db([dag], sync_time=sync_time, session=session)
+        finally:
+            event.remove(DagModel, 'before_update', on_update)
+        self.assertEqual([], updated_dag_ids)
+        for orm_dag in get_orm_dags().values():
+            self.assertEqual(sync_time, orm_dag.last_scheduler_run)
+
+        dag.fileloc = '/changed/path.py'
+        DAG.bulk_sync_to_db([dag], sync_time=sync_time, session=session)
+        self.assertEqual('/changed/path.py', get_orm_dags()['test_bulk_sync_to_db'].fileloc)
+        session.close()
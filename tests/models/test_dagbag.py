@@ -28,6 +28,7 @@ from mock import patch, ANY
 
 from airflow import models, configuration
 from airflow.models import DagModel, DagBag, TaskInstance as TI
+from airflow.utils.dag_parse_cache import DagParseCache
 from airflow.utils.dag_processing import SimpleTaskInstance
 from airflow.utils.db import create_session
 from airflow.utils.state import State
@@ -523,6 +524,63 @@ class DagBagTest(unittest.TestCase):
         self.validate_dags(testDag, found_dags, dagbag, should_be_found=False)
         self.assertIn(file_path, dagbag.import_errors)
 
+    def test_process_file_uses_parse_cache(self):
+        """
+        test that the DAGs of an unchanged file are loaded from the parse cache
+        instead of importing the file again
+        """
+        dag_folder = mkdtemp()
+        cache_folder = mkdtemp()
+        try:
+            filepath = os.path.join(dag_folder, 'test_parse_cache.py')
+            with open(filepath, 'w') as f:
+                f.write(textwrap.dedent("""\
+                    from datetime import datetime
+                    from airflow import DAG
+                    from airflow.operators.python_operator import PythonOperator
+
+                    def return_42():
+                        return 42
+
+                    dag = DAG('test_parse_cache', start_date=datetime(2019, 1, 1))
+                    PythonOperator(task_id='task', python_callable=return_42, dag=dag)
+                    """))
+
+            dagbag = models.DagBag(dag_folder=self.empty_dir, include_examples=False)
+            dagbag.parse_cache = DagParseCache(cache_folder, dag_folder)
+            self.assertEqual(['test_parse_cache'],
+                             [dag.dag_id for dag in dagbag.process_file(filepath)])
+
+            dagbag = models.DagBag(dag_folder=self.empty_dir, include_examples=False)
+            dagbag.parse_cache = DagParseCache(cache_folder, dag_folder)
+            with patch('airflow.models.dagbag.imp.load_source') as mock_load_source, \
+                    patch('airflow.settings.policy') as mock_policy:
+                found_dags = dagbag.process_file(filepath)
+
+            mock_load_source.assert_not_called()
+            # The policy was already applied to the cached tasks
+            mock_policy.assert_not_called()
+            self.assertEqual(['test_parse_cache'], [dag.dag_id for dag in found_dags])
+            self.assertEqual(42, dagbag.get_dag('test_parse_cache')
+                             .get_task('task').python_callable())
+        finally:
+            shutil.rmtree(dag_folder)
+            shutil.rmtree(cache_folder)
+
+    def test_parse_cache_is_opt_in(self):
+        """
+        test that only the DagBags that ask for it use the parse cache
+        """
+        configuration.set('core', 'dag_parse_cache', 'True')
+        try:
+            self.assertIsNone(models.DagBag(dag_folder=self.empty_dir,
+                                            include_examples=False).parse_cache)
+            self.assertIsNotNone(models.DagBag(dag_folder=self.empty_dir,
+                                               include_examples=False,
+                                               use_parse_cache=True).parse_cache)
+        finally:
+            configuration.set('core', 'dag_parse_cache', 'False')
+
     def test_process_file_with_none(self):
         """
         test that process_file can handle Nones
@@ -577,3 +635,67 @@ class DagBagTest(unittest.TestCase):
         # clean up
         with create_session() as session:
             session.query(DagModel).filter(DagModel.dag_id == 'test_deactivate_unknown_dags').delete()
+
+    def test_lazy_load(self):
+        dag_folder = mkdtemp()
+        dag_ids = ['test_lazy_load_{}'.format(i) for i in range(2)]
+
+        def write_dag_file(dag_id):
+            with open(os.path.join(dag_folder, dag_id + '.py'), 'w') as f:
+                f.write(textwrap.dedent("""\
+                    from airflow.models import DAG
+                    from airflow.operators.dummy_operator import DummyOperator
+                    from tests.models import DEFAULT_DATE
+
+                    dag = DAG('{}', start_date=DEFAULT_DATE)
+                    DummyOperator(task_id='dummy', dag=dag)
+                    """.format(dag_id)))
+
+        for dag_id in dag_ids:
+            write_dag_file(dag_id)
+        try:
+            for dag in DagBag(dag_folder, include_examples=False).dags.values():
+                dag.sync_to_db()
+
+            dagbag = DagBag(dag_folder, include_examples=False, lazy_load=True,
+                            max_cached_dags=1)
+            self.assertEqual({}, dagbag.dags)
+
+            with patch.object(dagbag, 'process_file', wraps=dagbag.process_file) as mock_process:
+                # Only the file of the DAG is parsed, once
+                self.assertEqual(dag_ids[0], dagbag.get_dag(dag_ids[0]).dag_id)
+                self.assertEqual(dag_ids[0], dagbag.get_dag(dag_ids[0]).dag_id)
+                mock_process.assert_called_once_with(
+                    filepath=os.path.join(dag_folder, dag_ids[0] + '.py'),
+                    only_if_updated=False, safe_mode=ANY)
+
+                # The least recently used DAG is forgotten
+                self.assertEqual(dag_ids[1], dagbag.get_dag(dag_ids[1]).dag_id)
+                self.assertEqual([dag_ids[1]], list(dagbag.dags))
+                self.assertEqual(2, mock_process.call_count)
+
+                # A changed file is parsed again
+                filepath = os.path.join(dag_folder, dag_ids[1] + '.py')
+                mtime = os.path.getmtime(filepath) + 10
+                os.utime(filepath, (mtime, mtime))
+                dagbag.get_dag(dag_ids[1])
+                self.assertEqual(3, mock_process.call_count)
+
+            # DAGs unknown to the DB are looked for in all the files, the parsed
+            # DAGs are still bounded
+            write_dag_file('test_lazy_load_new')
+            self.assertFalse(dagbag.collected)
+            self.assertEqual('test_lazy_load_new',
+                             dagbag.get_dag('test_lazy_load_new').dag_id)
+            self.assertTrue(dagbag.collected)
+            self.assertEqual(['test_lazy_load_new'], list(dagbag.dags))
+            self.assertIsNone(dagbag.get_dag('unknown_dag'))
+            self.assertEqual(1, len(dagbag.dags))
+
+            dagbag.collect_dags(only_if_updated=False, include_examples=False)
+            self.assertEqual(1, len(dagbag.dags))
+        finally:
+            shutil.rmtree(dag_folder)
+            with create_session() as session:
+                session.query(DagModel).filter(DagModel.dag_id.in_(dag_ids)).delete(
+                    synchronize_session=False)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+
+import unittest
+from datetime import timedelta
+
+from airflow.dag.serialization import SerializedBaseOperator, SerializedDAG
+from airflow.models import DAG, DagBag, SerializedDagModel
+from airflow.operators.bash_operator import BashOperator
+from airflow.operators.dummy_operator import DummyOperator
+from airflow.utils.db import create_session
+from tests.models import DEFAULT_DATE
+from tests.test_utils.db import clear_db_serialized_dags
+
+
+def make_dag(dag_id='test_serialized_dag'):
+    dag = DAG(dag_id, start_date=DEFAULT_DATE, schedule_interval=timedelta(hours=1),
+              description='A DAG to serialize', max_active_runs=3)
+    bash = BashOperator(task_id='bash', bash_command='echo {{ ds }}', dag=dag,
+                        retries=2, retry_delay=timedelta(minutes=1))
+    dummy = DummyOperator(task_id='dummy', dag=dag)
+    bash >> dummy
+    return dag
+
+
+class SerializedDAGTest(unittest.TestCase):
+
+    def test_serialization_round_trip(self):
+        dag = make_dag()
+        serialized_dag = SerializedDAG.from_json(SerializedDAG.to_json(dag))
+
+        self.assertIsInstance(serialized_dag, SerializedDAG)
+        self.assertEqual(dag.dag_id, serialized_dag.dag_id)
+        self.assertEqual(dag.description, serialized_dag.description)
+        self.assertEqual(dag.start_date, serialized_dag.start_date)
+        self.assertEqual(dag.schedule_interval, serialized_dag.schedule_interval)
+        self.assertEqual(dag.max_active_runs, serialized_dag.max_active_runs)
+        self.assertEqual(dag.fileloc, serialized_dag.fileloc)
+        self.assertEqual(dag.timezone.name, serialized_dag.timezone.name)
+        self.assertEqual(set(dag.task_ids), set(serialized_dag.task_ids))
+
+        bash = serialized_dag.get_task('bash')
+        self.assertIsInstance(bash, SerializedBaseOperator)
+        self.assertEqual('BashOperator', bash.task_type)
+        self.assertEqual(BashOperator.ui_color, bash.ui_color)
+        self.assertEqual(list(BashOperator.template_fields), bash.template_fields)
+        self.assertEqual('echo {{ ds }}', bash.bash_command)
+        self.assertEqual(2, bash.retries)
+        self.assertEqual(timedelta(minutes=1), bash.retry_delay)
+        self.assertEqual({'dummy'}, bash.downstream_task_ids)
+        self.assertEqual({'bash'}, serialized_dag.get_task('dummy').upstream_task_ids)
+        self.assertEqual(['dummy'], [task.task_id for task in serialized_dag.roots])
+
+    def test_serialization_of_callables_is_stable(self):
+        def make_dag_with_callback():
+            def on_failure(context):
+                pass
+            dag = DAG('test_callables', start_date=DEFAULT_DATE,
+                      default_args={'on_failure_callback': on_failure,
+                                    'params': {'obj': object()}})
+            DummyOperator(task_id='dummy', dag=dag)
+            return dag
+
+        data = SerializedDAG.to_json(make_dag_with_callback())
+        self.assertEqual(data, SerializedDAG.to_json(make_dag_with_callback()))
+        self.assertNotIn(' at 0x', data)
+
+        default_args = SerializedDAG.from_json(data).default_args
+        self.assertEqual(
+            __name__ + '.SerializedDAGTest.test_serialization_of_callables_is_stable.'
+            '<locals>.make_dag_with_callback.<locals>.on_failure',
+            default_args['on_failure_callback'])
+        self.assertEqual({'obj': 'builtins.object'}, default_args['params'])
+
+
+class SerializedDagModelTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_db_serialized_dags()
+
+    def tearDown(self):
+        clear_db_serialized_dags()
+
+    def test_write_dag(self):
+        dag = make_dag()
+        with create_session() as session:
+            self.assertTrue(SerializedDagModel.write_dag(dag, session=session))
+        last_updated = SerializedDagModel.get_last_updated(dag.dag_id)
+        self.assertIsNotNone(last_updated)
+
+        # An unchanged DAG is not stored again
+        with create_session() as session:
+            self.assertFalse(SerializedDagModel.write_dag(dag, session=session))
+        self.assertEqual(last_updated, SerializedDagModel.get_last_updated(dag.dag_id))
+
+        serialized_dag, _ = SerializedDagModel.get_dag(dag.dag_id)
+        self.assertEqual(dag.dag_id, serialized_dag.dag_id)
+        self.assertEqual((None, None), SerializedDagModel.get_dag('missing_dag'))
+
+    def test_dagbag_reads_serialized_dags(self):
+        dag = make_dag()
+        with create_session() as session:
+            SerializedDagModel.write_dag(dag, session=session)
+
+        dagbag = DagBag(dag_folder='/nonexistent', include_examples=False,
+                        store_serialized_dags=True)
+        self.assertEqual({}, dagbag.dags)
+
+        serialized_dag = dagbag.get_dag(dag.dag_id)
+        self.assertIsInstance(serialized_dag, SerializedDAG)
+        self.assertIs(serialized_dag, dagbag.get_dag(dag.dag_id))
+        self.assertIsNone(dagbag.get_dag('missing_dag'))
+
+        # The DAG is read again once it is stored again
+        dag.max_active_runs = 5
+        with create_session() as session:
+            SerializedDagModel.write_dag(dag, session=session)
+        self.assertEqual(5, dagbag.get_dag(dag.dag_id).max_active_runs)
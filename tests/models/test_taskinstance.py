@@ -992,3 +992,41 @@ class TaskInstanceTest(unittest.TestCase):
         self.assertEqual(cw.task_state_in_callback, State.RUNNING)
         ti.refresh_from_db()
         self.assertEqual(ti.state, State.SUCCESS)
+
+    def test_bulk_set_state(self):
+        dag = DAG('test_bulk_set_state', start_date=DEFAULT_DATE)
+        op1 = DummyOperator(task_id='op_1', dag=dag)
+        op2 = DummyOperator(task_id='op_2', dag=dag)
+        op3 = DummyOperator(task_id='op_3', dag=dag)
+        ti1 = TI(task=op1, execution_date=DEFAULT_DATE, state=State.SCHEDULED)
+        ti2 = TI(task=op2, execution_date=DEFAULT_DATE)
+        ti3 = TI(task=op3, execution_date=DEFAULT_DATE, state=State.RUNNING)
+        with create_session() as session:
+            session.merge(ti1)
+            session.merge(ti2)
+            session.merge(ti3)
+
+        with create_session() as session:
+            changed_keys = TI.bulk_set_state(
+                keys=[(ti.dag_id, ti.task_id, ti.execution_date)
+                      for ti in (ti1, ti2, ti3)],
+                old_states=[State.NONE, State.SCHEDULED],
+                new_state=State.QUEUED,
+                values={'queued_dttm': DEFAULT_DATE},
+                session=session)
+
+        self.assertEqual(
+            sorted(task_id for _, task_id, _ in changed_keys), ['op_1', 'op_2'])
+        with create_session() as session:
+            tis = {ti.task_id: ti for ti in session.query(TI).filter(
+                TI.dag_id == dag.dag_id)}
+            self.assertEqual(tis['op_1'].state, State.QUEUED)
+            self.assertEqual(tis['op_1'].queued_dttm, DEFAULT_DATE)
+            self.assertEqual(tis['op_2'].state, State.QUEUED)
+            self.assertEqual(tis['op_3'].state, State.RUNNING)
+
+    def test_bulk_set_state_no_keys(self):
+        self.assertEqual(
+            TI.bulk_set_state(keys=[], old_states=[State.NONE],
+                              new_state=State.QUEUED),
+            [])
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import signal
+import time
+import unittest
+from logging.config import dictConfig
+
+import mock
+import psutil
+
+from airflow.task.task_runner.fork_task_runner import ForkTaskRunner
+from tests.task.task_runner.test_standard_task_runner import LOGGING_CONFIG
+
+
+def _wait_for_return_code(runner, timeout=10):
+    deadline = time.time() + timeout
+    while runner.return_code() is None and time.time() < deadline:
+        time.sleep(0.1)
+    return runner.return_code()
+
+
+class TestForkTaskRunner(unittest.TestCase):
+    def setUp(self):
+        dictConfig(LOGGING_CONFIG)
+
+    def _get_runner(self, func):
+        local_task_job = mock.Mock()
+        local_task_job.task_instance = mock.MagicMock()
+        local_task_job.task_instance.run_as_user = None
+        local_task_job.task_instance.command_as_list.return_value = [
+            'airflow', 'run', 'dag_id', 'task_id', '2016-01-01', '--raw']
+        runner = ForkTaskRunner(local_task_job)
+        runner._log = mock.MagicMock()
+
+        parser = mock.MagicMock()
+        parser.parse_args.return_value.func = func
+        return runner, mock.patch('airflow.bin.cli.get_parser', return_value=parser)
+
+    def test_output_and_return_code(self):
+        def func(args, dag=None):
+            print("Hello from the task")
+
+        runner, patch_parser = self._get_runner(func)
+        with patch_parser:
+            runner.start()
+        self.assertNotEqual(os.getpid(), runner.process.pid)
+        self.assertEqual(0, _wait_for_return_code(runner))
+
+        # Give the log reader thread time to read the output of the child
+        time.sleep(0.5)
+        logged = [call[0] for call in runner._log.info.call_args_list]
+        self.assertTrue(any('Hello from the task' in call for call in logged))
+        runner.on_finish()
+
+    def test_failure(self):
+        def func(args, dag=None):
+            raise ValueError("Task failed")
+
+        runner, patch_parser = self._get_runner(func)
+        with patch_parser:
+            runner.start()
+        self.assertEqual(1, _wait_for_return_code(runner))
+        runner.on_finish()
+
+    def test_terminate(self):
+        def func(args, dag=None):
+            time.sleep(1000)
+
+        runner, patch_parser = self._get_runner(func)
+        with patch_parser:
+            runner.start()
+        pid = runner.process.pid
+        self.assertEqual(pid, os.getpgid(pid))
+
+        runner.terminate()
+        self.assertFalse(psutil.pid_exists(pid))
+        self.assertEqual(-signal.SIGTERM, runner.return_code())
+        runner.on_finish()
+
+    def test_terminate_after_exit_keeps_return_code(self):
+        def func(args, dag=None):
+            pass
+
+        runner, patch_parser = self._get_runner(func)
+        with patch_parser:
+            runner.start()
+        pid = runner.process.pid
+        # The child exits before being terminated, it is reaped by terminate
+        while psutil.Process(pid).status() != psutil.STATUS_ZOMBIE:
+            time.sleep(0.1)
+
+        runner.terminate()
+        self.assertEqual(0, runner.return_code())
+        runner.on_finish()
+
+
+if __name__ == '__main__':
+    unittest.main()
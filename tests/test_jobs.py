@@ -39,7 +39,7 @@ from airflow import configuration
 from airflow.bin import cli
 from airflow.exceptions import DagConcurrencyLimitReached, NoAvailablePoolSlot
 from airflow.executors import BaseExecutor, SequentialExecutor
-from airflow.jobs import BackfillJob, BaseJob, LocalTaskJob, SchedulerJob
+from airflow.jobs import BackfillJob, BaseJob, DagFileProcessorPool, LocalTaskJob, SchedulerJob
 from airflow.models import DAG, DagBag, DagModel, DagRun, Pool, SlaMiss, \
     TaskInstance as TI, errors
 from airflow.operators.bash_operator import BashOperator
@@ -121,6 +121,67 @@ class BaseJobTest(unittest.TestCase):
         self.assertIsNotNone(job.end_date)
 
 
+class DagFileProcessorPoolTest(unittest.TestCase):
+    def _process(self, pool, file_path):
+        processor = pool.get_processor(file_path, [])
+        processor.start()
+        with timeout(60):
+            while not processor.done:
+                time.sleep(0.1)
+        return processor
+
+    def test_workers_are_reused(self):
+        pool = DagFileProcessorPool(False, [], max_files_per_worker=0)
+        file_path = os.path.join(TEST_DAGS_FOLDER, 'test_scheduler_dags.py')
+        try:
+            first = self._process(pool, file_path)
+            second = self._process(pool, file_path)
+        finally:
+            pool.terminate()
+
+        self.assertEqual(first.pid, second.pid)
+        self.assertEqual(0, second.exit_code)
+        self.assertIn('test_start_date_scheduling',
+                      [simple_dag.dag_id for simple_dag in second.result])
+
+    def test_workers_are_recycled(self):
+        pool = DagFileProcessorPool(False, [], max_files_per_worker=1)
+        file_path = os.path.join(TEST_DAGS_FOLDER, 'test_scheduler_dags.py')
+        try:
+            first = self._process(pool, file_path)
+            second = self._process(pool, file_path)
+        finally:
+            pool.terminate()
+
+        self.assertNotEqual(first.pid, second.pid)
+        self.assertTrue(second.result)
+
+    def test_terminate_replaces_worker(self):
+        pool = DagFileProcessorPool(False, [])
+        file_path = os.path.join(TEST_DAGS_FOLDER, 'test_scheduler_dags.py')
+        try:
+            first = self._process(pool, file_path)
+            first.terminate(sigkill=True)
+            second = self._process(pool, file_path)
+        finally:
+            pool.terminate()
+
+        self.assertNotEqual(first.pid, second.pid)
+        self.assertTrue(second.result)
+
+    def test_terminate_stops_idle_workers(self):
+        pool = DagFileProcessorPool(False, [])
+        file_path = os.path.join(TEST_DAGS_FOLDER, 'test_scheduler_dags.py')
+        try:
+            processor = self._process(pool, file_path)
+            self.assertEqual([processor.pid], pool.get_all_pids())
+        finally:
+            pool.terminate()
+
+        self.assertEqual([], pool.get_all_pids())
+        self.assertFalse(psutil.pid_exists(processor.pid))
+
+
 class BackfillJobTest(unittest.TestCase):
 
     def _get_dummy_dag(self, dag_id, pool=None):
@@ -1900,6 +1961,44 @@ class SchedulerJobTest(unittest.TestCase):
         self.assertIn(tis[1].key, res_keys)
         self.assertIn(tis[3].key, res_keys)
 
+    def test_find_executable_task_instances_pool_slots_shared_across_dags(self):
+        dag_id = 'SchedulerJobTest.test_find_executable_task_instances_pool_slots'
+        dag = DAG(dag_id=dag_id, start_date=DEFAULT_DATE, concurrency=16)
+        other_dag = DAG(dag_id=dag_id + '_other', start_date=DEFAULT_DATE)
+        task1 = DummyOperator(dag=dag, task_id='dummy1', pool='a')
+        task2 = DummyOperator(dag=dag, task_id='dummy2', pool='a')
+        other_task = DummyOperator(dag=other_dag, task_id='dummy', pool='a')
+        dagbag = self._make_simple_dag_bag([dag])
+
+        scheduler = SchedulerJob()
+        session = settings.Session()
+
+        dr = scheduler.create_dag_run(dag)
+        other_dr = scheduler.create_dag_run(other_dag)
+
+        ti1 = TI(task1, dr.execution_date)
+        ti2 = TI(task2, dr.execution_date)
+        other_ti = TI(other_task, other_dr.execution_date)
+        ti1.state = State.SCHEDULED
+        ti2.state = State.SCHEDULED
+        other_ti.state = State.RUNNING
+        session.merge(ti1)
+        session.merge(ti2)
+        session.merge(other_ti)
+        session.add(models.Pool(pool='a', slots=2, description='haha'))
+        session.commit()
+
+        # the running task instance of the other dag takes a slot of the pool,
+        # counted by the grouped query rather than one query per pool
+        with patch.object(models.Pool, 'open_slots') as mock_open_slots:
+            res = scheduler._find_executable_task_instances(
+                dagbag,
+                states=[State.SCHEDULED],
+                session=session)
+            mock_open_slots.assert_not_called()
+        session.commit()
+        self.assertEqual(1, len(res))
+
     @mock_conf_get('core', 'non_pooled_task_slot_count', 1)
     def test_find_executable_task_instances_in_non_pool(self):
         dag_id = 'SchedulerJobTest.test_find_executable_task_instances_in_non_pool'
@@ -1986,6 +2085,99 @@ class SchedulerJobTest(unittest.TestCase):
             states=[State.SCHEDULED],
             session=session)))
 
+    def test_find_executable_task_instances_executor_slots(self):
+        dag_id = 'SchedulerJobTest.test_find_executable_task_instances_executor_slots'
+        dag = DAG(dag_id=dag_id, start_date=DEFAULT_DATE, concurrency=16)
+        task1 = DummyOperator(dag=dag, task_id='dummy1', priority_weight=2)
+        task2 = DummyOperator(dag=dag, task_id='dummy2')
+        task3 = DummyOperator(dag=dag, task_id='dummy3')
+        dagbag = self._make_simple_dag_bag([dag])
+
+        scheduler = SchedulerJob()
+        session = settings.Session()
+
+        dr = scheduler.create_dag_run(dag)
+        tis = [TI(task, dr.execution_date) for task in (task1, task2, task3)]
+        for ti in tis:
+            ti.state = State.SCHEDULED
+            session.merge(ti)
+        session.commit()
+
+        # The executor has a single open slot
+        with mock.patch.object(scheduler.executor, 'get_open_slots', return_value=1):
+            res = scheduler._find_executable_task_instances(
+                dagbag, states=[State.SCHEDULED], session=session)
+        self.assertEqual([tis[0].key], [ti.key for ti in res])
+
+        # Task instances are not even looked for when the executor is full
+        with mock.patch.object(scheduler.executor, 'get_open_slots',
+                               return_value=0), \
+                mock.patch.object(session, 'query') as mock_query:
+            res = scheduler._find_executable_task_instances(
+                dagbag, states=[State.SCHEDULED], session=session)
+        self.assertEqual([], res)
+        mock_query.assert_not_called()
+
+    def test_schedule_task_instances(self):
+        dag_id = 'SchedulerJobTest.test_schedule_task_instances'
+        dag = DAG(dag_id=dag_id, start_date=DEFAULT_DATE)
+        tasks = [DummyOperator(dag=dag, task_id='dummy{}'.format(i)) for i in range(3)]
+        dagbag = mock.MagicMock(dags={dag_id: dag})
+
+        scheduler = SchedulerJob()
+        scheduler.max_tis_per_query = 2
+        session = settings.Session()
+
+        running_ti = TI(tasks[0], DEFAULT_DATE)
+        running_ti.state = State.RUNNING
+        session.merge(running_ti)
+        session.merge(TI(tasks[1], DEFAULT_DATE))
+        session.commit()
+
+        # The keys are the ones _process_task_instances outputs, with the try number
+        ti_keys = [TI(task, DEFAULT_DATE).key for task in tasks]
+        scheduler._schedule_task_instances(dagbag, ti_keys, session=session)
+        session.commit()
+
+        states = dict(
+            session.query(TI.task_id, TI.state).filter(TI.dag_id == dag_id).all())
+        # Running task instances are not overwritten, missing ones are created
+        self.assertEqual({
+            'dummy0': State.RUNNING,
+            'dummy1': State.SCHEDULED,
+            'dummy2': State.SCHEDULED,
+        }, states)
+        session.close()
+
+    def test_schedule_task_instances_updates_task_attributes(self):
+        dag_id = 'SchedulerJobTest.test_schedule_task_instances_updates_task_attributes'
+        dag = DAG(dag_id=dag_id, start_date=DEFAULT_DATE)
+        task = DummyOperator(dag=dag, task_id='dummy', pool='old_pool', queue='old_queue')
+        dagbag = mock.MagicMock(dags={dag_id: dag})
+
+        scheduler = SchedulerJob()
+        session = settings.Session()
+        session.merge(TI(task, DEFAULT_DATE))
+        session.commit()
+
+        # The DAG file changed since the task instance was created
+        task.pool = 'new_pool'
+        task.queue = 'new_queue'
+        task.priority_weight = 5
+        DummyOperator(dag=dag, task_id='downstream') << task
+
+        scheduler._schedule_task_instances(dagbag, [TI(task, DEFAULT_DATE).key],
+                                           session=session)
+        session.commit()
+
+        ti = session.query(TI).filter(TI.dag_id == dag_id, TI.task_id == 'dummy').one()
+        self.assertEqual(State.SCHEDULED, ti.state)
+        self.assertEqual('new_pool', ti.pool)
+        self.assertEqual('new_queue', ti.queue)
+        self.assertEqual(6, ti.priority_weight)
+        self.assertEqual('DummyOperator', ti.operator)
+        session.close()
+
     def test_find_executable_task_instances_concurrency(self):
         dag_id = 'SchedulerJobTest.test_find_executable_task_instances_concurrency'
         task_id_1 = 'dummy'
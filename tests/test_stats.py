@@ -20,7 +20,7 @@
 import unittest
 
 from airflow.stats import SafeStatsdLogger
-from mock import Mock
+from mock import Mock, patch
 
 
 class TestStats(unittest.TestCase):
@@ -44,3 +44,15 @@ class TestStats(unittest.TestCase):
     def test_stat_name_must_only_include_whitelisted_characters(self):
         self.stats.incr('test/$tats')
         self.statsd_client.assert_not_called()
+
+    def test_timer(self):
+        with self.stats.timer('test_timer') as timer:
+            pass
+        self.statsd_client.timing.assert_called_once_with('test_timer', timer.duration)
+        self.assertGreaterEqual(timer.duration, 0)
+
+    @patch('airflow.plugins_manager.stat_name_handler', None)
+    def test_timer_with_invalid_name(self):
+        with self.stats.timer('test/$tats'):
+            pass
+        self.statsd_client.timing.assert_not_called()
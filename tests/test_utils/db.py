@@ -16,7 +16,8 @@
 # KIND, either express or implied.  See the License for the
 # specific language governing permissions and limitations
 # under the License.
-from airflow.models import DagModel, DagRun, errors, Pool, SlaMiss, TaskInstance
+from airflow.models import (DagModel, DagRun, errors, Pool, SerializedDagModel, SlaMiss,
+                            TaskInstance)
 from airflow.utils.db import create_session
 
 
@@ -44,3 +45,8 @@ def clear_db_errors():
 def clear_db_pools():
     with create_session() as session:
         session.query(Pool).delete()
+
+
+def clear_db_serialized_dags():
+    with create_session() as session:
+        session.query(SerializedDagModel).delete()
@@ -20,11 +20,15 @@
 import unittest
 from datetime import datetime
 
-from airflow.models import BaseOperator, TaskInstance
+from mock import patch
+
+from airflow.models import BaseOperator, DAG, TaskInstance
 from airflow.utils.trigger_rule import TriggerRule
+from airflow.ti_deps.dep_context import DepContext
 from airflow.ti_deps.deps.trigger_rule_dep import TriggerRuleDep
 from airflow.utils.db import create_session
 from airflow.utils.state import State
+from tests.ti_deps.deps.fake_models import FakeTI
 
 
 class TriggerRuleDepTest(unittest.TestCase):
@@ -361,3 +365,52 @@ class TriggerRuleDepTest(unittest.TestCase):
 
         self.assertEqual(len(dep_statuses), 1)
         self.assertFalse(dep_statuses[0].passed)
+
+    def test_get_states_count_upstream_ti(self):
+        """
+        Upstream states are counted in memory from the finished task instances
+        """
+        ti = self._get_task_instance(TriggerRule.ALL_SUCCESS,
+                                     upstream_task_ids=['a', 'b', 'c', 'd', 'e'])
+        finished_tasks = {
+            'a': FakeTI(task_id='a', state=State.SUCCESS),
+            'b': FakeTI(task_id='b', state=State.SKIPPED),
+            'c': FakeTI(task_id='c', state=State.FAILED),
+            'd': FakeTI(task_id='d', state=State.UPSTREAM_FAILED),
+            # not an upstream task of the task instance
+            'f': FakeTI(task_id='f', state=State.SUCCESS),
+        }
+        self.assertEqual(
+            TriggerRuleDep._get_states_count_upstream_ti(ti, finished_tasks),
+            (1, 1, 1, 1, 4))
+
+    def test_finished_tasks_in_dep_context(self):
+        """
+        The trigger rule is evaluated in memory against the finished tasks of the
+        dep context, without querying the database
+        """
+        dag = DAG('test_dag', start_date=datetime(2015, 1, 1))
+        upstream_a = BaseOperator(task_id='a', dag=dag)
+        upstream_b = BaseOperator(task_id='b', dag=dag)
+        task = BaseOperator(task_id='test_task', dag=dag)
+        task.set_upstream([upstream_a, upstream_b])
+        ti = TaskInstance(task=task, execution_date=dag.start_date)
+
+        with patch.object(TriggerRuleDep, '_query_states_count_upstream_ti') as query:
+            dep_context = DepContext(finished_tasks=[
+                FakeTI(task_id='a', state=State.SUCCESS),
+            ])
+            dep_statuses = tuple(TriggerRuleDep()._get_dep_statuses(
+                ti, "Fake Session", dep_context))
+            self.assertEqual(len(dep_statuses), 1)
+            self.assertFalse(dep_statuses[0].passed)
+
+            dep_context = DepContext(finished_tasks=[
+                FakeTI(task_id='a', state=State.SUCCESS),
+                FakeTI(task_id='b', state=State.SUCCESS),
+            ])
+            dep_statuses = tuple(TriggerRuleDep()._get_dep_statuses(
+                ti, "Fake Session", dep_context))
+            self.assertEqual(len(dep_statuses), 0)
+
+            query.assert_not_called()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from airflow.exceptions import AirflowConfigException
+from airflow.utils.dag_dir_watcher import (
+    CREATED, DELETED, MODIFIED, DagDirWatcher, DagImportGraph, PollingDagDirWatcher)
+
+
+class TestDagDirWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.write('common/__init__.py', '')
+        self.write('common/helpers.py', 'import os\n')
+        self.write('dag_a.py', 'from common.helpers import make_dag\n')
+        self.write('dag_b.py', 'from common import helpers\n')
+        self.write('dag_c.py', 'import airflow\n')
+        self.write('indirect.py', 'import dag_a\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, relative_path):
+        return os.path.join(self.directory, relative_path)
+
+    def write(self, relative_path, content, mtime=None):
+        path = self.path(relative_path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def test_import_graph_dependents(self):
+        graph = DagImportGraph(self.directory)
+        graph.refresh()
+
+        self.assertEqual(
+            graph.dependents([self.path('common/helpers.py')]),
+            {self.path('dag_a.py'), self.path('dag_b.py'), self.path('indirect.py')})
+        self.assertEqual(graph.dependents([self.path('common/__init__.py')]),
+                         {self.path('dag_a.py'), self.path('dag_b.py'),
+                          self.path('indirect.py')})
+        self.assertEqual(graph.dependents([self.path('dag_c.py')]), set())
+
+        self.write('dag_b.py', 'import os\n', mtime=1)
+        graph.update(self.path('dag_b.py'))
+        self.assertNotIn(self.path('dag_b.py'),
+                         graph.dependents([self.path('common/helpers.py')]))
+
+    def test_polling_watcher(self):
+        watcher = PollingDagDirWatcher(self.directory)
+        self.assertEqual(watcher.get_changes(), {})
+
+        self.write('dag_a.py', 'from common.helpers import make_dag, other\n', mtime=1)
+        self.write('dag_d.py', '')
+        os.remove(self.path('dag_c.py'))
+        self.write('notes.txt', '')
+
+        self.assertEqual(watcher.get_changes(), {
+            self.path('dag_a.py'): MODIFIED,
+            self.path('dag_d.py'): CREATED,
+            self.path('dag_c.py'): DELETED,
+        })
+        self.assertEqual(watcher.get_changes(), {})
+
+    def test_changed_module_reparses_importing_files(self):
+        watcher = DagDirWatcher(self.directory, mode='poll')
+
+        self.write('common/helpers.py', 'import os\nimport sys\n', mtime=1)
+        changes = watcher.get_changes()
+
+        self.assertFalse(changes.structure_changed)
+        self.assertEqual(changes.changed_paths, {
+            self.path('common/helpers.py'), self.path('dag_a.py'),
+            self.path('dag_b.py'), self.path('indirect.py')})
+
+    def test_created_file_changes_structure(self):
+        watcher = DagDirWatcher(self.directory, mode='poll')
+
+        self.write('dag_d.py', '')
+        changes = watcher.get_changes()
+
+        self.assertTrue(changes.structure_changed)
+        self.assertEqual(changes.changed_paths, {self.path('dag_d.py')})
+
+    def test_unknown_mode(self):
+        with self.assertRaises(AirflowConfigException):
+            DagDirWatcher(self.directory, mode='fsevents')
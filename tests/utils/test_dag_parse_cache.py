@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+from airflow.utils.dag_parse_cache import DagParseCache
+
+
+class TestDagParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dags_folder = tempfile.mkdtemp()
+        self.cache_folder = tempfile.mkdtemp()
+        self.cache = DagParseCache(self.cache_folder, self.dags_folder)
+        self.write('helpers.py', 'X = 1\n')
+        self.dag_file = self.write('dag.py', 'import helpers\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.dags_folder)
+        shutil.rmtree(self.cache_folder)
+
+    def write(self, name, content):
+        path = os.path.join(self.dags_folder, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_key_depends_on_imported_modules(self):
+        key = self.cache.get_key(self.dag_file)
+        self.assertEqual(key, self.cache.get_key(self.dag_file))
+
+        self.write('helpers.py', 'X = 2\n')
+        self.assertNotEqual(key, self.cache.get_key(self.dag_file))
+
+    def test_no_key_for_marked_files(self):
+        self.write('dag.py', 'import helpers  # airflow: no_parse_cache\n')
+        self.assertIsNone(self.cache.get_key(self.dag_file))
+
+    def test_store_and_load(self):
+        key = self.cache.get_key(self.dag_file)
+        self.assertIsNone(self.cache.load(key))
+
+        self.cache.store(key, ['dag'])
+        self.assertEqual(['dag'], self.cache.load(key))
+
+        # A new entry of the same file replaces the previous one
+        self.write('dag.py', 'import helpers\nimport os\n')
+        new_key = self.cache.get_key(self.dag_file)
+        self.cache.store(new_key, ['new_dag'])
+        self.assertIsNone(self.cache.load(key))
+        self.assertEqual(['new_dag'], self.cache.load(new_key))
+
+    def test_unpicklable_dags_are_not_cached(self):
+        key = self.cache.get_key(self.dag_file)
+        with mock.patch('airflow.utils.dag_parse_cache.dill.dumps',
+                        side_effect=TypeError("can't pickle")):
+            self.cache.store(key, ['unpicklable_dag'])
+        self.assertIsNone(self.cache.load(key))
+
+        # The file is not pickled again until it changes
+        self.cache.store(key, ['dag'])
+        self.assertIsNone(self.cache.load(key))
+
+    def test_ttl(self):
+        cache = DagParseCache(self.cache_folder, self.dags_folder, ttl=60)
+        key = cache.get_key(self.dag_file)
+        cache.store(key, ['dag'])
+        self.assertEqual(['dag'], cache.load(key))
+
+        entry_time = time.time() - 120
+        for entry in os.listdir(self.cache_folder):
+            os.utime(os.path.join(self.cache_folder, entry), (entry_time, entry_time))
+        self.assertIsNone(cache.load(key))
@@ -18,6 +18,7 @@
 # under the License.
 
 import os
+import pickle
 import sys
 import tempfile
 import unittest
@@ -28,12 +29,14 @@ from mock import MagicMock
 
 from airflow import configuration as conf
 from airflow.configuration import mkdir_p
+from airflow.exceptions import AirflowException
 from airflow.jobs import DagFileProcessor
 from airflow.jobs import LocalTaskJob as LJ
-from airflow.models import DagBag, TaskInstance as TI
+from airflow.models import DAG, DagBag, TaskInstance as TI
+from airflow.operators.dummy_operator import DummyOperator
 from airflow.utils import timezone
 from airflow.utils.dag_processing import (DagFileProcessorAgent, DagFileProcessorManager,
-                                          SimpleTaskInstance, correct_maybe_zipped)
+                                          SimpleDag, SimpleTaskInstance, correct_maybe_zipped)
 from airflow.utils.db import create_session
 from airflow.utils.state import State
 
@@ -176,6 +179,47 @@ class TestDagFileProcessorManager(unittest.TestCase):
         manager.set_file_paths(['abc.txt'])
         self.assertDictEqual(manager._processors, {'abc.txt': mock_processor})
 
+    def test_queue_changed_file_paths(self):
+        manager = DagFileProcessorManager(
+            dag_directory='directory',
+            file_paths=['a.py', 'b.py', 'c.py', 'd.py'],
+            max_runs=1,
+            processor_factory=MagicMock().return_value,
+            signal_conn=MagicMock(),
+            stat_queue=MagicMock(),
+            result_queue=MagicMock,
+            async_mode=True)
+        manager._file_path_queue = ['a.py', 'b.py']
+        manager._processors['c.py'] = MagicMock()
+
+        manager._queue_changed_file_paths({'b.py', 'c.py', 'unknown.py'})
+        self.assertEqual(manager._file_path_queue, ['b.py', 'a.py'])
+
+        # c.py is queued again once it is not being processed anymore
+        del manager._processors['c.py']
+        manager._queue_changed_file_paths(set())
+        self.assertEqual(manager._file_path_queue, ['c.py', 'b.py', 'a.py'])
+
+    def test_end_terminates_processor_factory(self):
+        processor_factory = MagicMock()
+        processor_factory.get_all_pids.return_value = [1234]
+        manager = DagFileProcessorManager(
+            dag_directory='directory',
+            file_paths=['abc.txt'],
+            max_runs=1,
+            processor_factory=processor_factory,
+            signal_conn=MagicMock(),
+            stat_queue=MagicMock(),
+            result_queue=MagicMock,
+            async_mode=True)
+        manager._processors['abc.txt'] = MagicMock(pid=42)
+
+        # The idle processes of the factory are part of the processes to kill
+        self.assertEqual([42, 1234], manager.get_all_pids())
+
+        manager.end()
+        processor_factory.terminate.assert_called_once_with()
+
     def test_find_zombies(self):
         manager = DagFileProcessorManager(
             dag_directory='directory',
@@ -360,3 +404,37 @@ class TestCorrectMaybeZipped(unittest.TestCase):
         self.assertEqual('/path/to/archive.zip', args[0])
 
         self.assertEqual(dag_folder, '/path/to/archive.zip')
+
+
+class TestSimpleDag(unittest.TestCase):
+
+    def setUp(self):
+        self.dag = DAG('test_simple_dag', start_date=DEFAULT_DATE, concurrency=4)
+        DummyOperator(task_id='dummy1', dag=self.dag)
+        DummyOperator(task_id='dummy2', dag=self.dag, task_concurrency=2)
+
+    def test_pickle(self):
+        simple_dag = pickle.loads(pickle.dumps(SimpleDag(self.dag, pickle_id=5)))
+
+        self.assertFalse(hasattr(simple_dag, '__dict__'))
+        self.assertEqual('test_simple_dag', simple_dag.dag_id)
+        self.assertEqual(['dummy1', 'dummy2'], simple_dag.task_ids)
+        self.assertEqual(4, simple_dag.concurrency)
+        self.assertEqual(5, simple_dag.pickle_id)
+        self.assertIsNone(simple_dag.get_task_special_arg('dummy1', 'task_concurrency'))
+        self.assertEqual(2, simple_dag.get_task_special_arg('dummy2', 'task_concurrency'))
+
+    def test_pickle_task_instance(self):
+        ti = TI(self.dag.get_task('dummy1'), DEFAULT_DATE)
+        ti.state = State.RUNNING
+        simple_ti = pickle.loads(pickle.dumps(SimpleTaskInstance(ti)))
+
+        self.assertEqual(ti.key, simple_ti.key)
+        self.assertEqual(State.RUNNING, simple_ti.state)
+        self.assertEqual(ti.queue, simple_ti.queue)
+
+    def test_unknown_format_version(self):
+        simple_dag = SimpleDag(self.dag)
+        state = (-1,) + simple_dag.__getstate__()[1:]
+        with self.assertRaises(AirflowException):
+            simple_dag.__setstate__(state)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+import tempfile
+import unittest
+
+from airflow.utils.loop_profiler import LoopPhaseProfiler
+from tests.compat import mock
+
+
+class LoopPhaseProfilerTest(unittest.TestCase):
+
+    @mock.patch('airflow.utils.loop_profiler.Stats')
+    def test_phases_are_sent_to_stats(self, mock_stats):
+        profiler = LoopPhaseProfiler('test.loop')
+        profiler.start_loop()
+        with profiler.phase('harvest'):
+            pass
+        profiler.end_loop()
+
+        stats = [call[0][0] for call in mock_stats.timing.call_args_list]
+        self.assertEqual(stats, ['test.loop.harvest', 'test.loop.total'])
+        self.assertEqual(profiler.num_loops, 1)
+
+    def test_phase_entered_twice_is_cumulated(self):
+        profiler = LoopPhaseProfiler('test.loop')
+        with mock.patch('airflow.utils.loop_profiler.time.time',
+                        side_effect=[0, 1, 2, 3, 5, 10]):
+            profiler.start_loop()
+            with profiler.phase('events'):
+                pass
+            with profiler.phase('events'):
+                pass
+            self.assertEqual(profiler.end_loop(), 10000)
+
+        self.assertEqual(profiler.report()['events']['max'], 3000)
+
+    def test_percentile(self):
+        profiler = LoopPhaseProfiler('test.loop', window_size=10)
+        self.assertIsNone(profiler.percentile('total', 50))
+        for duration in range(1, 21):
+            profiler._windows['total'].append(duration)
+
+        # only the last 10 durations are kept
+        self.assertEqual(profiler.percentile('total', 0), 11)
+        self.assertEqual(profiler.percentile('total', 50), 15)
+        self.assertEqual(profiler.percentile('total', 90), 19)
+        self.assertEqual(profiler.percentile('total', 100), 20)
+
+        report = profiler.report(percents=(50,))
+        self.assertEqual(report['total']['count'], 10)
+        self.assertEqual(report['total']['mean'], 15.5)
+        self.assertEqual(report['total']['p50'], 15)
+
+    def test_trace_file(self):
+        fd, trace_file = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            with open(trace_file, 'w') as f:
+                f.write('previous trace\n')
+
+            profiler = LoopPhaseProfiler('test.loop', trace_file=trace_file)
+            for failed in (False, True):
+                profiler.start_loop()
+                with profiler.phase('harvest'):
+                    pass
+                profiler.end_loop(failed=failed)
+
+            with open(trace_file) as f:
+                loops = [json.loads(line) for line in f]
+        finally:
+            os.remove(trace_file)
+
+        self.assertEqual([loop['loop'] for loop in loops], [1, 2])
+        self.assertEqual([loop['failed'] for loop in loops], [False, True])
+        for loop in loops:
+            self.assertEqual(list(loop['phases_ms']), ['harvest'])
+            self.assertGreaterEqual(loop['duration_ms'], loop['phases_ms']['harvest'])
+
+
+if __name__ == '__main__':
+    unittest.main()